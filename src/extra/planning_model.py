@@ -2,6 +2,10 @@ from unified_planning.shortcuts import *
 from unified_planning.model.problem import Problem
 import unified_planning as up
 
+# The grid layout is shared with the domains in src/main; run with that directory on the
+# path, e.g. PYTHONPATH=src/main python src/extra/planning_model.py
+from grid_builder import build_grid, tile_name
+
 def create_problem():
     problem = Problem('museum')
 
@@ -50,13 +54,10 @@ def create_problem():
     problem.add_fluent(fail_state, default_initial_value=False)
 
     # Initialize the world
-    tiles = {}
-    for i in range(5):
-        for j in range(5):
-            t_name = f"t{i}{j}"
-            t = Object(t_name, tile_type)
-            tiles[t_name] = t
-            problem.add_object(t)
+    grid = build_grid(5, 5)
+    tile_objs = [Object(name, tile_type) for name in grid.names]
+    problem.add_objects(tile_objs)
+    tiles = dict(zip(grid.names, tile_objs))
 
     # Define Actions for attacker
     move = InstantaneousAction("move", curr=tile_type, to=tile_type, a=agent_type)
@@ -92,7 +93,7 @@ def create_problem():
     steal = InstantaneousAction("steal", curr=tile_type, a=agent_type)
     curr, a = steal.parameters
     steal.add_precondition(at(a, curr))  # Must be at curr tile
-    steal.add_precondition(Equals(curr, tiles["t31"]))  # The diamond is at t31
+    steal.add_precondition(Equals(curr, tiles[tile_name(3, 1)]))  # The diamond is at t3_1
     steal.add_precondition(attacker_turn())  # Can only steal on attacker's turn
     steal.add_effect(diamond_stolen(), True)
     steal.add_effect(attacker_turn(), False)  # End attacker's turn
@@ -116,33 +117,22 @@ def create_problem():
     problem.add_action(guard_move)
 
     # Initial Attacker Position
-    problem.set_initial_value(at(attacker_obj, tiles["t00"]), True)
+    problem.set_initial_value(at(attacker_obj, tiles[tile_name(0, 0)]), True)
 
     # Initial Guard Position
-    problem.set_initial_value(at(guard_obj, tiles["t20"]), True)
+    problem.set_initial_value(at(guard_obj, tiles[tile_name(2, 0)]), True)
 
     # Define Adjacency Relations
-    for i in range(5):
-        for j in range(5):
-            tile_name = f"t{i}{j}"
-            if tile_name in tiles:
-                current_tile = tiles[tile_name]
-                if j > 0:
-                    problem.set_initial_value(connected(current_tile, tiles[f"t{i}{j-1}"]), True)
-                if j < 4:
-                    problem.set_initial_value(connected(current_tile, tiles[f"t{i}{j+1}"]), True)
-                if i > 0:
-                    problem.set_initial_value(connected(current_tile, tiles[f"t{i-1}{j}"]), True)
-                if i < 4:
-                    problem.set_initial_value(connected(current_tile, tiles[f"t{i+1}{j}"]), True)
+    for src, dest in grid.edges.tolist():
+        problem.set_initial_value(connected(tile_objs[src], tile_objs[dest]), True)
 
     # Define Furniture Locations
-    furniture_tiles = {"t10", "t20", "t30", "t11", "t21", "t12", "t32", "t34"}
-    for tile_name in furniture_tiles:
-        problem.set_initial_value(furniture_at(tiles[tile_name]), True)
+    furniture_tiles = {(1, 0), (2, 0), (3, 0), (1, 1), (2, 1), (1, 2), (3, 2), (3, 4)}
+    for i, j in furniture_tiles:
+        problem.set_initial_value(furniture_at(tiles[tile_name(i, j)]), True)
 
     # Define guard path - now using the next_in_path fluent
-    guard_path = ["t20", "t21", "t22", "t32", "t42", "t41", "t40", "t30"]
+    guard_path = [tile_name(i, j) for i, j in [(2, 0), (2, 1), (2, 2), (3, 2), (4, 2), (4, 1), (4, 0), (3, 0)]]
     for i in range(len(guard_path)):
         current = guard_path[i]
         next_tile = guard_path[(i+1) % len(guard_path)]  # Cycle back to start
@@ -153,7 +143,7 @@ def create_problem():
         problem.add_goal(Not(trace_left(tile)))
 
     problem.add_goal(diamond_stolen())  # Ensure the diamond is stolen
-    problem.add_goal(at(attacker_obj, tiles["t00"]))  # Attacker must return home
+    problem.add_goal(at(attacker_obj, tiles[tile_name(0, 0)]))  # Attacker must return home
     problem.add_goal(attacker_turn())  # End with attacker's turn (ensures guard has completed their last move)
     problem.add_goal(Not(fail_state))  # Plan fails if fail_state is True
 
@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+# Adaptive version of the (Ext, Int, Crit) sweep. Runtime grows with the PC count of
+# every segment, so the configs that finish within the budget form a staircase: for each
+# (ext, int) column there is a largest crit count that still finishes. Instead of running
+# the whole cube, the search
+#
+#   1. bisects each axis from the smallest config to find where it crosses the timeout,
+#   2. traces the staircase column by column, in waves of columns with the same
+#      ext + int index so a wave's columns can run in parallel. A column's boundary is
+#      at most its lower neighbours' boundaries; that bound is probed first and the
+#      column is only bisected below it when it times out,
+#   3. fills in everything else: configs beyond the boundary become predicted timeouts,
+#      configs inside it are extrapolated from the nearest measured config with the
+#      per-axis growth factors of a log-linear fit over all measured runtimes.
+#
+# Searches are generators that yield the config they need next and are sent back
+# whether it finished; run_batches drives several of them at once.
+
+TIME_FIELDS = ("translator", "preprocessor", "search", "total_wall")
+MIN_TIME = 1e-3  # Floor for the log fit; phases can report 0.0s
+
+
+class Knowledge:
+    """Known outcomes (True = finished in time) plus what monotonicity implies about others."""
+
+    def __init__(self, outcomes=None):
+        self.outcomes = dict(outcomes or {})
+
+    def add(self, config, finished):
+        self.outcomes[config] = finished
+
+    def status(self, config):
+        """True/False if known or implied by a finished config above / timed-out config below; else None."""
+        if config in self.outcomes:
+            return self.outcomes[config]
+        for other, finished in self.outcomes.items():
+            if finished and all(x <= y for x, y in zip(config, other)):
+                return True
+            if not finished and all(x >= y for x, y in zip(config, other)):
+                return False
+        return None
+
+
+def _search(knowledge, configs):
+    """Highest index in configs (ordered by one growing axis) that finishes, -1 if none."""
+    lo, up = -1, len(configs)
+    # The last config is the most likely to be on the boundary (an upper bound from neighbours)
+    probe = len(configs) - 1
+    while up - lo > 1:
+        finished = knowledge.status(configs[probe])
+        if finished is None:
+            finished = yield configs[probe]
+            knowledge.add(configs[probe], finished)
+        if finished:
+            lo = probe
+        else:
+            up = probe
+        probe = (lo + up) // 2
+    return lo
+
+
+def axis_searches(knowledge, ext_values, int_values, crit_values):
+    """One bisection per axis, with the other two axes at their smallest value."""
+    e0, i0, c0 = ext_values[0], int_values[0], crit_values[0]
+    return [
+        _search(knowledge, [(e, i0, c0) for e in ext_values]),
+        _search(knowledge, [(e0, i, c0) for i in int_values]),
+        _search(knowledge, [(e0, i0, c) for c in crit_values]),
+    ]
+
+
+def column_search(knowledge, e, i, crit_values, upper):
+    """Boundary of column (e, i): highest crit index that finishes, searched up to index upper."""
+    return _search(knowledge, [(e, i, c) for c in crit_values[:upper + 1]])
+
+
+def run_batches(searches, execute):
+    """
+    Runs generator searches side by side. Each round collects the next config of every
+    unfinished search, calls execute(configs) -> {config: finished} once for the whole
+    batch, and sends the outcomes back. Returns the searches' return values.
+    """
+    results = [None] * len(searches)
+    pending = {}
+    for k, search in enumerate(searches):
+        try:
+            pending[k] = next(search)
+        except StopIteration as stop:
+            results[k] = stop.value
+    while pending:
+        outcomes = execute(list(dict.fromkeys(pending.values())))
+        for k, config in list(pending.items()):
+            try:
+                pending[k] = searches[k].send(outcomes[config])
+            except StopIteration as stop:
+                results[k] = stop.value
+                del pending[k]
+    return results
+
+
+def trace_boundary(knowledge, ext_values, int_values, crit_values, execute):
+    """
+    Phases 1 and 2. Returns {(e, i): highest finishing crit index or -1} for every column;
+    every config the boundary depends on has been run or is implied by a run.
+    """
+    corner = (ext_values[0], int_values[0], crit_values[0])
+    run_batches([_search(knowledge, [corner])], execute)
+    run_batches(axis_searches(knowledge, ext_values, int_values, crit_values), execute)
+
+    boundary = {}
+    top = len(crit_values) - 1
+    for wave in range(len(ext_values) + len(int_values) - 1):
+        columns = [(a, wave - a) for a in range(len(ext_values)) if 0 <= wave - a < len(int_values)]
+        searches = []
+        for a, b in columns:
+            upper = min(boundary.get((ext_values[a - 1], int_values[b]), top) if a else top,
+                        boundary.get((ext_values[a], int_values[b - 1]), top) if b else top)
+            searches.append(column_search(knowledge, ext_values[a], int_values[b], crit_values, upper))
+        for (a, b), result in zip(columns, run_batches(searches, execute)):
+            boundary[(ext_values[a], int_values[b])] = result
+    return boundary
+
+
+def fit_growth(measured):
+    """
+    Least-squares fit of log(time) = b0 + b_ext*e + b_int*i + b_crit*c per time field over
+    measured {config: times}. Returns {field: (ext, int, crit) growth factor per added PC}.
+    """
+    configs = list(measured)
+    growth = {}
+    for field in TIME_FIELDS:
+        if len(configs) < 2:
+            growth[field] = (1.0, 1.0, 1.0)
+            continue
+        X = np.array([[1.0, *config] for config in configs])
+        y = np.log([max(float(measured[config][field]), MIN_TIME) for config in configs])
+        coef = np.linalg.lstsq(X, y, rcond=None)[0]
+        growth[field] = tuple(float(math.exp(b)) for b in coef[1:])
+    return growth
+
+
+def interpolate(config, measured, growth):
+    """Times of config extrapolated from the nearest measured config (Manhattan distance)."""
+    nearest = min(measured, key=lambda m: (sum(abs(x - y) for x, y in zip(config, m)), m))
+    estimate = {}
+    for field in TIME_FIELDS:
+        factor = 1.0
+        for g, x, y in zip(growth[field], config, nearest):
+            factor *= g ** (x - y)
+        estimate[field] = round(float(measured[nearest][field]) * factor, 2)
+    return estimate, nearest
@@ -0,0 +1,218 @@
+import argparse
+import json
+import numpy as np
+
+import network_domain_ir
+from network_domain_ir import CAN_SSH, SEGMENT_LINK
+
+# Monte Carlo rollouts of a stochastic attacker on the network domain, following the
+# action semantics of final_gridworld_domain (exploit, escalate, ssh move, clean, steal,
+# log off) after a defender fix set has been applied. A batch of episodes is a set of
+# NumPy arrays with one row per episode, so every step of every episode advances in one
+# vectorized update.
+#
+# The attacker picks uniformly at random (scaled by per-action weights) among the
+# actions that are applicable and change something. An episode succeeds like the
+# planner's follower: escaped with every host's logs clean again.
+
+EPISODES = 10000
+MAX_STEPS = 200
+SEED = 0
+
+# Action slots: the fixed actions, then one move slot per destination host
+EXPLOIT, ESCALATE, CLEAN, STEAL, LOG_OFF = range(5)
+N_FIXED = 5
+ACTION_NAMES = ("exploit", "escalate", "clean", "steal", "log_off", "move")
+DEFAULT_WEIGHTS = {"exploit": 1.0, "escalate": 1.0, "clean": 1.0, "steal": 1.0, "log_off": 1.0, "move": 1.0}
+
+
+class Network:
+    """Static arrays of a network instance: host segments, CVEs and SSH adjacency."""
+
+    def __init__(self, ir):
+        names = ir.names.names
+        self.host_names = [names[h.id] for h in ir.hosts]
+        self.host_index = {name: k for k, name in enumerate(self.host_names)}
+        self.cve_names = [names[h.cve.id] for h in ir.hosts]
+        self.segment = np.array([h.segment.id for h in ir.hosts])
+        self.entry = np.array([h.segment.entry for h in ir.hosts])
+        self.target = np.array([h.segment.target for h in ir.hosts])
+
+        n = len(ir.hosts)
+        host_of = {h.id: k for k, h in enumerate(ir.hosts)}
+        self.ssh = np.zeros((n, n), dtype=bool)
+        seg_ids = self.segment
+        for fact in ir.facts:
+            if fact.pred == CAN_SSH:
+                self.ssh[host_of[fact.args[0]], host_of[fact.args[1]]] = True
+            elif fact.pred == SEGMENT_LINK:
+                self.ssh |= np.outer(seg_ids == fact.args[0], seg_ids == fact.args[1])
+        np.fill_diagonal(self.ssh, False)
+        self.start = host_of[next(f.args[1] for f in ir.facts if f.pred == network_domain_ir.AT)]
+
+    def apply_fixes(self, fixes):
+        """
+        Returns (vulnerable, ssh) after the defender's fix actions, given as planner plan
+        steps such as 'fix_patch_cve defender_agent pc1 ext_cve1'.
+        """
+        vulnerable = np.ones(len(self.host_names), dtype=bool)
+        ssh = self.ssh.copy()
+        for step in fixes:
+            parts = step.strip("()").lower().split()
+            if parts[0] == "fix_patch_cve":
+                h = self.host_index[parts[2]]
+                if self.cve_names[h] == parts[3]:
+                    vulnerable[h] = False
+            elif parts[0] == "fix_update_firewall_ruleset":
+                ssh[self.host_index[parts[3]], self.host_index[parts[4]]] = False
+            else:
+                raise ValueError(f"Not a defender action: {step}")
+        return vulnerable, ssh
+
+
+def simulate(network, fixes=(), episodes=EPISODES, max_steps=MAX_STEPS, weights=None, seed=SEED):
+    """Runs the batch and returns summary statistics plus per-episode arrays."""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    rng = np.random.default_rng(seed)
+    vulnerable, ssh = network.apply_fixes(fixes)
+    n = len(network.host_names)
+    rows = np.arange(episodes)
+
+    at = np.full(episodes, network.start)
+    privilege = np.zeros((episodes, n), dtype=np.int8)  # 0 none, 1 user, 2 root
+    logs_clean = np.ones((episodes, n), dtype=bool)
+    visited = np.zeros((episodes, n), dtype=bool)
+    visited[:, network.start] = True
+    stolen = np.zeros(episodes, dtype=bool)
+    escaped = np.zeros(episodes, dtype=bool)
+    stuck = np.zeros(episodes, dtype=bool)
+    steps = np.zeros(episodes, dtype=np.int32)
+
+    slot_weights = np.array([weights[name] for name in ACTION_NAMES[:N_FIXED]] + [weights["move"]] * n)
+
+    for _ in range(max_steps):
+        active = ~(escaped | stuck)
+        if not active.any():
+            break
+        priv_here = privilege[rows, at]
+
+        applicable = np.zeros((episodes, N_FIXED + n), dtype=bool)
+        applicable[:, EXPLOIT] = vulnerable[at] & (priv_here == 0)
+        applicable[:, ESCALATE] = priv_here == 1
+        applicable[:, CLEAN] = ~logs_clean[rows, at]
+        applicable[:, STEAL] = network.target[at] & ~stolen
+        applicable[:, LOG_OFF] = stolen
+        # Root on the source, or both hosts in the same entry segment
+        may_move = (priv_here == 2)[:, None] | (network.entry[at][:, None] & (network.segment[at][:, None] == network.segment[None, :]))
+        applicable[:, N_FIXED:] = ssh[at] & may_move
+        applicable &= active[:, None]
+
+        scores = rng.random(applicable.shape) * slot_weights * applicable
+        choice = scores.argmax(axis=1)
+        acting = applicable.any(axis=1)
+        stuck |= active & ~acting
+        steps += acting
+
+        r = acting & (choice == EXPLOIT)
+        privilege[r, at[r]] = 1
+        r = acting & (choice == ESCALATE)
+        privilege[r, at[r]] = 2
+        r = acting & (choice == CLEAN)
+        logs_clean[r, at[r]] = True
+        stolen |= acting & (choice == STEAL)
+        escaped |= acting & (choice == LOG_OFF)
+        r = acting & (choice >= N_FIXED)
+        at[r] = choice[r] - N_FIXED
+        logs_clean[r, at[r]] = False
+        visited[r, at[r]] = True
+
+    success = escaped & logs_clean.all(axis=1)
+    return {
+        "success": success,
+        "escaped": escaped,
+        "stolen": stolen,
+        "steps": steps,
+        "visited": visited.sum(axis=1),
+        "dirty_logs": (~logs_clean).sum(axis=1),
+    }
+
+
+def summarize(result):
+    success = result["success"]
+    lengths = result["steps"][success]
+    summary = {
+        "episodes": int(len(success)),
+        "success_rate": float(success.mean()),
+        "escape_rate": float(result["escaped"].mean()),
+        "steal_rate": float(result["stolen"].mean()),
+        "mean_hosts_visited": float(result["visited"].mean()),
+        "mean_dirty_logs_at_end": float(result["dirty_logs"].mean()),
+        "path_length": None,
+    }
+    if len(lengths):
+        summary["path_length"] = {
+            "min": int(lengths.min()),
+            "p50": float(np.percentile(lengths, 50)),
+            "p90": float(np.percentile(lengths, 90)),
+            "max": int(lengths.max()),
+            "histogram": np.bincount(lengths).tolist(),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo attacker rollouts on the network domain.")
+    parser.add_argument("--ext", type=int, default=7)
+    parser.add_argument("--int", type=int, dest="int_", default=7)
+    parser.add_argument("--crit", type=int, default=7)
+    parser.add_argument("--connectivity", choices=list(network_domain_ir.DOMAIN_PARTS), default="pairwise")
+    parser.add_argument("--topology", metavar="JSON", help="Segment graph to use instead of --ext/--int/--crit")
+    parser.add_argument("--fix", action="append", default=[],
+                        help="Defender action to apply first, e.g. 'fix_patch_cve defender_agent pc1 ext_cve1' (repeatable)")
+    parser.add_argument("--frontier", help="Evaluate the first fix sequence of every entry of a pareto_frontier.json")
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--weight", action="append", default=[], metavar="ACTION=W",
+                        help=f"Relative preference for an action kind ({', '.join(ACTION_NAMES)}), e.g. clean=5")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--json", metavar="PATH", help="Also write the summaries as JSON")
+    args = parser.parse_args()
+
+    weights = {}
+    for item in args.weight:
+        name, value = item.split("=")
+        if name not in ACTION_NAMES:
+            parser.error(f"Unknown action kind: {name}")
+        weights[name] = float(value)
+
+    if args.topology:
+        ir = network_domain_ir.build_topology_ir(network_domain_ir.Topology.load(args.topology), args.connectivity)
+    else:
+        counts = {'external': args.ext, 'internal': args.int_, 'critical': args.crit}
+        ir = network_domain_ir.build_network_ir(counts, args.connectivity)
+    network = Network(ir)
+
+    fix_sets = [("given fixes", args.fix)]
+    if args.frontier:
+        with open(args.frontier) as f:
+            fix_sets = [(f"defender cost {e['defender cost']}", e["sequences"][0] if e["sequences"] else [])
+                        for e in json.load(f)]
+
+    summaries = []
+    for label, fixes in fix_sets:
+        summary = summarize(simulate(network, fixes, args.episodes, args.max_steps, weights, args.seed))
+        summary["fixes"] = list(fixes)
+        summaries.append(summary)
+        lengths = summary["path_length"]
+        length_text = f"path p50 {lengths['p50']:.0f} / p90 {lengths['p90']:.0f}" if lengths else "no successful paths"
+        print(f"{label}: success {summary['success_rate']:.1%}, escaped {summary['escape_rate']:.1%}, "
+              f"visited {summary['mean_hosts_visited']:.1f} hosts, {summary['mean_dirty_logs_at_end']:.1f} dirty logs, "
+              f"{length_text}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
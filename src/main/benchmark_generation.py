@@ -0,0 +1,164 @@
+from unified_planning.model import Problem
+from functools import partial
+from importlib import metadata
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+from translate_independent import create_problem, write_pddl
+from final_gridworld_domain import setup_domain as setup_network_domain
+from sweeper_gridworld_domain import setup_gridworld_domain as setup_sweeper_domain
+from environment_gridworld_domain import setup_domain as setup_environment_domain
+from blocksworld_domain import setup_blocksworld_domain
+
+# Benchmarks the Python side of a sweep: how long each domain module takes to set up,
+# to become a full problem (create_problem) and to be written as PDDL. Results are saved
+# as JSON baselines and later runs are compared against them.
+
+WARMUP = 1
+REPEATS = 5
+REGRESSION_THRESHOLD = 0.10  # Median slower by more than 10% counts as a regression
+
+NETWORK_COUNTS = [(1, 1, 1), (3, 3, 3), (7, 7, 7), (10, 10, 10), (15, 15, 15), (7, 1, 1), (1, 1, 7)]
+SWEEPER_GRIDS = [((3, 3), 1), ((5, 5), 5), ((8, 8), 5), ((8, 8), 20)]
+ENVIRONMENT_GRIDS = [((3, 3), 1), ((5, 5), 3), ((8, 8), 5)]
+
+QUICK_NETWORK_COUNTS = [(1, 1, 1), (3, 3, 3)]
+QUICK_GRIDS = [((3, 3), 1)]
+
+STAGES = ("setup_domain", "create_problem", "write_pddl")
+
+
+def benchmark_cases(quick=False):
+    """(case id, domain setup function) for every domain module and parameter combination."""
+    cases = []
+    for e, i, c in (QUICK_NETWORK_COUNTS if quick else NETWORK_COUNTS):
+        counts = {'external': e, 'internal': i, 'critical': c}
+        for connectivity in ('pairwise', 'segment'):
+            cases.append((f"network/{connectivity}/ext{e}_int{i}_crit{c}",
+                          partial(setup_network_domain, pc_count_by_segment=counts, connectivity=connectivity)))
+    for (rows, cols), trace in (QUICK_GRIDS if quick else SWEEPER_GRIDS):
+        cases.append((f"sweeper/{rows}x{cols}_trace{trace}",
+                      partial(setup_sweeper_domain, grid_size=(rows, cols), number_of_trace_tiles=trace)))
+    for (rows, cols), trace in (QUICK_GRIDS if quick else ENVIRONMENT_GRIDS):
+        cases.append((f"environment/{rows}x{cols}_trace{trace}",
+                      partial(setup_environment_domain, grid_size=(rows, cols), number_of_trace_tiles=trace)))
+    cases.append(("blocksworld", setup_blocksworld_domain))
+    return cases
+
+
+def _stats(samples):
+    return {
+        "min_s": round(min(samples), 6),
+        "median_s": round(statistics.median(samples), 6),
+        "mean_s": round(statistics.mean(samples), 6),
+        "stdev_s": round(statistics.stdev(samples), 6) if len(samples) > 1 else 0.0,
+        "repeats": len(samples),
+    }
+
+
+def benchmark_case(setup_fn, warmup=WARMUP, repeats=REPEATS):
+    """Times setup_domain, create_problem and write_pddl of one case; returns stats per stage."""
+    samples = {stage: [] for stage in STAGES}
+    with tempfile.TemporaryDirectory() as out_dir, contextlib.redirect_stdout(io.StringIO()):
+        for run in range(warmup + repeats):
+            start = time.perf_counter()
+            setup_fn(Problem("generalized_domain"))
+            setup_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            problem = create_problem(setup_fn)
+            create_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            write_pddl(problem, out_dir)
+            write_time = time.perf_counter() - start
+
+            if run >= warmup:
+                samples["setup_domain"].append(setup_time)
+                samples["create_problem"].append(create_time)
+                samples["write_pddl"].append(write_time)
+    return {stage: _stats(times) for stage, times in samples.items()}
+
+
+def environment_info():
+    try:
+        up_version = metadata.version("unified-planning")
+    except metadata.PackageNotFoundError:
+        up_version = "unknown"
+    return {
+        "python": sys.version.split()[0],
+        "unified_planning": up_version,
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares median times per case and stage. Returns a list of (case, stage, baseline
+    median, new median, relative change) for every stage slower than the threshold.
+    """
+    regressions = []
+    for case, stages in results.items():
+        if case not in baseline:
+            continue
+        for stage, stats in stages.items():
+            old = baseline[case].get(stage)
+            if not old or old["median_s"] == 0:
+                continue
+            change = stats["median_s"] / old["median_s"] - 1
+            if change > threshold:
+                regressions.append((case, stage, old["median_s"], stats["median_s"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDDL generation of every domain module.")
+    parser.add_argument("--quick", action="store_true", help="Only the smallest cases")
+    parser.add_argument("--filter", default="", help="Regex on case ids, e.g. 'network/segment'")
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a saved baseline; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Relative slowdown of the median that counts as a regression (default: {REGRESSION_THRESHOLD})")
+    args = parser.parse_args()
+
+    results = {}
+    for case, setup_fn in benchmark_cases(args.quick):
+        if not re.search(args.filter, case):
+            continue
+        results[case] = benchmark_case(setup_fn, args.warmup, args.repeats)
+        medians = "  ".join(f"{stage} {results[case][stage]['median_s']:.4f}s" for stage in STAGES)
+        print(f"{case:<40} {medians}", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment_info(), "results": results}, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        missing = sorted(set(results) - set(baseline["results"]))
+        if missing:
+            print(f"Not in baseline: {', '.join(missing)}")
+        for case, stage, old, new, change in regressions:
+            print(f"REGRESSION {case} {stage}: {old:.4f}s -> {new:.4f}s (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,13 @@
 from unified_planning.shortcuts import *
 from unified_planning.model import Problem, Fluent
+from grid_builder import build_grid
 import random
 
 random.seed(42)
 
-def setup_domain(problem: Problem):
-    grid_size = (3, 3)
-    diamond_location = "t21"
-    attacker_starting_position = "t00"
-    number_of_trace_tiles = 1
+def setup_domain(problem: Problem, grid_size=(3, 3), number_of_trace_tiles=1):
+    diamond_location = (2, 1)
+    attacker_starting_position = (0, 0)
 
 
     # --- Types ---
@@ -21,13 +20,11 @@ def setup_domain(problem: Problem):
     problem.add_object(architect)
 
     # --- Create grid tiles ---
-    tiles = {}
-    for i in range(grid_size[0]):
-        for j in range(grid_size[1]):
-            name = f"t{i}{j}"
-            t = Object(name, tile_type)
-            tiles[name] = t
-            problem.add_object(t)
+    # Trace tiles are drawn here so the seeded random stream is consumed as before
+    grid = build_grid(grid_size[0], grid_size[1], trace_count=number_of_trace_tiles, rng=random)
+    tile_objs = [Object(name, tile_type) for name in grid.names]
+    problem.add_objects(tile_objs)
+    tiles = dict(zip(grid.names, tile_objs))
 
     # --- Fluents ---
     connected = Fluent("static_connected", BoolType(), x=tile_type, y=tile_type)
@@ -48,26 +45,20 @@ def setup_domain(problem: Problem):
     problem.add_fluent(no_trace_left)
 
     # --- Initial Values ---
-    problem.set_initial_value(at(attacker, tiles[attacker_starting_position]), True)
-    problem.set_initial_value(diamond_at(tiles[diamond_location]), True)
+    problem.set_initial_value(at(attacker, tiles[grid.name(*attacker_starting_position)]), True)
+    problem.set_initial_value(diamond_at(tiles[grid.name(*diamond_location)]), True)
 
     for tile in tiles.values():
         problem.set_initial_value(no_trace_left(tile), True)
 
     # Trace tile selection
-    all_tiles = list(tiles.values())
-    random_trace_tiles = random.sample(all_tiles, k=number_of_trace_tiles)
+    random_trace_tiles = [tile_objs[k] for k in grid.trace.tolist()]
     for tile in random_trace_tiles:
         problem.set_initial_value(is_trace_tile(tile), True) # Fluent used be attacker to determine if tile is dirtied
 
     # Connected tiles
-    for i in range(grid_size[0]):
-        for j in range(grid_size[1]):
-            curr = tiles[f"t{i}{j}"]
-            if j > 0: problem.set_initial_value(connected(curr, tiles[f"t{i}{j-1}"]), True)
-            if j < grid_size[1] - 1: problem.set_initial_value(connected(curr, tiles[f"t{i}{j+1}"]), True)
-            if i > 0: problem.set_initial_value(connected(curr, tiles[f"t{i-1}{j}"]), True)
-            if i < grid_size[0] - 1: problem.set_initial_value(connected(curr, tiles[f"t{i+1}{j}"]), True)
+    for src, dest in grid.edges.tolist():
+        problem.set_initial_value(connected(tile_objs[src], tile_objs[dest]), True)
 
     # ----- Actions -----
     # --- Architect (Leader) actions (prefixed with fix_) ---
@@ -170,7 +161,7 @@ def setup_domain(problem: Problem):
     attack_escape.add_precondition(at(a, curr))
     attack_escape.add_precondition(Equals(a, attacker))
     attack_escape.add_precondition(diamond_stolen())
-    attack_escape.add_precondition(Equals(curr, tiles["t00"]))
+    attack_escape.add_precondition(Equals(curr, tiles[grid.name(*attacker_starting_position)]))
     attack_escape.add_effect(escaped(), True)
     problem.add_action(attack_escape)
 
@@ -4,7 +4,17 @@ import random
 
 random.seed(42)
 
-def setup_domain(problem: Problem, pc_count_by_segment=None):
+CONNECTIVITY_MODES = ('pairwise', 'segment')
+
+def setup_domain(problem: Problem, pc_count_by_segment=None, connectivity='pairwise', base_counts=None):
+    """
+    connectivity='pairwise' emits one static_can_ssh fact per allowed host pair (O(n^2)).
+    connectivity='segment' derives reachability from static_segment_link facts between segments
+    plus static_ssh_blocked exceptions for links the defender removed, so facts grow linearly with hosts.
+    base_counts: problem already holds this domain set up for base_counts (same connectivity), and
+    only the PCs missing from it are added. Critical PCs are numbered last, so only the critical
+    count may grow; anything else raises ValueError.
+    """
     # Set default PC counts if not provided (7,7,5)
     if pc_count_by_segment is None:
         pc_count_by_segment = {
@@ -20,6 +30,12 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
     
     if any(count < 1 for count in pc_count_by_segment.values()):
         raise ValueError("Each segment must have at least 1 PC")
+
+    if connectivity not in CONNECTIVITY_MODES:
+        raise ValueError(f"connectivity must be one of: {CONNECTIVITY_MODES}")
+
+    if base_counts is not None:
+        return add_critical_pcs(problem, base_counts, pc_count_by_segment, connectivity)
         
     # --- Type Hierarchy ---
     vulnerability = UserType('vulnerability')
@@ -53,6 +69,8 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
     at = Fluent('static_at', a=agent_type, h=host)
     vulnerable = Fluent('static_vulnerable', h=host, v=vulnerability)
     can_ssh = Fluent('static_can_ssh', src=network_node, dest=network_node)
+    segment_link = Fluent('static_segment_link', s1=segment_type, s2=segment_type)
+    ssh_blocked = Fluent('static_ssh_blocked', src=host, dest=host)
     has_local_privilege = Fluent('static_has_local_privilege', a=agent_type, h=host, p=privilege_level)
     separated_by = Fluent('static_separated_by', s1=segment_type, s2=segment_type, f=firewall)
     in_segment = Fluent('static_in_segment', n=network_node, s=segment_type)
@@ -61,8 +79,9 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
     logs_cleaned = Fluent('logs_cleaned', h=host)
     escaped = Fluent('escaped')
     
+    connectivity_fluents = [can_ssh] if connectivity == 'pairwise' else [segment_link, ssh_blocked]
     fluent_list = [
-        at, vulnerable, can_ssh, has_local_privilege, separated_by, in_segment, 
+        at, vulnerable, *connectivity_fluents, has_local_privilege, separated_by, in_segment, 
         data_stolen, logs_cleaned, escaped
     ]
 
@@ -160,30 +179,64 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
             return critical_segment
         return None
 
-    # Calculate SSH permissions based on segment adjacency
-    for p1_name, p1 in pc_dict.items():
-        for p2_name, p2 in pc_dict.items():
-            if p1 == p2: continue
-            
-            s1 = get_segment_obj(p1_name)
-            s2 = get_segment_obj(p2_name)
+    # Segment adjacency: same segment, External <-> Internal, Internal <-> Critical
+    segment_links = [
+        (external_segment, external_segment),
+        (internal_segment, internal_segment),
+        (critical_segment, critical_segment),
+        (external_segment, internal_segment),
+        (internal_segment, external_segment),
+        (internal_segment, critical_segment),
+        (critical_segment, internal_segment),
+    ]
 
-            allow_connection = False
-            
-            # Allow: Same segment
-            if s1 == s2: 
-                allow_connection = True
-            # Allow: External <-> Internal
-            elif (s1 == external_segment and s2 == internal_segment) or \
-                 (s1 == internal_segment and s2 == external_segment):
-                allow_connection = True
-            # Allow: Internal <-> Critical
-            elif (s1 == internal_segment and s2 == critical_segment) or \
-                 (s1 == critical_segment and s2 == internal_segment):
-                allow_connection = True
-            
-            if allow_connection:
-                problem.set_initial_value(can_ssh(p1, p2), True)
+    if connectivity == 'pairwise':
+        # Calculate SSH permissions based on segment adjacency
+        for p1_name, p1 in pc_dict.items():
+            for p2_name, p2 in pc_dict.items():
+                if p1 == p2: continue
+                
+                s1 = get_segment_obj(p1_name)
+                s2 = get_segment_obj(p2_name)
+
+                allow_connection = False
+                
+                # Allow: Same segment
+                if s1 == s2: 
+                    allow_connection = True
+                # Allow: External <-> Internal
+                elif (s1 == external_segment and s2 == internal_segment) or \
+                     (s1 == internal_segment and s2 == external_segment):
+                    allow_connection = True
+                # Allow: Internal <-> Critical
+                elif (s1 == internal_segment and s2 == critical_segment) or \
+                     (s1 == critical_segment and s2 == internal_segment):
+                    allow_connection = True
+                
+                if allow_connection:
+                    problem.set_initial_value(can_ssh(p1, p2), True)
+    else:
+        # One fact per linked segment pair; no link starts out blocked
+        for s1, s2 in segment_links:
+            problem.set_initial_value(segment_link(s1, s2), True)
+
+    def ssh_allowed(src, dest):
+        """Expression for 'src can ssh to dest' under the selected encoding."""
+        if connectivity == 'pairwise':
+            return can_ssh(src, dest)
+        s_a = Variable('s_a', segment_type)
+        s_b = Variable('s_b', segment_type)
+        return And(
+            Not(Equals(src, dest)),
+            Exists(And(in_segment(src, s_a), in_segment(dest, s_b), segment_link(s_a, s_b)), s_a, s_b),
+            Not(ssh_blocked(src, dest))
+        )
+
+    def ssh_allowed_between(src, dest, s_src, s_dest):
+        """Same as ssh_allowed, for hosts already known to be in segments s_src and s_dest."""
+        if connectivity == 'pairwise':
+            return can_ssh(src, dest)
+        return And(Not(Equals(src, dest)), segment_link(s_src, s_dest), Not(ssh_blocked(src, dest)))
 
     # --- Starting Values ---
     problem.set_initial_value(at(attacker, pc_dict['pc1']), True)
@@ -222,7 +275,7 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
             )
         )
     )
-    attack_ssh_move.add_precondition(can_ssh(src, dest))
+    attack_ssh_move.add_precondition(ssh_allowed(src, dest))
     attack_ssh_move.add_effect(at(a, src), False)
     attack_ssh_move.add_effect(at(a, dest), True)
     attack_ssh_move.add_effect(logs_cleaned(dest), False)
@@ -269,7 +322,7 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
     a, f, src, dest, s_src, s_dest = fix_update_firewall_ruleset.parameters
     
     fix_update_firewall_ruleset.add_precondition(Equals(a, defender))
-    fix_update_firewall_ruleset.add_precondition(can_ssh(src, dest))
+    fix_update_firewall_ruleset.add_precondition(ssh_allowed_between(src, dest, s_src, s_dest))
     fix_update_firewall_ruleset.add_precondition(in_segment(src, s_src))
     fix_update_firewall_ruleset.add_precondition(in_segment(dest, s_dest))
     fix_update_firewall_ruleset.add_precondition(separated_by(s_src, s_dest, f))
@@ -281,7 +334,7 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
         And(
             in_segment(other_src, s_src),
             in_segment(other_dest, s_dest),
-            can_ssh(other_src, other_dest),
+            ssh_allowed_between(other_src, other_dest, s_src, s_dest),
             Or(
                 Not(Equals(src, other_src)),
                 Not(Equals(dest, other_dest))
@@ -291,7 +344,10 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
     )
     
     fix_update_firewall_ruleset.add_precondition(backup_connection_exists)
-    fix_update_firewall_ruleset.add_effect(can_ssh(src, dest), False)
+    if connectivity == 'pairwise':
+        fix_update_firewall_ruleset.add_effect(can_ssh(src, dest), False)
+    else:
+        fix_update_firewall_ruleset.add_effect(ssh_blocked(src, dest), True)
     problem.add_action(fix_update_firewall_ruleset)
 
     # --- Domain Specific Goals ---
@@ -299,4 +355,60 @@ def setup_domain(problem: Problem, pc_count_by_segment=None):
         "success_conditions": [
             escaped
         ]
+    }
+
+
+def can_extend(base_counts, pc_count_by_segment):
+    """True if setup_domain can derive pc_count_by_segment from a problem built for base_counts."""
+    return (base_counts['external'] == pc_count_by_segment['external']
+            and base_counts['internal'] == pc_count_by_segment['internal']
+            and base_counts['critical'] <= pc_count_by_segment['critical'])
+
+
+def add_critical_pcs(problem: Problem, base_counts, pc_count_by_segment, connectivity='pairwise'):
+    """
+    The delta between two setup_domain results that differ only in the critical count: the new
+    PC objects, their logs_cleaned/static_vulnerable/static_in_segment facts and, for pairwise
+    connectivity, their static_can_ssh rows and columns.
+    """
+    if not can_extend(base_counts, pc_count_by_segment):
+        raise ValueError(f"Cannot derive {pc_count_by_segment} from {base_counts}: only critical PCs can be added")
+
+    vulnerable = problem.fluent('static_vulnerable')
+    in_segment = problem.fluent('static_in_segment')
+    logs_cleaned = problem.fluent('logs_cleaned')
+    pc = problem.user_type('pc')
+    internal_segment = problem.object('internal_segment')
+    critical_segment = problem.object('critical_segment')
+
+    # setup_domain gives every critical PC the CVE of the last internal PC
+    cve = problem.object(f"int_cve{(pc_count_by_segment['internal'] - 1) % 4 + 1}")
+
+    first = base_counts['external'] + base_counts['internal'] + base_counts['critical'] + 1
+    last = first + pc_count_by_segment['critical'] - base_counts['critical'] - 1
+    new_pcs = []
+    for counter in range(first, last + 1):
+        obj = Object(f"pc{counter}", pc)
+        problem.set_initial_value(logs_cleaned(obj), True)
+        problem.set_initial_value(vulnerable(obj, cve), True)
+        problem.set_initial_value(in_segment(obj, critical_segment), True)
+        problem.add_object(obj)
+        new_pcs.append(obj)
+    print(f"Added {len(new_pcs)} critical PCs (pc{first}-pc{last})")
+
+    if connectivity == 'pairwise':
+        # Critical PCs reach each other and the internal segment, in both directions
+        can_ssh = problem.fluent('static_can_ssh')
+        first_internal = pc_count_by_segment['external'] + 1
+        peers = [problem.object(f"pc{k}") for k in range(first_internal, last + 1)]
+        for new in new_pcs:
+            for other in peers:
+                if other != new:
+                    problem.set_initial_value(can_ssh(new, other), True)
+                    problem.set_initial_value(can_ssh(other, new), True)
+
+    return {
+        "success_conditions": [
+            problem.fluent('escaped')
+        ]
     }
\ No newline at end of file
@@ -0,0 +1,182 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from functools import partial
+
+# Long-lived PDDL generator. Spawning translate_independent.py per config pays the
+# unified_planning import every time; this process imports it once and serves generation
+# requests over a Unix socket, one JSON object per line in each direction.
+#
+# Request:  {"domain": "network", "params": {"ext": 2, "int": 2, "crit": 2, "connectivity": "segment"},
+#            "out_dir": "/abs/path"}
+# Response: {"ok": true, "files": {"domain": ..., "problem": ...}, "stats": {"wall_s": ..., "cpu_s": ...}}
+#           {"ok": false, "error": "..."}
+#
+# Network params are translate_independent.py options (underscores for dashes, true for
+# flags, plus an optional raw "argv" list). The other domains take their setup function's
+# keyword arguments. Requests are served one at a time: unified_planning's global
+# environment is not thread-safe.
+#
+# The gridworld domains draw their trace tiles from the global `random`, seeded with RANDOM_SEED
+# when a fresh process imports them. The server reseeds it before every request, so the
+# output is byte-identical to a fresh process's and does not depend on earlier requests.
+
+RANDOM_SEED = 42  # As the gridworld domain modules seed at import
+
+# Host-local by default: with --queue the working directory is shared between machines,
+# and a socket there would be found (but not reachable) by workers on other hosts.
+SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp",
+                           f"generator-{socket.gethostname()}-{os.getuid()}.sock")
+
+
+class GenerationFailed(Exception):
+    pass
+
+
+def _network_argv(params, out_dir):
+    argv = list(params.get("argv", []))
+    for key, value in params.items():
+        if key == "argv" or value is None or value is False:
+            continue
+        flag = "--" + key.replace("_", "-")
+        argv += [flag] if value is True else [flag, str(value)]
+    return argv + ["--out-dir", out_dir]
+
+
+def _generate(domain, params, out_dir):
+    import translate_independent
+    if domain == "network":
+        try:
+            translate_independent.main(_network_argv(params, out_dir))
+        except SystemExit as err:
+            if err.code:
+                raise GenerationFailed(f"translate_independent exited with {err.code}")
+        return
+
+    if domain == "sweeper":
+        from sweeper_gridworld_domain import setup_gridworld_domain as setup_fn
+    elif domain == "environment":
+        from environment_gridworld_domain import setup_domain as setup_fn
+    elif domain == "blocksworld":
+        from blocksworld_domain import setup_blocksworld_domain as setup_fn
+    else:
+        raise GenerationFailed(f"Unknown domain: {domain}")
+    # JSON has no tuples
+    params = {k: tuple(v) if isinstance(v, list) else v for k, v in params.items()}
+    problem = translate_independent.create_problem(partial(setup_fn, **params))
+    translate_independent.write_pddl(problem, out_dir)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.serve_request(request)
+            except Exception as err:
+                response = {"ok": False, "error": f"{type(err).__name__}: {err}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class GeneratorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        self.lock = threading.Lock()
+        self.requests_served = 0
+        super().__init__(socket_path, _Handler)
+
+    def serve_request(self, request):
+        out_dir = request["out_dir"]
+        os.makedirs(out_dir, exist_ok=True)
+        with self.lock, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            random.seed(RANDOM_SEED)
+            wall, cpu = time.perf_counter(), time.process_time()
+            _generate(request.get("domain", "network"), request.get("params", {}), out_dir)
+            stats = {
+                "wall_s": round(time.perf_counter() - wall, 6),
+                "cpu_s": round(time.process_time() - cpu, 6),
+            }
+            self.requests_served += 1
+        return {
+            "ok": True,
+            "files": {
+                "domain": os.path.join(out_dir, "domain.pddl"),
+                "problem": os.path.join(out_dir, "problem.pddl"),
+            },
+            "stats": stats,
+        }
+
+
+class GeneratorClient:
+    """One connection to a generator server; safe to keep open for a whole sweep."""
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.rfile = self.sock.makefile("rb")
+
+    def generate(self, domain, params, out_dir):
+        """Returns the response dict; raises GenerationFailed if the server reports an error."""
+        request = {"domain": domain, "params": params, "out_dir": os.path.abspath(out_dir)}
+        self.sock.sendall((json.dumps(request) + "\n").encode())
+        line = self.rfile.readline()
+        if not line:
+            raise GenerationFailed("Generator server closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise GenerationFailed(response["error"])
+        return response
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+def wait_for_server(socket_path, timeout=60):
+    """Blocks until a server accepts connections on socket_path."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            GeneratorClient(socket_path).close()
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(0.05)
+    raise TimeoutError(f"No generator server on {socket_path} after {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve PDDL generation requests over a Unix socket.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"Socket path (default: {SOCKET_PATH})")
+    args = parser.parse_args()
+
+    # Pay the imports up front rather than on the first request
+    import translate_independent  # noqa: F401
+
+    # Terminating the server (as run_gridsearch does) still removes the socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    with GeneratorServer(args.socket) as server:
+        print(f"Generator server listening on {args.socket}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import random
+import numpy as np
+
+# Shared grid layout for the gridworld domains. Everything is derived as NumPy index arrays
+# (tile k sits at row k // cols, column k % cols) so large grids are cheap to lay out; the
+# domains only turn the arrays into unified_planning objects and facts.
+
+
+def tile_name(i, j):
+    """Unambiguous tile name: t1_11 is (1, 11) and t11_1 is (11, 1)."""
+    return f"t{i}_{j}"
+
+
+class GridLayout:
+    """
+    names:  tile names, indexed by tile id
+    coords: (n, 2) array of (row, col) per tile id
+    edges:  (m, 2) array of directed 4-neighbour edges (src, dest) with walls removed,
+            ordered by source tile and then left, right, up, down like the old nested loops
+    walls:  (k, 2) array of blocked tile pairs (both directions are removed from edges)
+    trace:  array of trace tile ids
+    """
+    __slots__ = ("rows", "cols", "names", "coords", "edges", "walls", "trace")
+
+    def __init__(self, rows, cols, names, coords, edges, walls, trace):
+        self.rows = rows
+        self.cols = cols
+        self.names = names
+        self.coords = coords
+        self.edges = edges
+        self.walls = walls
+        self.trace = trace
+
+    def index(self, i, j):
+        return i * self.cols + j
+
+    def name(self, i, j):
+        return self.names[self.index(i, j)]
+
+
+def build_grid(rows, cols, walls=(), trace_count=0, rng=random):
+    """
+    Lays out a rows x cols grid. walls is an iterable of ((i1, j1), (i2, j2)) tile pairs whose
+    connection is removed. trace_count tiles are drawn with rng.sample, so passing the seeded
+    `random` module picks the same tiles the domains used to pick with random.sample(tiles, k).
+    """
+    n = rows * cols
+    ids = np.arange(n)
+    coords = np.stack([ids // cols, ids % cols], axis=1)
+    names = [tile_name(i, j) for i, j in coords.tolist()]
+
+    # Candidate neighbours per tile in the order left, right, up, down
+    offsets = np.array([-1, 1, -cols, cols])
+    valid = np.stack([
+        coords[:, 1] > 0,
+        coords[:, 1] < cols - 1,
+        coords[:, 0] > 0,
+        coords[:, 0] < rows - 1,
+    ], axis=1)
+    src = np.repeat(ids, 4).reshape(n, 4)
+    dest = ids[:, None] + offsets[None, :]
+    edges = np.stack([src[valid], dest[valid]], axis=1)
+
+    wall_ids = np.array([[a[0] * cols + a[1], b[0] * cols + b[1]] for a, b in walls], dtype=int).reshape(-1, 2)
+    if len(wall_ids):
+        # Encode (src, dest) pairs as single integers to filter both directions at once
+        blocked = np.concatenate([wall_ids[:, 0] * n + wall_ids[:, 1], wall_ids[:, 1] * n + wall_ids[:, 0]])
+        edges = edges[~np.isin(edges[:, 0] * n + edges[:, 1], blocked)]
+
+    trace = np.array(rng.sample(range(n), k=trace_count), dtype=int)
+    return GridLayout(rows, cols, names, coords, edges, wall_ids, trace)
@@ -0,0 +1,419 @@
+from unified_planning.model import Problem
+import argparse
+import json
+import os
+
+# Grounds a problem before it reaches the planner and drops every ground action that can
+# never fire. Static fluents (found by analysis: no action has an effect on them, whatever
+# their name) are evaluated away while grounding, so e.g. attack_exploit on a CVE the host
+# does not have is never even generated. A delete-relaxed reachability fixpoint over all
+# actions of both agents then removes the ground actions no state can enable.
+# The result is written as parameterless PDDL actions that keep their fix_/attack_ prefix.
+#
+# Ground formulas are True, False, ('atom', atom), ('not', atom), ('and', parts) or
+# ('or', parts), where an atom is (fluent name, (object name, ...)).
+
+
+def _conj(parts):
+    flat = []
+    for p in parts:
+        if p is False:
+            return False
+        if p is True:
+            continue
+        for q in (p[1] if p[0] == 'and' else (p,)):
+            if q not in flat:
+                flat.append(q)
+    if not flat:
+        return True
+    return flat[0] if len(flat) == 1 else ('and', tuple(flat))
+
+
+def _disj(parts):
+    flat = []
+    for p in parts:
+        if p is True:
+            return True
+        if p is False:
+            continue
+        for q in (p[1] if p[0] == 'or' else (p,)):
+            if q not in flat:
+                flat.append(q)
+    if not flat:
+        return False
+    return flat[0] if len(flat) == 1 else ('or', tuple(flat))
+
+
+def _negate(f):
+    if f is True or f is False:
+        return not f
+    if f[0] == 'atom':
+        return ('not', f[1])
+    if f[0] == 'not':
+        return ('atom', f[1])
+    if f[0] == 'and':
+        return _disj([_negate(p) for p in f[1]])
+    return _conj([_negate(p) for p in f[1]])
+
+
+def _flatten_and(nodes):
+    out = []
+    for node in nodes:
+        if node.is_and():
+            out.extend(_flatten_and(node.args))
+        else:
+            out.append(node)
+    return out
+
+
+def static_fluents(problem: Problem):
+    """Names of the fluents no action (of either agent) ever changes."""
+    changed = {e.fluent.fluent().name for action in problem.actions for e in action.effects}
+    return {f.name for f in problem.fluents if f.name not in changed}
+
+
+class GroundAction:
+    __slots__ = ("schema", "args", "pre", "effects")
+
+    def __init__(self, schema, args, pre, effects):
+        self.schema = schema
+        self.args = args
+        self.pre = pre
+        self.effects = effects  # [(condition, atom, value)]
+
+    @property
+    def name(self):
+        return "_".join((self.schema,) + self.args)
+
+
+class GroundTask:
+    """
+    Result of grounding: the surviving ground actions, the dynamic initial atoms and goal,
+    plus per-schema counts for the report. static_true holds the true atoms of the static
+    fluents, which were evaluated away.
+    """
+
+    def __init__(self, name, actions, init, goal, static, counts, goal_reachable, static_true=frozenset()):
+        self.name = name
+        self.actions = actions
+        self.init = init
+        self.goal = goal
+        self.static = static
+        self.counts = counts
+        self.goal_reachable = goal_reachable
+        self.static_true = static_true
+
+
+class Grounder:
+    def __init__(self, problem: Problem):
+        self.problem = problem
+        self.static = static_fluents(problem)
+        self.true_atoms = {
+            (fluent_expr.fluent().name, tuple(a.object().name for a in fluent_expr.args))
+            for fluent_expr, val in problem.initial_values.items()
+            if val.is_bool_constant() and val.bool_constant_value()
+        }
+        self._objects = {}
+        self._names = {}
+
+    def objects_of(self, typ):
+        if typ not in self._objects:
+            self._objects[typ] = [o.name for o in self.problem.all_objects if o.type.is_subtype(typ)]
+        return self._objects[typ]
+
+    def _free_names(self, node):
+        """Parameter and variable names used in a node (cached per node)."""
+        if node not in self._names:
+            if node.is_parameter_exp():
+                names = {node.parameter().name}
+            elif node.is_variable_exp():
+                names = {node.variable().name}
+            else:
+                names = set()
+                for arg in node.args:
+                    names |= self._free_names(arg)
+            self._names[node] = names
+        return self._names[node]
+
+    def _resolve(self, node, binding):
+        if node.is_parameter_exp():
+            return binding[node.parameter().name]
+        if node.is_variable_exp():
+            return binding[node.variable().name]
+        return node.object().name
+
+    def atom(self, node, binding):
+        return (node.fluent().name, tuple(self._resolve(a, binding) for a in node.args))
+
+    def ground(self, node, binding):
+        """Grounds an FNode under binding, evaluating static atoms and equalities away."""
+        if node.is_bool_constant():
+            return node.bool_constant_value()
+        if node.is_fluent_exp():
+            atom = self.atom(node, binding)
+            if atom[0] in self.static:
+                return atom in self.true_atoms
+            return ('atom', atom)
+        if node.is_equals():
+            return self._resolve(node.arg(0), binding) == self._resolve(node.arg(1), binding)
+        if node.is_and():
+            return _conj([self.ground(a, binding) for a in node.args])
+        if node.is_or():
+            return _disj([self.ground(a, binding) for a in node.args])
+        if node.is_not():
+            return _negate(self.ground(node.arg(0), binding))
+        if node.is_implies():
+            return _disj([_negate(self.ground(node.arg(0), binding)), self.ground(node.arg(1), binding)])
+        if node.is_exists():
+            variables = [(v.name, v.type) for v in node.variables()]
+            return _disj([_conj(residual) for _, residual in
+                          self.bindings(variables, _flatten_and([node.arg(0)]), binding)])
+        if node.is_forall():
+            variables = [(v.name, v.type) for v in node.variables()]
+            negated = [_negate(_conj(residual)) for _, residual in
+                       self.bindings(variables, [], binding, body=node.arg(0))]
+            return _conj(negated)
+        raise ValueError(f"Cannot ground expression: {node}")
+
+    def bindings(self, variables, conjuncts, binding, body=None):
+        """
+        Backtracks over the objects for `variables` (extending binding). Each conjunct is
+        grounded as soon as its last variable is bound and prunes the branch if it is
+        statically false. Yields (binding, residual conjuncts) for the surviving branches.
+        With body (used for forall) the body is negated and treated as the only conjunct.
+        """
+        if body is not None:
+            conjuncts = [body]
+        index = {name: k for k, (name, _) in enumerate(variables)}
+        schedule = [[] for _ in range(len(variables) + 1)]
+        for c in conjuncts:
+            used = [index[n] for n in self._free_names(c) if n in index]
+            schedule[max(used) + 1 if used else 0].append(c)
+
+        def rec(k, binding, residual):
+            for c in schedule[k]:
+                g = self.ground(c, binding)
+                if body is not None:
+                    g = _negate(g)
+                if g is False:
+                    return
+                if g is not True:
+                    residual = residual + [g]
+            if k == len(variables):
+                yield binding, residual
+                return
+            name, typ = variables[k]
+            for obj in self.objects_of(typ):
+                yield from rec(k + 1, {**binding, name: obj}, residual)
+
+        yield from rec(0, dict(binding), [])
+
+    def ground_action(self, action):
+        params = [(p.name, p.type) for p in action.parameters]
+        for binding, residual in self.bindings(params, _flatten_and(action.preconditions), {}):
+            effects = []
+            for e in action.effects:
+                cond = self.ground(e.condition, binding)
+                if cond is not False:
+                    effects.append((cond, self.atom(e.fluent, binding), e.value.bool_constant_value()))
+            if effects:
+                yield GroundAction(action.name, tuple(binding[name] for name, _ in params),
+                                   _conj(residual), effects)
+
+    def type_consistent_count(self, action):
+        n = 1
+        for p in action.parameters:
+            n *= len(self.objects_of(p.type))
+        return n
+
+
+def _holds(f, pos, init, deleted):
+    """Delete-relaxed truth: atoms once added stay true, atoms once deleted may be false."""
+    if f is True or f is False:
+        return f
+    if f[0] == 'atom':
+        return f[1] in pos
+    if f[0] == 'not':
+        return f[1] not in init or f[1] in deleted
+    if f[0] == 'and':
+        return all(_holds(p, pos, init, deleted) for p in f[1])
+    return any(_holds(p, pos, init, deleted) for p in f[1])
+
+
+def relaxed_reachable(actions, init, goal=True):
+    """
+    Delete-relaxed fixpoint over all actions. Returns (reachable actions in input order,
+    whether the goal is relaxed-reachable).
+    """
+    pos, deleted = set(init), set()
+    reached = [False] * len(actions)
+    changed = True
+    while changed:
+        changed = False
+        for idx, action in enumerate(actions):
+            if not reached[idx]:
+                if not _holds(action.pre, pos, init, deleted):
+                    continue
+                reached[idx] = True
+                changed = True
+            # Conditional effects may only become enabled later, so reached actions are revisited
+            for cond, atom, value in action.effects:
+                target = pos if value else deleted
+                if atom not in target and _holds(cond, pos, init, deleted):
+                    target.add(atom)
+                    changed = True
+    return [a for a, r in zip(actions, reached) if r], _holds(goal, pos, init, deleted)
+
+
+def ground(problem: Problem):
+    """Grounds and prunes a problem; returns a GroundTask."""
+    g = Grounder(problem)
+    init = {atom for atom in g.true_atoms if atom[0] not in g.static}
+    goal = _conj([g.ground(goal, {}) for goal in problem.goals])
+
+    counts = {}
+    candidates = []
+    for action in problem.actions:
+        grounded = list(g.ground_action(action))
+        counts[action.name] = {
+            "type_consistent": g.type_consistent_count(action),
+            "after_static": len(grounded),
+        }
+        candidates.extend(grounded)
+
+    actions, goal_reachable = relaxed_reachable(candidates, init, goal)
+    for action in problem.actions:
+        counts[action.name]["after_reachability"] = sum(1 for a in actions if a.schema == action.name)
+    name = problem.name[:-len("-problem")] if problem.name.endswith("-problem") else problem.name
+    static_true = frozenset(atom for atom in g.true_atoms if atom[0] in g.static)
+    return GroundTask(name, actions, init, goal, sorted(g.static), counts, goal_reachable, static_true)
+
+
+def _atom_str(atom):
+    name, args = atom
+    return f"({name} {' '.join(args)})" if args else f"({name})"
+
+
+def _formula_str(f):
+    if f is True:
+        return "(and)"
+    if f is False:
+        return "(or)"
+    if f[0] == 'atom':
+        return _atom_str(f[1])
+    if f[0] == 'not':
+        return f"(not {_atom_str(f[1])})"
+    return f"({f[0]} {' '.join(_formula_str(p) for p in f[1])})"
+
+
+def _atoms_of(f, out):
+    if f is True or f is False:
+        return out
+    if f[0] in ('atom', 'not'):
+        out.add(f[1])
+    else:
+        for p in f[1]:
+            _atoms_of(p, out)
+    return out
+
+
+def _effect_str(cond, atom, value):
+    literal = _atom_str(atom) if value else f"(not {_atom_str(atom)})"
+    return literal if cond is True else f"(when {_formula_str(cond)} {literal})"
+
+
+def write_domain(task, out):
+    atoms = set(task.init)
+    _atoms_of(task.goal, atoms)
+    for a in task.actions:
+        _atoms_of(a.pre, atoms)
+        for cond, atom, _ in a.effects:
+            _atoms_of(cond, atoms)
+            atoms.add(atom)
+    arity = {}
+    for name, args in atoms:
+        arity[name] = len(args)
+    constants = sorted({o for _, args in atoms for o in args})
+    conditional = any(cond is not True for a in task.actions for cond, _, _ in a.effects)
+
+    out.write(f"(define (domain {task.name}-grounded)\n")
+    out.write(" (:requirements :strips :negative-preconditions :disjunctive-preconditions"
+              f"{' :conditional-effects' if conditional else ''})\n")
+    if constants:
+        out.write(f" (:constants {' '.join(constants)})\n")
+    predicates = " ".join(
+        f"({name}{''.join(f' ?x{k}' for k in range(n))})" for name, n in sorted(arity.items()))
+    out.write(f" (:predicates {predicates})\n")
+
+    seen = set()
+    for a in task.actions:
+        name = a.name
+        while name in seen:
+            name += "_"
+        seen.add(name)
+        out.write(f" (:action {name}\n  :parameters ()\n")
+        if a.pre is not True:
+            out.write(f"  :precondition {_formula_str(a.pre)}\n")
+        out.write(f"  :effect (and {' '.join(_effect_str(*e) for e in a.effects)}))\n")
+    out.write(")\n")
+
+
+def write_problem(task, out):
+    out.write(f"(define (problem {task.name}-grounded-problem)\n")
+    out.write(f" (:domain {task.name}-grounded)\n")
+    out.write(f" (:init {' '.join(_atom_str(atom) for atom in sorted(task.init))})\n")
+    out.write(f" (:goal {_formula_str(task.goal)})\n")
+    out.write(")\n")
+
+
+def write_pddl(task, out_dir="."):
+    with open(os.path.join(out_dir, "domain.pddl"), "w") as f:
+        write_domain(task, f)
+    with open(os.path.join(out_dir, "problem.pddl"), "w") as f:
+        write_problem(task, f)
+
+
+def report(task):
+    total = {key: sum(c[key] for c in task.counts.values())
+             for key in ("type_consistent", "after_static", "after_reachability")}
+    return {
+        "static_fluents": task.static,
+        "actions": task.counts,
+        "total": total,
+        "removed": total["type_consistent"] - total["after_reachability"],
+        "goal_relaxed_reachable": task.goal_reachable,
+    }
+
+
+def write_report(path, task):
+    with open(path, "w") as f:
+        json.dump(report(task), f, indent=2)
+
+
+def main():
+    from unified_planning.io import PDDLReader
+
+    parser = argparse.ArgumentParser(description="Ground a PDDL task and prune unreachable ground actions.")
+    parser.add_argument("domain")
+    parser.add_argument("problem")
+    parser.add_argument("--out-dir", default="grounded", help="Where to write the grounded PDDL and grounding.json")
+    args = parser.parse_args()
+
+    problem = PDDLReader().parse_problem(args.domain, args.problem)
+    task = ground(problem)
+    os.makedirs(args.out_dir, exist_ok=True)
+    write_pddl(task, args.out_dir)
+    write_report(os.path.join(args.out_dir, "grounding.json"), task)
+
+    for name, c in task.counts.items():
+        print(f"{name:<30} {c['type_consistent']:>8} -> {c['after_static']:>7} static -> "
+              f"{c['after_reachability']:>7} reachable")
+    summary = report(task)
+    print(f"Removed {summary['removed']} of {summary['total']['type_consistent']} type-consistent ground actions"
+          f" (static fluents: {', '.join(task.static)})")
+    if not task.goal_reachable:
+        print("Goal is not reachable even under the delete relaxation.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+from unified_planning.shortcuts import *
+from unified_planning.model import Problem
+from functools import partial
+import argparse
+import contextlib
+import io
+import json
+import os
+
+# Hosts in the same segment with the same CVE and the same can_ssh neighbourhood are
+# interchangeable for the planner. This module finds those equivalence classes on a
+# generated problem, can collapse every class to one representative, and reports how
+# much each class contributes to the grounded task.
+
+
+def _objects_in(node, out):
+    """Collects every object constant appearing in an FNode."""
+    if node.is_object_exp():
+        out.add(node.object())
+    for arg in node.args:
+        _objects_in(arg, out)
+    return out
+
+
+def _action_constants(problem):
+    constants = set()
+    for action in problem.actions:
+        for p in action.preconditions:
+            _objects_in(p, constants)
+        for e in action.effects:
+            _objects_in(e.fluent, constants)
+            _objects_in(e.value, constants)
+            _objects_in(e.condition, constants)
+    return constants
+
+
+def _atoms(problem):
+    """
+    True initial facts and goal atoms as (predicate, (object, ...)) tuples. Goal atoms get
+    a 'goal:' prefix so that a host with a restore goal is told apart from one without.
+    """
+    atoms = []
+    for fluent_expr, val in problem.initial_values.items():
+        if val.is_bool_constant() and val.bool_constant_value():
+            atoms.append((fluent_expr.fluent().name, tuple(a.object() for a in fluent_expr.args)))
+    for goal in problem.goals:
+        for g in (goal.args if goal.is_and() else [goal]):
+            if g.is_fluent_exp():
+                atoms.append(("goal:" + g.fluent().name, tuple(a.object() for a in g.args)))
+            else:
+                # Any other goal shape pins the objects it mentions
+                for obj in _objects_in(g, set()):
+                    atoms.append(("goal:" + str(g), (obj,)))
+    return atoms
+
+
+def _refine(objects, atoms, colors):
+    """Colour refinement: split objects by the colours of the atoms they appear in until stable."""
+    incidence = {o: [] for o in objects}
+    for pred, args in atoms:
+        for pos, obj in enumerate(args):
+            incidence[obj].append((pred, pos, args))
+
+    while True:
+        signatures = {}
+        for o in objects:
+            neighbourhood = sorted(
+                (pred, pos, tuple(colors[a] for a in args)) for pred, pos, args in incidence[o]
+            )
+            signatures[o] = (colors[o], tuple(neighbourhood))
+        # Re-number the signatures so colours stay small
+        numbering = {sig: n for n, sig in enumerate(sorted(set(signatures.values()), key=repr))}
+        new_colors = {o: numbering[signatures[o]] for o in objects}
+        if len(set(new_colors.values())) == len(set(colors.values())):
+            return new_colors
+        colors = new_colors
+
+
+def _is_swap_automorphism(atom_set, a, b):
+    """True if exchanging objects a and b maps the atom set onto itself."""
+    def swap(o):
+        return b if o == a else a if o == b else o
+    for pred, args in atom_set:
+        if a in args or b in args:
+            if (pred, tuple(swap(o) for o in args)) not in atom_set:
+                return False
+    return True
+
+
+def host_classes(problem: Problem, host_type_name='host'):
+    """
+    Returns the host equivalence classes of a problem as lists of host Objects (in object
+    order, representative first). Colour refinement proposes the classes; every member is
+    then checked to be swappable with its representative, so the classes are exact.
+    Hosts the actions refer to by name are never merged.
+    """
+    host_type = problem.user_type(host_type_name)
+    objects = list(problem.all_objects)
+    hosts = [o for o in objects if o.type.is_subtype(host_type)]
+    pinned = _action_constants(problem)
+
+    atoms = _atoms(problem)
+    colors = {o: ("pinned", o.name) if o in pinned else ("type", o.type.name) for o in objects}
+    colors = _refine(objects, atoms, colors)
+
+    candidates = {}
+    for h in hosts:
+        candidates.setdefault(colors[h], []).append(h)
+
+    atom_set = set(atoms)
+    classes = []
+    for members in candidates.values():
+        while members:
+            rep, rest = members[0], members[1:]
+            cls = [rep] + [m for m in rest if _is_swap_automorphism(atom_set, rep, m)]
+            classes.append(cls)
+            members = [m for m in rest if m not in cls]
+    classes.sort(key=lambda cls: objects.index(cls[0]))
+    return classes
+
+
+def _grounding_count(problem, objects):
+    """Number of type-consistent groundings of all actions over the given objects."""
+    total = 0
+    for action in problem.actions:
+        n = 1
+        for param in action.parameters:
+            n *= sum(1 for o in objects if o.type.is_subtype(param.type))
+        total += n
+    return total
+
+
+def symmetry_report(problem: Problem, classes):
+    """
+    Per class: its members, the multiplicity, and how many objects, initial facts, goals and
+    type-consistent action groundings collapsing that class alone removes.
+    """
+    objects = list(problem.all_objects)
+    atoms = _atoms(problem)
+    full_groundings = _grounding_count(problem, objects)
+    report = []
+    for cls in classes:
+        removed = set(cls[1:])
+        facts_removed = sum(1 for pred, args in atoms
+                            if not pred.startswith("goal:") and removed.intersection(args))
+        goals_removed = sum(1 for pred, args in atoms
+                            if pred.startswith("goal:") and removed.intersection(args))
+        groundings = _grounding_count(problem, [o for o in objects if o not in removed])
+        report.append({
+            "representative": cls[0].name,
+            "members": [h.name for h in cls],
+            "multiplicity": len(cls),
+            "objects_removed": len(removed),
+            "initial_facts_removed": facts_removed,
+            "goals_removed": goals_removed,
+            "action_groundings_removed": full_groundings - groundings,
+        })
+    return report
+
+
+def reduce_problem(problem: Problem, classes):
+    """
+    Builds a copy of the problem that keeps one representative per host class and drops
+    the other members together with their facts and goals. Returns (reduced_problem,
+    multiplicity), where multiplicity maps each representative's name to its class size.
+    The reduced task treats a class as a single host: a fix on the representative stands
+    for the same fix on every member, and links between members of a class disappear.
+    """
+    removed = {h for cls in classes for h in cls[1:]}
+
+    reduced = Problem(problem.name)
+    for fluent in problem.fluents:
+        default = problem.fluents_defaults.get(fluent)
+        if default is None:
+            reduced.add_fluent(fluent)
+        else:
+            reduced.add_fluent(fluent, default_initial_value=default)
+    for obj in problem.all_objects:
+        if obj not in removed:
+            reduced.add_object(obj)
+    for action in problem.actions:
+        reduced.add_action(action)
+    for fluent_expr, val in problem.explicit_initial_values.items():
+        if not removed.intersection(a.object() for a in fluent_expr.args):
+            reduced.set_initial_value(fluent_expr, val)
+    for goal in problem.goals:
+        parts = goal.args if goal.is_and() else [goal]
+        for g in parts:
+            if not removed.intersection(_objects_in(g, set())):
+                reduced.add_goal(g)
+
+    multiplicity = {cls[0].name: len(cls) for cls in classes}
+    return reduced, multiplicity
+
+
+def write_report(path, classes, report, multiplicity=None):
+    with open(path, "w") as f:
+        json.dump({
+            "classes": len(classes),
+            "hosts": sum(len(cls) for cls in classes),
+            "multiplicity": multiplicity or {cls[0].name: len(cls) for cls in classes},
+            "per_class": report,
+        }, f, indent=2)
+
+
+def main():
+    from final_gridworld_domain import setup_domain, CONNECTIVITY_MODES
+    from translate_independent import create_problem
+
+    parser = argparse.ArgumentParser(description="Report host equivalence classes of the network domain.")
+    parser.add_argument("--ext", type=int, default=7)
+    parser.add_argument("--int", type=int, dest="int_", default=7)
+    parser.add_argument("--crit", type=int, default=7)
+    parser.add_argument("--connectivity", choices=CONNECTIVITY_MODES, default="pairwise")
+    args = parser.parse_args()
+
+    counts = {'external': args.ext, 'internal': args.int_, 'critical': args.crit}
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = create_problem(partial(setup_domain, pc_count_by_segment=counts,
+                                         connectivity=args.connectivity))
+
+    classes = host_classes(problem)
+    for entry in symmetry_report(problem, classes):
+        print(f"{entry['representative']:>6} x{entry['multiplicity']:<3} "
+              f"-{entry['initial_facts_removed']} facts, -{entry['goals_removed']} goals, "
+              f"-{entry['action_groundings_removed']} groundings | {' '.join(entry['members'])}")
+    print(f"{sum(len(cls) for cls in classes)} hosts in {len(classes)} classes")
+
+
+if __name__ == "__main__":
+    main()
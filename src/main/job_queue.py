@@ -0,0 +1,233 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# Job queue for running one sweep on several machines that share a directory (e.g. an
+# NFS home). The queue is a single SQLite file in that directory; every worker claims a
+# config with a lease, keeps the lease alive with heartbeats while the planner runs and
+# reports the result back. Leases of workers that die run out and their jobs go back to
+# the queue. The coordinator (run_gridsearch.py --coordinate) fills the queue and merges
+# finished jobs into the usual CSV and journal.
+#
+# SQLite runs in rollback-journal mode: WAL needs shared memory, which network
+# filesystems do not provide. Every state change is one short IMMEDIATE transaction.
+# Lease expiry compares wall clocks of different machines, so they should run NTP;
+# LEASE_SECONDS is generous compared to HEARTBEAT_INTERVAL to absorb some skew.
+
+QUEUE_FILE = "queue.sqlite"
+LEASE_SECONDS = 180
+HEARTBEAT_INTERVAL = 30
+MAX_ATTEMPTS = 3  # Claims per job before it is given up as failed
+BUSY_TIMEOUT = 120  # Seconds to wait for another process's transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    ext INTEGER NOT NULL,
+    int INTEGER NOT NULL,
+    crit INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    timeout INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',  -- queued, leased, done, failed, skipped
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    heartbeat REAL,
+    event TEXT,        -- journal event: done, timeout, memout, skipped_dominated; for failed jobs why
+                       -- the last attempt failed: gen_error or lease_expired
+    result TEXT,       -- JSON: the journal fields of the result (row, blocker, ...)
+    finished REAL,
+    merged INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ext, int, crit)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, priority);
+CREATE INDEX IF NOT EXISTS jobs_merge ON jobs (merged, state);
+"""
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Job:
+    __slots__ = ("config", "timeout", "attempts")
+
+    def __init__(self, config, timeout, attempts):
+        self.config = config
+        self.timeout = timeout
+        self.attempts = attempts
+
+
+class JobQueue:
+    """One connection to the queue in directory `path`; create one per process."""
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = os.path.join(path, QUEUE_FILE)
+        self.db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _transaction(self):
+        return _Immediate(self.db)
+
+    def enqueue(self, configs, timeout):
+        """
+        Adds configs in priority order. A config that already has a merged result (or gave up)
+        is queued again with the new budget; queued, leased and unmerged jobs are left alone.
+        """
+        with self._transaction():
+            for priority, (e, i, c) in enumerate(configs):
+                self.db.execute(
+                    "INSERT INTO jobs (ext, int, crit, priority, timeout) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (ext, int, crit) DO UPDATE SET state = 'queued', priority = excluded.priority, "
+                    "timeout = excluded.timeout, attempts = 0, worker = NULL, lease_expires = NULL, "
+                    "event = NULL, result = NULL, finished = NULL, merged = 0 "
+                    "WHERE state IN ('done', 'failed', 'skipped') AND merged = 1",
+                    (e, i, c, priority, timeout))
+
+    def claim(self, worker, lease=LEASE_SECONDS):
+        """Leases the next queued job (or one whose lease ran out); None if there is none."""
+        now = time.time()
+        with self._transaction():
+            row = self.db.execute(
+                "SELECT ext, int, crit, timeout, attempts FROM jobs "
+                "WHERE state = 'queued' OR (state = 'leased' AND lease_expires < ? AND attempts < ?) "
+                "ORDER BY priority LIMIT 1", (now, MAX_ATTEMPTS)).fetchone()
+            if row is None:
+                return None
+            e, i, c, timeout, attempts = row
+            self.db.execute(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, heartbeat = ?, "
+                "attempts = attempts + 1 WHERE ext = ? AND int = ? AND crit = ?",
+                (worker, now + lease, now, e, i, c))
+        return Job((e, i, c), timeout, attempts + 1)
+
+    def heartbeat(self, config, worker, lease=LEASE_SECONDS):
+        """Extends the lease. False if the worker no longer holds it (it expired and was re-claimed)."""
+        now = time.time()
+        with self._transaction():
+            cur = self.db.execute(
+                "UPDATE jobs SET lease_expires = ?, heartbeat = ? "
+                "WHERE ext = ? AND int = ? AND crit = ? AND state = 'leased' AND worker = ?",
+                (now + lease, now, *config, worker))
+        return cur.rowcount == 1
+
+    def complete(self, config, worker, event, fields):
+        """
+        Stores a result. The first result for a job wins, so a worker whose lease expired
+        while it kept running cannot overwrite the result of the worker that took over.
+        """
+        with self._transaction():
+            cur = self.db.execute(
+                "UPDATE jobs SET state = 'done', worker = ?, event = ?, result = ?, finished = ?, "
+                "lease_expires = NULL WHERE ext = ? AND int = ? AND crit = ? AND state IN ('queued', 'leased')",
+                (worker, event, json.dumps(fields), time.time(), *config))
+        return cur.rowcount == 1
+
+    def release(self, config, worker, reason="gen_error"):
+        """
+        Gives a job back because its run failed for `reason` (gen_error, or lease_expired for a
+        worker that stops without a result); after MAX_ATTEMPTS claims it is marked failed.
+        """
+        with self._transaction():
+            self.db.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "worker = NULL, lease_expires = NULL, event = ?, finished = ? "
+                "WHERE ext = ? AND int = ? AND crit = ? AND state = 'leased' AND worker = ?",
+                (MAX_ATTEMPTS, reason, time.time(), *config, worker))
+
+    def skip(self, config, fields):
+        """Marks a still-queued job as skipped (dominance pruning); False if it already started."""
+        with self._transaction():
+            cur = self.db.execute(
+                "UPDATE jobs SET state = 'skipped', event = 'skipped_dominated', result = ?, finished = ? "
+                "WHERE ext = ? AND int = ? AND crit = ? AND state = 'queued'",
+                (json.dumps(fields), time.time(), *config))
+        return cur.rowcount == 1
+
+    def requeue_expired(self):
+        """Puts jobs with an expired lease back in the queue; returns how many."""
+        now = time.time()
+        with self._transaction():
+            cur = self.db.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "worker = NULL, lease_expires = NULL, event = 'lease_expired', finished = ? "
+                "WHERE state = 'leased' AND lease_expires < ?",
+                (MAX_ATTEMPTS, now, now))
+        return cur.rowcount
+
+    def unmerged(self):
+        """
+        Finished, failed or skipped jobs the coordinator has not merged yet: [(config, event, fields)].
+        A failed job's event says why its last attempt failed (queues from before that was
+        recorded count as gen_error).
+        """
+        rows = self.db.execute(
+            "SELECT ext, int, crit, state, event, result FROM jobs "
+            "WHERE merged = 0 AND state IN ('done', 'failed', 'skipped') ORDER BY finished").fetchall()
+        return [((e, i, c), (event or "gen_error") if state == "failed" else event, json.loads(result or "{}"))
+                for e, i, c, state, event, result in rows]
+
+    def mark_merged(self, config):
+        with self._transaction():
+            self.db.execute("UPDATE jobs SET merged = 1 WHERE ext = ? AND int = ? AND crit = ?", config)
+
+    def counts(self):
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def workers(self):
+        """Leased jobs per worker with the age of their last heartbeat."""
+        now = time.time()
+        return [(worker, (e, i, c), round(now - beat, 1)) for worker, e, i, c, beat in self.db.execute(
+            "SELECT worker, ext, int, crit, heartbeat FROM jobs WHERE state = 'leased' ORDER BY worker")]
+
+    def unfinished(self):
+        return self.db.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+
+
+class _Immediate:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on errors."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class Heartbeat(threading.Thread):
+    """Renews a job's lease every `interval` seconds until stopped; `lost` is set if it is taken away."""
+
+    def __init__(self, queue_dir, config, worker, interval=HEARTBEAT_INTERVAL, lease=LEASE_SECONDS):
+        super().__init__(daemon=True)
+        self.queue_dir = queue_dir
+        self.config = config
+        self.worker = worker
+        self.interval = interval
+        self.lease = lease
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # sqlite3 connections belong to the thread that made them
+        queue = JobQueue(self.queue_dir)
+        try:
+            while not self._stop_event.wait(self.interval):
+                if not queue.heartbeat(self.config, self.worker, self.lease):
+                    self.lost = True
+                    return
+        finally:
+            queue.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
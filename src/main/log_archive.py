@@ -0,0 +1,230 @@
+import argparse
+import csv
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import result_store
+
+# Archive of planner output. run_gridsearch.py gzips the log of every planner run into
+# ARCHIVE_DIR/ext{e}_int{i}_crit{c}/{time}_{status}.log.gz, so logs survive the workspace
+# being wiped by the next run of the config and reruns do not overwrite each other.
+#
+# `python log_archive.py reparse` then extracts metrics from the archive in parallel
+# without re-running anything. An extractor is a regex with one group plus how its
+# matches combine (first, last, max, sum, count, flag). Logs are streamed in blocks of
+# whole lines (CHUNK_SIZE) rather than read whole, and each precompiled extractor scans
+# a block in one findall, which is far cheaper than a Python loop over the lines. New metrics are added
+# with --extract NAME=REGEX[@MODE] and written to METRICS_CSV (and the result store).
+
+ARCHIVE_DIR = "planner_logs"
+METRICS_CSV = "log_metrics.csv"
+MODES = ("first", "last", "max", "sum", "count", "flag")
+CHUNK_SIZE = 1 << 20
+
+_LOG_NAME_RE = re.compile(r"(\d+)_(\w+)\.log\.gz$")
+_CONFIG_DIR_RE = re.compile(r"ext(\d+)_int(\d+)_crit(\d+)$")
+
+
+def default_extractors():
+    """The metrics run_gridsearch parses, plus ones it does not keep. {name: (pattern, mode)}"""
+    import run_gridsearch
+    return {
+        "translator": (run_gridsearch.TRANSLATOR_RE.pattern, "first"),
+        "preprocessor": (run_gridsearch.PREPROCESSOR_RE.pattern, "first"),
+        "search": (run_gridsearch.SEARCH_RE.pattern, "first"),
+        "total_wall": (run_gridsearch.TOTAL_RE.pattern, "last"),
+        "solved": (r"Pareto-frontier size:", "flag"),
+        "pareto_size": (r"Pareto-frontier size:\s*(\d+)", "last"),
+        "expanded": (r"Expanded (\d+) state", "last"),
+        "peak_memory_kb": (r"Peak memory:\s*(\d+) KB", "max"),
+        "out_of_memory": ("|".join(re.escape(m) for m in run_gridsearch.MEMOUT_MARKERS), "flag"),
+    }
+
+
+def archive(config, log_path, status, archive_dir=ARCHIVE_DIR):
+    """Gzips a finished run's log into the config's archive directory; returns the archive path."""
+    e, i, c = config
+    config_dir = os.path.join(archive_dir, f"ext{e}_int{i}_crit{c}")
+    os.makedirs(config_dir, exist_ok=True)
+    path = os.path.join(config_dir, f"{time.time_ns()}_{status}.log.gz")
+    tmp_fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=config_dir)
+    with open(log_path, "rb") as src, os.fdopen(tmp_fd, "wb") as raw, \
+            gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp_path, path)
+    return path
+
+
+def archived_logs(archive_dir=ARCHIVE_DIR, latest=True):
+    """[(config, status, path)] of the archive, only the newest log per config if latest."""
+    logs = []
+    if not os.path.isdir(archive_dir):
+        return logs
+    for entry in sorted(os.listdir(archive_dir)):
+        match = _CONFIG_DIR_RE.match(entry)
+        if not match:
+            continue
+        config = tuple(int(x) for x in match.groups())
+        runs = sorted((int(m.group(1)), m.group(2), name) for name in os.listdir(os.path.join(archive_dir, entry))
+                      if (m := _LOG_NAME_RE.match(name)))
+        for _, status, name in runs[-1:] if latest else runs:
+            logs.append((config, status, os.path.join(archive_dir, entry, name)))
+    return logs
+
+
+class Extractors:
+    """Compiled extractors; parse() folds them over a log stream."""
+
+    def __init__(self, specs):
+        self.extractors = []
+        for name, (pattern, mode) in specs.items():
+            if mode not in MODES:
+                raise ValueError(f"Unknown mode for {name}: {mode}")
+            regex = re.compile(pattern, re.MULTILINE)
+            if regex.groups != (0 if mode in ("count", "flag") else 1):
+                raise ValueError(f"{name}: {mode} extractors need {'no' if mode in ('count', 'flag') else 'one'} group")
+            self.extractors.append((name, mode, regex))
+
+    def parse(self, stream, chunk_size=CHUNK_SIZE):
+        values = {name: 0 if mode == "count" else False if mode == "flag" else None
+                  for name, mode, _ in self.extractors}
+        rest = ""
+        while data := stream.read(chunk_size):
+            # Only whole lines are scanned; a partial last line goes with the next block
+            end = data.rfind("\n") + 1
+            if not end:
+                rest += data
+                continue
+            self._fold(rest + data[:end], values)
+            rest = data[end:]
+        if rest:
+            self._fold(rest, values)
+        return values
+
+    def _fold(self, block, values):
+        for name, mode, regex in self.extractors:
+            if mode == "flag":
+                values[name] = values[name] or regex.search(block) is not None
+            elif mode == "first":
+                if values[name] is None and (match := regex.search(block)):
+                    values[name] = float(match.group(1))
+            else:
+                found = regex.findall(block)
+                if not found:
+                    continue
+                if mode == "count":
+                    values[name] += len(found)
+                elif mode == "last":
+                    values[name] = float(found[-1])
+                elif mode == "max":
+                    value = max(map(float, found))
+                    values[name] = value if values[name] is None else max(values[name], value)
+                else:
+                    values[name] = (values[name] or 0.0) + sum(map(float, found))
+
+
+def parse_log(path, extractors):
+    with gzip.open(path, "rt", errors="replace") as f:
+        return extractors.parse(f)
+
+
+def _parse_job(job):
+    # Module-level so the pool can pickle it; each worker compiles the extractors once
+    global _worker_extractors
+    specs, path = job
+    if _worker_extractors is None or _worker_extractors[0] != specs:
+        _worker_extractors = (specs, Extractors(dict(specs)))
+    return parse_log(path, _worker_extractors[1])
+
+
+_worker_extractors = None
+
+
+def reparse(logs, specs, jobs=None):
+    """Metrics of every (config, status, path) in logs, in order: [{name: value}]."""
+    frozen = tuple(specs.items())
+    if jobs == 1:
+        extractors = Extractors(specs)
+        return [parse_log(path, extractors) for _, _, path in logs]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_parse_job, [(frozen, path) for _, _, path in logs],
+                             chunksize=max(1, len(logs) // (4 * (jobs or os.cpu_count() or 1)))))
+
+
+def import_workspaces(runs_dir, archive_dir=ARCHIVE_DIR):
+    """Archives the planner.log of every workspace in runs_dir (from sweeps before the archive)."""
+    count = 0
+    for entry in sorted(os.listdir(runs_dir)):
+        match = _CONFIG_DIR_RE.match(entry)
+        log_path = os.path.join(runs_dir, entry, "planner.log")
+        if match and os.path.isfile(log_path):
+            archive(tuple(int(x) for x in match.groups()), log_path, "imported", archive_dir)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive of planner logs and batch re-parsing.")
+    parser.add_argument("--archive", default=ARCHIVE_DIR, help=f"Archive directory (default: {ARCHIVE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Archive the planner.log of existing gridsearch workspaces")
+    imp.add_argument("runs_dir", nargs="?", default="gridsearch_runs")
+    rep = sub.add_parser("reparse", help="Extract metrics from the archived logs")
+    rep.add_argument("--extract", action="append", default=[], metavar="NAME=REGEX[@MODE]",
+                     help=f"Additional metric; the regex has one group unless MODE is count/flag "
+                          f"(modes: {', '.join(MODES)}; default last)")
+    rep.add_argument("--only", action="append", metavar="NAME", help="Only these metrics (repeatable)")
+    rep.add_argument("--all", action="store_true", help="Every archived run, not just the newest per config")
+    rep.add_argument("--jobs", type=int, help="Parallel parsers (default: one per CPU)")
+    rep.add_argument("--out", default=METRICS_CSV, help=f"Output CSV (default: {METRICS_CSV})")
+    rep.add_argument("--store", nargs="?", const=result_store.STORE_FILE, metavar="DB",
+                     help="Also back-fill the metrics into the result store")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(f"Archived {import_workspaces(args.runs_dir, args.archive)} logs from {args.runs_dir}")
+        return
+
+    specs = default_extractors()
+    for item in args.extract:
+        name, pattern = item.split("=", 1)
+        mode = "last"
+        if "@" in pattern and pattern.rsplit("@", 1)[1] in MODES:
+            pattern, mode = pattern.rsplit("@", 1)
+        specs[name] = (pattern, mode)
+    if args.only:
+        for name in args.only:
+            if name not in specs:
+                parser.error(f"Unknown metric: {name}")
+        specs = {name: specs[name] for name in args.only}
+    try:
+        Extractors(specs)
+    except (ValueError, re.error) as e:
+        parser.error(str(e))
+
+    logs = archived_logs(args.archive, latest=not args.all)
+    start = time.time()
+    metrics = reparse(logs, specs, args.jobs)
+    print(f"Parsed {len(logs)} logs in {time.time() - start:.2f}s")
+
+    with open(args.out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Ext PCs", "Int PCs", "Crit PCs", "Status", "Log"] + list(specs))
+        for (config, status, path), values in zip(logs, metrics):
+            writer.writerow(list(config) + [status, path] + ["" if values[n] is None else values[n] for n in specs])
+    print(f"Wrote {args.out}")
+
+    if args.store:
+        store = result_store.ResultStore(args.store)
+        store.add_metrics((config, path, values) for (config, _, path), values in zip(logs, metrics))
+        store.close()
+        print(f"Back-filled {len(logs)} logs into {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""
+Compact intermediate representation of the network domain (final_gridworld_domain)
+with a streaming PDDL writer.
+
+setup_domain builds one unified_planning FNode per fact and PDDLWriter walks them all
+again, which dominates generation time for large pc_count_by_segment values. Here every
+object name is interned to an integer ID, hosts/segments/CVEs/facts are small __slots__
+records, and domain.pddl/problem.pddl are streamed straight from them. The output matches
+the PDDLWriter path of translate_independent.create_problem; check_against_pddlwriter
+verifies that.
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+# Predicates of the network domain; static_can_ssh is only used by the pairwise encoding,
+# static_segment_link/static_ssh_blocked only by the segment encoding, and
+# static_entry_segment/static_target_segment only by topologies with several entry or
+# target segments
+PREDICATES = (
+    "static_at", "static_vulnerable", "static_can_ssh", "static_has_local_privilege",
+    "static_separated_by", "static_in_segment", "data_stolen", "logs_cleaned", "escaped",
+    "static_segment_link", "static_ssh_blocked", "static_entry_segment", "static_target_segment"
+)
+(AT, VULNERABLE, CAN_SSH, HAS_LOCAL_PRIVILEGE, SEPARATED_BY, IN_SEGMENT,
+ DATA_STOLEN, LOGS_CLEANED, ESCAPED, SEGMENT_LINK, SSH_BLOCKED,
+ ENTRY_SEGMENT, TARGET_SEGMENT) = range(len(PREDICATES))
+
+# The domain file does not depend on the PC counts, so it is a fixed template per
+# connectivity encoding and segment encoding (see segment_parts). PDDLWriter orders
+# constants and quantified variables by set iteration order; here they are fixed.
+DOMAIN_TEMPLATE = """(define (domain generalized_domain-domain)
+ (:requirements :strips :typing :negative-preconditions :disjunctive-preconditions :equality :existential-preconditions)
+ (:types
+    agent privilege_level network_node vulnerability segment - object
+    host infrastructure_device - network_node
+    firewall - infrastructure_device
+    pc - host
+    user root - privilege_level
+ )
+ (:constants
+   attacker_agent defender_agent - agent
+   user_lvl - user
+   root_lvl - root
+{segment_constants} )
+ (:predicates (static_at ?a - agent ?h - host) (static_vulnerable ?h - host ?v - vulnerability) {connectivity_predicates} (static_has_local_privilege ?a - agent ?h - host ?p - privilege_level) (static_separated_by ?s1 - segment ?s2 - segment ?f - firewall) (static_in_segment ?n - network_node ?s - segment) (data_stolen) (logs_cleaned ?h - host) (escaped){segment_predicates})
+ (:action attack_exploit
+  :parameters ( ?a - agent ?h - host ?v - vulnerability)
+  :precondition (and (= ?a attacker_agent) (static_at ?a ?h) (static_vulnerable ?h ?v))
+  :effect (and (static_has_local_privilege ?a ?h user_lvl)))
+ (:action attack_privilege_escalation
+  :parameters ( ?a - agent ?h - host)
+  :precondition (and (= ?a attacker_agent) (static_at ?a ?h) (static_has_local_privilege ?a ?h user_lvl))
+  :effect (and (static_has_local_privilege ?a ?h root_lvl)))
+{attack_move_ssh}
+ (:action attack_clean
+  :parameters ( ?a - agent ?h - host)
+  :precondition (and (= ?a attacker_agent) (static_at ?a ?h) (not (logs_cleaned ?h)))
+  :effect (and (logs_cleaned ?h)))
+ (:action attack_steal
+  :parameters ( ?a - agent ?h - host ?seg - segment)
+  :precondition (and (= ?a attacker_agent) (static_at ?a ?h) (static_in_segment ?h ?seg) {target_condition} (not (data_stolen)))
+  :effect (and (data_stolen)))
+ (:action attack_log_off
+  :parameters ( ?a - agent)
+  :precondition (and (= ?a attacker_agent) (data_stolen))
+  :effect (and (escaped)))
+ (:action fix_patch_cve
+  :parameters ( ?a - agent ?h - host ?v - vulnerability)
+  :precondition (and (= ?a defender_agent) (static_vulnerable ?h ?v))
+  :effect (and (not (static_vulnerable ?h ?v))))
+{fix_update_firewall_ruleset}
+)
+"""
+
+DOMAIN_PARTS = {
+    'pairwise': {
+        "connectivity_predicates": "(static_can_ssh ?src - network_node ?dest - network_node)",
+        "src": "?src_0",
+        "dest": "?dest_0",
+        "attack_move_ssh": """ (:action attack_move_ssh
+  :parameters ( ?a - agent ?src_0 - host ?dest_0 - host)
+  :precondition (and (= ?a attacker_agent) (static_at ?a ?src_0) (or (static_has_local_privilege ?a ?src_0 root_lvl) {entry_condition}) (static_can_ssh ?src_0 ?dest_0))
+  :effect (and (not (static_at ?a ?src_0)) (static_at ?a ?dest_0) (not (logs_cleaned ?dest_0))))""",
+        "fix_update_firewall_ruleset": """ (:action fix_update_firewall_ruleset
+  :parameters ( ?a - agent ?f - firewall ?src_0 - host ?dest_0 - host ?s_src - segment ?s_dest - segment)
+  :precondition (and (= ?a defender_agent) (static_can_ssh ?src_0 ?dest_0) (static_in_segment ?src_0 ?s_src) (static_in_segment ?dest_0 ?s_dest) (static_separated_by ?s_src ?s_dest ?f) (exists (?other_dest - host ?other_src - host)
+ (and (static_in_segment ?other_src ?s_src) (static_in_segment ?other_dest ?s_dest) (static_can_ssh ?other_src ?other_dest) (or (not (= ?src_0 ?other_src)) (not (= ?dest_0 ?other_dest))))))
+  :effect (and (not (static_can_ssh ?src_0 ?dest_0))))""",
+    },
+    'segment': {
+        "connectivity_predicates": "(static_segment_link ?s1 - segment ?s2 - segment) (static_ssh_blocked ?src - host ?dest - host)",
+        "src": "?src",
+        "dest": "?dest",
+        "attack_move_ssh": """ (:action attack_move_ssh
+  :parameters ( ?a - agent ?src - host ?dest - host)
+  :precondition (and (= ?a attacker_agent) (static_at ?a ?src) (or (static_has_local_privilege ?a ?src root_lvl) {entry_condition}) (not (= ?src ?dest)) (exists (?s_a - segment ?s_b - segment)
+ (and (static_in_segment ?src ?s_a) (static_in_segment ?dest ?s_b) (static_segment_link ?s_a ?s_b))) (not (static_ssh_blocked ?src ?dest)))
+  :effect (and (not (static_at ?a ?src)) (static_at ?a ?dest) (not (logs_cleaned ?dest))))""",
+        "fix_update_firewall_ruleset": """ (:action fix_update_firewall_ruleset
+  :parameters ( ?a - agent ?f - firewall ?src - host ?dest - host ?s_src - segment ?s_dest - segment)
+  :precondition (and (= ?a defender_agent) (not (= ?src ?dest)) (static_segment_link ?s_src ?s_dest) (not (static_ssh_blocked ?src ?dest)) (static_in_segment ?src ?s_src) (static_in_segment ?dest ?s_dest) (static_separated_by ?s_src ?s_dest ?f) (exists (?other_dest - host ?other_src - host)
+ (and (static_in_segment ?other_src ?s_src) (static_in_segment ?other_dest ?s_dest) (not (= ?other_src ?other_dest)) (static_segment_link ?s_src ?s_dest) (not (static_ssh_blocked ?other_src ?other_dest)) (or (not (= ?src ?other_src)) (not (= ?dest ?other_dest))))))
+  :effect (and (static_ssh_blocked ?src ?dest)))""",
+    },
+}
+
+# Objects that the domain file always declares as constants (segment_parts may add segments)
+DOMAIN_CONSTANTS = ("attacker_agent", "defender_agent", "user_lvl", "root_lvl")
+
+
+def segment_parts(entry, target):
+    """
+    Domain text for the entry segments (where hosts can be hopped between without root) and
+    the target segments (where data can be stolen). With one of each they are constants, as
+    in final_gridworld_domain; otherwise static_entry_segment/static_target_segment facts.
+    """
+    if len(entry) == 1 and len(target) == 1:
+        constants = list(dict.fromkeys(entry + target))
+        return {
+            "segment_constants": f"   {' '.join(constants)} - segment\n",
+            "segment_predicates": "",
+            "target_condition": f"(= ?seg {target[0]})",
+            "entry_condition": f"(and (static_in_segment {{src}} {entry[0]}) (static_in_segment {{dest}} {entry[0]}))",
+        }
+    return {
+        "segment_constants": "",
+        "segment_predicates": " (static_entry_segment ?s - segment) (static_target_segment ?s - segment)",
+        "target_condition": "(static_target_segment ?seg)",
+        "entry_condition": "(exists (?s_entry - segment)\n (and (static_entry_segment ?s_entry) "
+                           "(static_in_segment {src} ?s_entry) (static_in_segment {dest} ?s_entry)))",
+    }
+
+
+def domain_text(connectivity, entry=("external_segment",), target=("critical_segment",)):
+    parts = dict(DOMAIN_PARTS[connectivity])
+    seg = segment_parts(list(entry), list(target))
+    seg["entry_condition"] = seg["entry_condition"].format(src=parts["src"], dest=parts["dest"])
+    parts["attack_move_ssh"] = parts["attack_move_ssh"].format(entry_condition=seg.pop("entry_condition"))
+    return DOMAIN_TEMPLATE.format(**parts, **seg)
+
+
+class Interner:
+    """Maps object names to dense integer IDs and back."""
+    __slots__ = ("names", "ids")
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self.ids[name] = idx
+            self.names.append(name)
+        return idx
+
+
+class Segment:
+    __slots__ = ("id", "key", "hosts", "entry", "target")
+
+    def __init__(self, id, key, entry=False, target=False):
+        self.id = id
+        self.key = key  # Name of the segment in the topology, e.g. 'external'
+        self.hosts = []
+        self.entry = entry
+        self.target = target
+
+
+class Cve:
+    __slots__ = ("id",)
+
+    def __init__(self, id):
+        self.id = id
+
+
+class Host:
+    __slots__ = ("id", "segment", "cve")
+
+    def __init__(self, id, segment, cve):
+        self.id = id
+        self.segment = segment
+        self.cve = cve
+
+
+class Fact:
+    __slots__ = ("pred", "args")
+
+    def __init__(self, pred, args):
+        self.pred = pred
+        self.args = args
+
+
+class SegmentSpec:
+    """
+    One segment of a Topology. cves is the pool its hosts draw from in turn; a segment
+    without a pool reuses the CVE of the last host before it (what setup_domain does for
+    critical PCs).
+    """
+    __slots__ = ("key", "name", "hosts", "cves", "entry", "target")
+
+    def __init__(self, key, hosts, cves=None, entry=False, target=False, name=None):
+        self.key = key
+        self.name = name or f"{key}_segment"
+        self.hosts = hosts
+        self.cves = list(cves or [])
+        self.entry = entry
+        self.target = target
+
+
+class Topology:
+    """
+    Segment graph for build_topology_ir: segments in host numbering order, links as
+    (segment key, segment key, firewall name) guarded by that firewall in both directions,
+    and the segment the attacker starts in (first host; default: first entry segment).
+    Hosts can always reach hosts of their own segment and of linked segments.
+    """
+    __slots__ = ("segments", "links", "firewalls", "start")
+
+    def __init__(self, segments, links, firewalls=None, start=None):
+        self.segments = segments
+        self.links = links
+        # Firewall object order; defaults to order of first use
+        self.firewalls = firewalls or list(dict.fromkeys(fw for _, _, fw in links))
+        self.start = start or next((seg.key for seg in segments if seg.entry), None)
+        self.validate()
+
+    def validate(self):
+        keys = [seg.key for seg in self.segments]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Segment keys must be unique")
+        if any(seg.hosts < 1 for seg in self.segments):
+            raise ValueError("Each segment must have at least 1 PC")
+        if not any(seg.entry for seg in self.segments) or not any(seg.target for seg in self.segments):
+            raise ValueError("A topology needs at least one entry and one target segment")
+        if not self.segments[0].cves:
+            raise ValueError(f"The first segment ({keys[0]}) needs a CVE pool")
+        for a, b, fw in self.links:
+            if a not in keys or b not in keys:
+                raise ValueError(f"Link {a} - {b} refers to an unknown segment")
+            if a == b:
+                raise ValueError(f"Link {a} - {b} links a segment to itself")
+            if fw not in self.firewalls:
+                raise ValueError(f"Firewall {fw} of link {a} - {b} is not in the firewall list")
+        if self.start not in keys:
+            raise ValueError(f"Unknown start segment: {self.start}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        {"segments": [{"key": "dmz", "hosts": 4, "cves": ["dmz_cve1"], "entry": true}, ...],
+         "links": [{"segments": ["dmz", "internal"], "firewall": "dmz_firewall"}, ...],
+         "firewalls": [...], "start": "dmz"}; "firewalls" and "start" are optional.
+        """
+        segments = [SegmentSpec(s["key"], s["hosts"], s.get("cves"), s.get("entry", False),
+                                s.get("target", False), s.get("name")) for s in data["segments"]]
+        links = [(link["segments"][0], link["segments"][1], link["firewall"]) for link in data.get("links", [])]
+        return cls(segments, links, data.get("firewalls"), data.get("start"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def chain_topology(pc_count_by_segment=None):
+    """The external - internal - critical chain of final_gridworld_domain.setup_domain."""
+    if pc_count_by_segment is None:
+        pc_count_by_segment = {
+            'external': 7,
+            'internal': 7,
+            'critical': 7
+        }
+
+    required_segments = {'external', 'internal', 'critical'}
+    if not all(seg in pc_count_by_segment for seg in required_segments):
+        raise ValueError(f"pc_count_by_segment must contain keys: {required_segments}")
+
+    if any(count < 1 for count in pc_count_by_segment.values()):
+        raise ValueError("Each segment must have at least 1 PC")
+
+    segments = [
+        SegmentSpec('external', pc_count_by_segment['external'], [f"ext_cve{n}" for n in range(1, 5)], entry=True),
+        SegmentSpec('internal', pc_count_by_segment['internal'], [f"int_cve{n}" for n in range(1, 5)]),
+        SegmentSpec('critical', pc_count_by_segment['critical'], target=True),
+    ]
+    links = [('external', 'internal', 'external_firewall'), ('internal', 'critical', 'internal_firewall')]
+    return Topology(segments, links, firewalls=['internal_firewall', 'external_firewall'])
+
+
+class NetworkIR:
+    """
+    Objects grouped by PDDL type plus the initial facts and goals, all in the same
+    order setup_domain/create_problem produce them.
+    """
+    __slots__ = ("connectivity", "names", "cves", "segments", "firewalls", "hosts", "facts", "goals")
+
+    def __init__(self, connectivity='pairwise'):
+        self.connectivity = connectivity
+        self.names = Interner()
+        self.cves = []
+        self.segments = []
+        self.firewalls = []
+        self.hosts = []
+        self.facts = []
+        self.goals = []
+
+    def fact(self, pred, *args):
+        self.facts.append(Fact(pred, args))
+
+    @property
+    def entry(self):
+        return [self.names.names[seg.id] for seg in self.segments if seg.entry]
+
+    @property
+    def target(self):
+        return [self.names.names[seg.id] for seg in self.segments if seg.target]
+
+    @property
+    def domain_text(self):
+        return domain_text(self.connectivity, self.entry, self.target)
+
+
+def build_network_ir(pc_count_by_segment=None, connectivity='pairwise'):
+    """
+    Mirrors final_gridworld_domain.setup_domain plus the restore goals of
+    translate_independent.create_problem.
+    """
+    return build_topology_ir(chain_topology(pc_count_by_segment), connectivity)
+
+
+def build_topology_ir(topology, connectivity='pairwise'):
+    """
+    Builds the IR of a network with any segment graph. Hosts are named pc1, pc2, ... in
+    segment order. With connectivity='segment' the facts grow with hosts plus links; with
+    'pairwise' every reachable host pair is a fact.
+    """
+    if connectivity not in DOMAIN_PARTS:
+        raise ValueError(f"connectivity must be one of: {tuple(DOMAIN_PARTS)}")
+
+    ir = NetworkIR(connectivity)
+    intern = ir.names.intern
+    for name in DOMAIN_CONSTANTS:
+        intern(name)
+    attacker = ir.names.ids["attacker_agent"]
+
+    cve_by_name = {}
+    for spec in topology.segments:
+        for name in spec.cves:
+            if name not in cve_by_name:
+                cve_by_name[name] = Cve(intern(name))
+    ir.cves = list(cve_by_name.values())
+
+    by_key = {}
+    for spec in topology.segments:
+        seg = Segment(intern(spec.name), spec.key, spec.entry, spec.target)
+        by_key[spec.key] = seg
+        ir.segments.append(seg)
+
+    counter = 1
+    cve = None
+    for spec, seg in zip(topology.segments, ir.segments):
+        pool = [cve_by_name[name] for name in spec.cves]
+        for i in range(spec.hosts):
+            # Hosts take the pool's CVEs in turn; without a pool they keep the last CVE
+            if pool:
+                cve = pool[i % len(pool)]
+            host = Host(intern(f"pc{counter}"), seg, cve)
+            ir.fact(LOGS_CLEANED, host.id)
+            ir.fact(VULNERABLE, host.id, cve.id)
+            ir.fact(IN_SEGMENT, host.id, seg.id)
+            seg.hosts.append(host)
+            ir.hosts.append(host)
+            counter += 1
+
+    ir.firewalls = [intern(name) for name in topology.firewalls]
+
+    for a, b, fw in topology.links:
+        ir.fact(SEPARATED_BY, by_key[a].id, by_key[b].id, ir.names.ids[fw])
+        ir.fact(SEPARATED_BY, by_key[b].id, by_key[a].id, ir.names.ids[fw])
+
+    if len(ir.entry) != 1 or len(ir.target) != 1:
+        for seg in ir.segments:
+            if seg.entry:
+                ir.fact(ENTRY_SEGMENT, seg.id)
+        for seg in ir.segments:
+            if seg.target:
+                ir.fact(TARGET_SEGMENT, seg.id)
+
+    # Same segment plus linked segments
+    if connectivity == 'pairwise':
+        adjacent = {seg: {seg} for seg in ir.segments}
+        for a, b, _ in topology.links:
+            adjacent[by_key[a]].add(by_key[b])
+            adjacent[by_key[b]].add(by_key[a])
+        for seg in ir.segments:
+            # Hosts are numbered by segment, so this keeps global host order
+            reachable = [h for other in ir.segments if other in adjacent[seg] for h in other.hosts]
+            for h1 in seg.hosts:
+                for h2 in reachable:
+                    if h1 is not h2:
+                        ir.fact(CAN_SSH, h1.id, h2.id)
+    else:
+        for seg in ir.segments:
+            ir.fact(SEGMENT_LINK, seg.id, seg.id)
+        for a, b, _ in topology.links:
+            ir.fact(SEGMENT_LINK, by_key[a].id, by_key[b].id)
+            ir.fact(SEGMENT_LINK, by_key[b].id, by_key[a].id)
+
+    ir.fact(AT, attacker, by_key[topology.start].hosts[0].id)
+
+    # Restore goals: every true non-static fact, then the domain goal
+    ir.goals = [f for f in ir.facts if not PREDICATES[f.pred].startswith("static_")]
+    ir.goals.append(Fact(ESCAPED, ()))
+    return ir
+
+
+def _atom(names, fact):
+    if not fact.args:
+        return f"({PREDICATES[fact.pred]})"
+    return f"({PREDICATES[fact.pred]} {' '.join(names[a] for a in fact.args)})"
+
+
+def write_domain(ir, out):
+    out.write(ir.domain_text)
+
+
+def _segment_constant(ir, seg):
+    """True if the domain declares the segment as a constant (one entry and one target segment)."""
+    return len(ir.entry) == 1 and len(ir.target) == 1 and (seg.entry or seg.target)
+
+
+def write_problem(ir, out):
+    names = ir.names.names
+    out.write("(define (problem generalized_domain-problem)\n")
+    out.write(" (:domain generalized_domain-domain)\n")
+    out.write(" (:objects")
+    object_groups = [
+        ([c.id for c in ir.cves], "vulnerability"),
+        ([s.id for s in ir.segments if not _segment_constant(ir, s)], "segment"),
+        (ir.firewalls, "firewall"),
+        ([h.id for h in ir.hosts], "pc"),
+    ]
+    for ids, type_name in object_groups:
+        if ids:
+            out.write(f"\n   {' '.join(names[i] for i in ids)} - {type_name}")
+    out.write("\n )\n")
+    out.write(" (:init")
+    for fact in ir.facts:
+        out.write(" ")
+        out.write(_atom(names, fact))
+    out.write(")\n")
+    out.write(f" (:goal (and {' '.join(_atom(names, g) for g in ir.goals)}))\n")
+    out.write(")\n")
+
+
+def write_pddl(ir, out_dir="."):
+    with open(os.path.join(out_dir, "domain.pddl"), "w") as f:
+        write_domain(ir, f)
+    with open(os.path.join(out_dir, "problem.pddl"), "w") as f:
+        write_problem(ir, f)
+
+
+def ir_counts(ir):
+    """Problem size counts in the form of translate_independent.Instrumentation.count_problem."""
+    domain = ir.domain_text
+    return {
+        "objects": len(ir.names.names),
+        "fluents": len(re.findall(r"\((\w+)[ )]", domain.split("(:predicates", 1)[1].split("\n", 1)[0])),
+        "actions": domain.count("(:action "),
+        "initial_facts": len(ir.facts),
+        "goals": len(ir.goals),
+    }
+
+
+def _sort_exists_variables(match):
+    variables = re.findall(r"\?\S+ - \S+", match.group(1))
+    return f"(exists ({' '.join(sorted(variables))})"
+
+
+def _normalize_domain(domain_text):
+    # PDDLWriter lists constants of a type and quantified variables in set order, so compare them as sets
+    lines = domain_text.split("\n")
+    start = lines.index(" (:constants")
+    end = lines.index(" )", start)
+    for n in range(start + 1, end):
+        objects, type_name = lines[n].strip().rsplit(" - ", 1)
+        lines[n] = f"   {' '.join(sorted(objects.split()))} - {type_name}"
+    return re.sub(r"\(exists \(([^)]*)\)", _sort_exists_variables, "\n".join(lines))
+
+
+def check_against_pddlwriter(pc_count_by_segment, connectivity='pairwise'):
+    """
+    Generates the same config through create_problem + PDDLWriter and through the IR.
+    The problem files must be byte-identical and the domain files identical up to the
+    order of constants within a type and of variables within an exists. Returns (ok, message).
+    """
+    import contextlib
+    import io
+    from functools import partial
+    from unified_planning.io import PDDLWriter
+    from final_gridworld_domain import setup_domain
+    from translate_independent import create_problem
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = create_problem(partial(setup_domain, pc_count_by_segment=pc_count_by_segment,
+                                         connectivity=connectivity))
+    writer = PDDLWriter(problem)
+    expected_domain = writer.get_domain()
+    expected_problem = writer.get_problem()
+
+    ir = build_network_ir(pc_count_by_segment, connectivity)
+    domain_buf, problem_buf = io.StringIO(), io.StringIO()
+    write_domain(ir, domain_buf)
+    write_problem(ir, problem_buf)
+
+    if problem_buf.getvalue() != expected_problem:
+        return False, "problem.pddl differs from PDDLWriter output"
+    if _normalize_domain(domain_buf.getvalue()) != _normalize_domain(expected_domain):
+        return False, "domain.pddl differs from PDDLWriter output"
+    return True, "identical"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the IR emitter against the PDDLWriter path.")
+    parser.add_argument("--check", nargs=3, type=int, action="append", metavar=("EXT", "INT", "CRIT"),
+                        help="Config to compare against PDDLWriter (repeatable)")
+    parser.add_argument("--time", nargs=3, type=int, metavar=("EXT", "INT", "CRIT"),
+                        help="Time IR generation and writing for a config under both encodings")
+    args = parser.parse_args()
+
+    for e, i, c in args.check or [(1, 1, 1), (3, 2, 5), (7, 7, 7)]:
+        counts = {'external': e, 'internal': i, 'critical': c}
+        for connectivity in DOMAIN_PARTS:
+            ok, message = check_against_pddlwriter(counts, connectivity)
+            print(f"({e}, {i}, {c}) {connectivity}: {message}")
+            if not ok:
+                raise SystemExit(1)
+
+    if args.time:
+        e, i, c = args.time
+        for connectivity in DOMAIN_PARTS:
+            start = time.perf_counter()
+            ir = build_network_ir({'external': e, 'internal': i, 'critical': c}, connectivity)
+            built = time.perf_counter()
+            with open(os.devnull, "w") as f:
+                write_domain(ir, f)
+                write_problem(ir, f)
+            done = time.perf_counter()
+            print(f"({e}, {i}, {c}) {connectivity}: {len(ir.hosts)} hosts, {len(ir.facts)} facts | "
+                  f"build {built - start:.3f}s, write {done - built:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from importlib import metadata
+
+# Content-addressed cache of generated PDDL instances. An entry is keyed by the source of
+# the generator modules, the generation parameters and the unified_planning version, so a
+# config that was generated once is never generated again until one of those changes.
+# Entries live in CACHE_DIR/<key[:2]>/<key>/ and are evicted least-recently-used first
+# once the cache grows past its size budget.
+
+CACHE_DIR = "pddl_cache"
+MAX_CACHE_BYTES = 2 * 1024**3  # 2 GiB
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Everything translate_independent.py imports to produce the network domain
+GENERATOR_SOURCES = [
+    "translate_independent.py",
+    "final_gridworld_domain.py",
+    "network_domain_ir.py",
+    "host_symmetry.py",
+    "ground_prune.py",
+]
+
+_LAST_USED = ".last_used"
+
+
+def _unified_planning_version():
+    try:
+        return metadata.version("unified-planning")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def instance_key(params, sources=GENERATOR_SOURCES):
+    """
+    Hash of the generator sources, the parameters (any JSON-serialisable value) and the
+    unified_planning version.
+    """
+    h = hashlib.sha256()
+    for name in sorted(sources):
+        h.update(name.encode())
+        with open(os.path.join(SCRIPT_DIR, name), "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    h.update(_unified_planning_version().encode())
+    return h.hexdigest()
+
+
+def _entry_dir(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def fetch(key, out_dir, cache_dir=CACHE_DIR):
+    """Copies a cached instance into out_dir. Returns False on a miss."""
+    entry = _entry_dir(cache_dir, key)
+    if not os.path.isdir(entry):
+        return False
+    try:
+        for name in os.listdir(entry):
+            if name != _LAST_USED:
+                shutil.copy2(os.path.join(entry, name), os.path.join(out_dir, name))
+        # Touch for LRU
+        with open(os.path.join(entry, _LAST_USED), "w") as f:
+            f.write(str(time.time()))
+    except FileNotFoundError:
+        return False  # Evicted by another process while copying
+    return True
+
+
+def store(key, src_dir, cache_dir=CACHE_DIR, max_bytes=None, exclude=()):
+    """
+    Stores every file in src_dir (the generator's output) except those named in exclude
+    under key, then evicts old
+    entries if the cache is over budget. Safe to call from concurrent jobs: the entry
+    is assembled in a temp dir and renamed into place.
+    """
+    entry = _entry_dir(cache_dir, key)
+    if os.path.isdir(entry):
+        return
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(entry))
+    for name in os.listdir(src_dir):
+        path = os.path.join(src_dir, name)
+        if os.path.isfile(path) and name not in exclude:
+            shutil.copy2(path, os.path.join(tmp, name))
+    with open(os.path.join(tmp, _LAST_USED), "w") as f:
+        f.write(str(time.time()))
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)  # Another job stored it first
+        return
+    evict(cache_dir, max_bytes)
+
+
+def _entries(cache_dir):
+    for prefix in os.listdir(cache_dir):
+        prefix_dir = os.path.join(cache_dir, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for key in os.listdir(prefix_dir):
+            if key.startswith(".tmp-"):
+                continue
+            entry = os.path.join(prefix_dir, key)
+            try:
+                files = os.listdir(entry)
+                size = sum(os.path.getsize(os.path.join(entry, name)) for name in files)
+                last_used = os.path.getmtime(os.path.join(entry, _LAST_USED))
+            except FileNotFoundError:
+                continue
+            yield last_used, size, entry
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=None):
+    """Removes least recently used entries until the cache fits in max_bytes (default MAX_CACHE_BYTES)."""
+    max_bytes = max_bytes or MAX_CACHE_BYTES
+    if not os.path.isdir(cache_dir):
+        return
+    entries = sorted(_entries(cache_dir))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
@@ -0,0 +1,90 @@
+import functools
+import glob
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# Cache of planner results. An entry is keyed by the domain and problem text, the planner
+# arguments and a fingerprint of the planner itself (driver script plus built binaries), and
+# holds the parsed times together with the gzipped planner log. Timeouts are cached with
+# the budget they ran under, so they only count as a result for budgets no larger than that.
+
+CACHE_DIR = "planner_cache"
+
+
+@functools.lru_cache(maxsize=None)
+def planner_fingerprint(driver_path):
+    """Hash of the planner driver and every built binary next to it (memoised per process)."""
+    driver_path = os.path.abspath(driver_path)
+    h = hashlib.sha256()
+    paths = [driver_path] + sorted(glob.glob(os.path.join(os.path.dirname(driver_path), "builds", "*", "bin", "*")))
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        h.update(os.path.relpath(path, os.path.dirname(driver_path)).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def result_key(domain_path, problem_path, planner_cmd):
+    """planner_cmd is the full command: driver path followed by its arguments."""
+    h = hashlib.sha256()
+    for path in (domain_path, problem_path):
+        with open(path, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    h.update(json.dumps(list(planner_cmd[1:])).encode())
+    h.update(planner_fingerprint(planner_cmd[0]).encode())
+    return h.hexdigest()
+
+
+def _paths(cache_dir, key):
+    base = os.path.join(cache_dir, key[:2], key)
+    return base + ".json", base + ".log.gz"
+
+
+def lookup(key, timeout, cache_dir=CACHE_DIR, ignore_timeouts=False):
+    """
+    Returns the cached entry ({"status", "data", "timeout", "peak_rss_mb", "time"}) or None.
+    A cached timeout is a miss if it ran under a smaller budget than `timeout` or if
+    ignore_timeouts is set.
+    """
+    meta_path, _ = _paths(cache_dir, key)
+    try:
+        with open(meta_path) as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if entry["status"] == "timeout" and (ignore_timeouts or entry["timeout"] < timeout):
+        return None
+    return entry
+
+
+def read_log(key, cache_dir=CACHE_DIR):
+    _, log_path = _paths(cache_dir, key)
+    try:
+        with gzip.open(log_path, "rt") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def _write_atomic(path, data):
+    tmp_fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    with os.fdopen(tmp_fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def store(key, status, data, timeout, log_text, cache_dir=CACHE_DIR, peak_rss_mb=None):
+    """Stores a planner result. The log goes first so a visible entry always has its log."""
+    meta_path, log_path = _paths(cache_dir, key)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    _write_atomic(log_path, gzip.compress(log_text.encode(errors="replace")))
+    entry = {"status": status, "data": data, "timeout": timeout, "peak_rss_mb": peak_rss_mb,
+             "time": round(time.time(), 3)}
+    _write_atomic(meta_path, json.dumps(entry).encode())
@@ -1,10 +1,26 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import argparse
+import hashlib
+import inspect
+import json
+import shlex
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import result_store
 
 CSV_FILE = "gridsearch_results.csv"
 OUTPUT_DIR = "plots"
+PLOT_CACHE = os.path.join(OUTPUT_DIR, ".plot_cache.json")  # Hash of the input slice each figure was last rendered from
+
+# During a sweep the plots are regenerated over and over. The cleaned CSV frame is kept
+# as an .npz next to the plots and reused while the CSV's mtime and size stay the same,
+# every figure is only re-rendered when the slice of data it reads (or its code) changed,
+# and the figures that do need rendering are drawn in a process pool.
 
 # Set to True if the curve goes vertical too fast
 USE_LOG_SCALE = False 
@@ -18,19 +34,74 @@ def load_and_clean_data(csv_path):
     
     # --- CHANGE 1: Handle TIMEOUTs ---
     # Replace "TIMEOUT" with 1800 (30 mins) so it doesn't get turned into NaN
+    # SKIPPED_DOMINATED rows (pruned because a smaller config timed out) count as timeouts too
     for col in cols:
-        df[col] = df[col].replace('TIMEOUT', 1800)
+        df[col] = df[col].replace(['TIMEOUT', 'SKIPPED_DOMINATED'], 1800)
         df[col] = pd.to_numeric(df[col], errors='coerce')
         
     df = df.dropna(subset=cols)
     return df
 
-def plot_balanced_scaling(df):
-    # Filter for rows where Ext == Int == Crit
-    balanced = df[
-        (df['Ext PCs'] == df['Int PCs']) & 
-        (df['Int PCs'] == df['Crit PCs'])
-    ].copy()
+
+def _frame_cache_path(csv_path):
+    return os.path.join(OUTPUT_DIR, f".frame_cache-{hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()[:12]}.npz")
+
+
+def _read_frame_cache(path):
+    with np.load(path, allow_pickle=False) as data:
+        return str(data["key"]), pd.DataFrame({str(col): data[f"c{k}"] for k, col in enumerate(data["columns"])})
+
+
+def load_cached_frame(csv_path):
+    """load_and_clean_data through a columnar .npz copy, reused while the CSV's mtime and size are unchanged."""
+    st = os.stat(csv_path)
+    key = f"{st.st_mtime_ns}:{st.st_size}"
+    cache_path = _frame_cache_path(csv_path)
+    try:
+        cached_key, df = _read_frame_cache(cache_path)
+        if cached_key == key:
+            return df
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        pass
+
+    df = load_and_clean_data(csv_path)
+    arrays = {"key": np.array(key), "columns": np.array(list(df.columns))}
+    for k, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        arrays[f"c{k}"] = values.astype(str) if values.dtype == object else values
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, cache_path)
+    # Read back so a fresh load and a cache hit give the same frame (and figure hashes)
+    return _read_frame_cache(cache_path)[1]
+
+
+class FrameResults:
+    """
+    The slices the plots ask for, filtered from the cleaned CSV frame. The SQLite
+    result_store.ResultStore answers the same slice() / values() calls with queries.
+    """
+    COLUMNS = {"ext": "Ext PCs", "int": "Int PCs", "crit": "Crit PCs"}
+
+    def __init__(self, df):
+        self.df = df
+
+    def slice(self, ext=None, int_=None, crit=None, balanced=False):
+        df = self.df
+        for column, value in (("ext", ext), ("int", int_), ("crit", crit)):
+            if value is not None:
+                df = df[df[self.COLUMNS[column]] == value]
+        if balanced:
+            df = df[(df['Ext PCs'] == df['Int PCs']) & (df['Int PCs'] == df['Crit PCs'])]
+        return df.copy()
+
+    def values(self, column):
+        return sorted(self.df[self.COLUMNS[column]].unique())
+
+def plot_balanced_scaling(results):
+    # Rows where Ext == Int == Crit
+    balanced = results.slice(balanced=True)
     
     if balanced.empty:
         print("No balanced configurations (N,N,N) found in data.")
@@ -59,24 +130,24 @@ def plot_balanced_scaling(df):
     plt.savefig(f"{OUTPUT_DIR}/1_balanced_scaling.png", dpi=300)
     print(f"Generated {OUTPUT_DIR}/1_balanced_scaling.png")
 
-def plot_segment_sensitivity(df):
+def plot_segment_sensitivity(results):
     plt.figure(figsize=(10, 6))
     
     # Filter: Base case is (1,1,1)
     # We find scaling where 2 are fixed at 1
     
     # Ext Scale: Int=1, Crit=1
-    ext = df[(df['Int PCs'] == 1) & (df['Crit PCs'] == 1)].sort_values('Ext PCs')
+    ext = results.slice(int_=1, crit=1).sort_values('Ext PCs')
     if not ext.empty:
         plt.plot(ext['Ext PCs'], ext['Total Time (s)'], marker='o', label='Scaling External')
 
     # Int Scale: Ext=1, Crit=1
-    int_ = df[(df['Ext PCs'] == 1) & (df['Crit PCs'] == 1)].sort_values('Int PCs')
+    int_ = results.slice(ext=1, crit=1).sort_values('Int PCs')
     if not int_.empty:
         plt.plot(int_['Int PCs'], int_['Total Time (s)'], marker='s', label='Scaling Internal')
 
     # Crit Scale: Ext=1, Int=1
-    crit = df[(df['Ext PCs'] == 1) & (df['Int PCs'] == 1)].sort_values('Crit PCs')
+    crit = results.slice(ext=1, int_=1).sort_values('Crit PCs')
     if not crit.empty:
         plt.plot(crit['Crit PCs'], crit['Total Time (s)'], marker='^', label='Scaling Critical')
 
@@ -88,8 +159,8 @@ def plot_segment_sensitivity(df):
     plt.savefig(f"{OUTPUT_DIR}/2_segment_sensitivity.png", dpi=300)
     print(f"Generated {OUTPUT_DIR}/2_segment_sensitivity.png")
 
-def plot_heatmap(df):
-    subset = df[df['Crit PCs'] == 1]
+def plot_heatmap(results):
+    subset = results.slice(crit=1)
     if len(subset) < 4: return
     
     pivot = subset.pivot_table(index='Int PCs', columns='Ext PCs', values='Total Time (s)')
@@ -101,7 +172,7 @@ def plot_heatmap(df):
     plt.savefig(f"{OUTPUT_DIR}/3_heatmap.png", dpi=300)
     print(f"Generated {OUTPUT_DIR}/3_heatmap.png")
 
-def plot_small_multiples(df):
+def plot_small_multiples(results):
     """
     Creates a row of heatmaps, where each heatmap represents a fixed number of Critical PCs.
     X-Axis: External PCs
@@ -109,7 +180,7 @@ def plot_small_multiples(df):
     Color: Total Time (s)
     """
     # 1. Identify the unique values for the slicing variable
-    crit_vals = sorted(df['Crit PCs'].unique())
+    crit_vals = results.values('crit')
     n_plots = len(crit_vals)
     
     if n_plots == 0:
@@ -124,13 +195,14 @@ def plot_small_multiples(df):
     if n_plots == 1:
         axes = [axes]
 
+    subsets = [results.slice(crit=crit_val) for crit_val in crit_vals]
+
     # Find global min/max for consistent coloring across all maps
-    vmin = df['Total Time (s)'].min()
-    vmax = df['Total Time (s)'].max()
+    vmin = min(subset['Total Time (s)'].min() for subset in subsets)
+    vmax = max(subset['Total Time (s)'].max() for subset in subsets)
 
     # 3. Iterate through each value of Critical PCs and draw a heatmap
-    for ax, crit_val in zip(axes, crit_vals):
-        subset = df[df['Crit PCs'] == crit_val]
+    for ax, crit_val, subset in zip(axes, crit_vals, subsets):
         
         # Create the matrix for the heatmap (Y=Int, X=Ext)
         pivot_table = subset.pivot_table(index='Int PCs', columns='Ext PCs', values='Total Time (s)')
@@ -171,15 +243,91 @@ def plot_small_multiples(df):
     plt.savefig(save_path, dpi=300, bbox_inches='tight')
     print(f"Generated {save_path}")
 
-# --- MAIN ---
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-
-df = load_and_clean_data(CSV_FILE)
-if not df.empty:
-    plot_balanced_scaling(df)
-    plot_segment_sensitivity(df)
-    plot_heatmap(df)
-    plot_small_multiples(df)
-else:
-    print("No valid data found.")
\ No newline at end of file
+# Output file, plot function and the slices (slice() arguments) it reads
+FIGURES = [
+    ("1_balanced_scaling.png", plot_balanced_scaling, [dict(balanced=True)]),
+    ("2_segment_sensitivity.png", plot_segment_sensitivity,
+     [dict(int_=1, crit=1), dict(ext=1, crit=1), dict(ext=1, int_=1)]),
+    ("3_heatmap.png", plot_heatmap, [dict(crit=1)]),
+    ("4_small_multiples.png", plot_small_multiples, [dict()]),
+]
+
+
+def figure_input(results, slices):
+    """Everything a figure reads, as one frame; the figure draws the same from FrameResults(frame)."""
+    frame = pd.concat([results.slice(**kwargs) for kwargs in slices], ignore_index=True)
+    # Slices keep the CSV's row order, so of a config run more than once the last row is the newest
+    frame = frame.drop_duplicates(subset=['Ext PCs', 'Int PCs', 'Crit PCs'], keep='last')
+    return frame.sort_values(['Ext PCs', 'Int PCs', 'Crit PCs']).reset_index(drop=True)
+
+
+def figure_hash(func, frame):
+    h = hashlib.sha256(inspect.getsource(func).encode())
+    h.update(repr((USE_LOG_SCALE, list(frame.columns))).encode())
+    h.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _render(func, frame):
+    func(FrameResults(frame))
+    plt.close('all')
+
+
+def render_figures(results, jobs=None, force=False):
+    """Renders the FIGURES whose input slice changed since PLOT_CACHE was written."""
+    try:
+        with open(PLOT_CACHE) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    todo = []
+    for name, func, slices in FIGURES:
+        frame = figure_input(results, slices)
+        digest = figure_hash(func, frame)
+        if not force and cache.get(name) == digest and os.path.exists(os.path.join(OUTPUT_DIR, name)):
+            print(f"Up to date: {OUTPUT_DIR}/{name}")
+            continue
+        todo.append((name, func, frame, digest))
+
+    if len(todo) > 1 and (jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs or len(todo), len(todo))) as pool:
+            for future in [pool.submit(_render, func, frame) for _, func, frame, _ in todo]:
+                future.result()
+    else:
+        for _, func, frame, _ in todo:
+            _render(func, frame)
+
+    for name, _, _, digest in todo:
+        cache[name] = digest
+    with open(PLOT_CACHE, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plot gridsearch results.")
+    # Optional CSV path, e.g. the gridsearch_results_adaptive.csv of run_gridsearch.py --adaptive
+    parser.add_argument("csv", nargs="?", default=CSV_FILE)
+    parser.add_argument("--store", nargs="?", const=result_store.STORE_FILE, metavar="DB",
+                        help="Query the SQLite store of run_gridsearch.py --store instead of reading the CSV")
+    parser.add_argument("--gen-args", default="",
+                        help="With --store, plot the sweeps run with these generator arguments (default: none)")
+    parser.add_argument("--jobs", type=int, help="Figures rendered in parallel (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="Re-render every figure")
+    args = parser.parse_args()
+
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+    if args.store:
+        results = result_store.ResultStore(args.store, shlex.split(args.gen_args))
+    else:
+        results = FrameResults(load_cached_frame(args.csv))
+    if results.values('crit'):
+        render_figures(results, args.jobs, args.force)
+    else:
+        print("No valid data found.")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
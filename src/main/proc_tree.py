@@ -0,0 +1,92 @@
+import os
+import threading
+
+# Helpers for watching a process and everything it spawned, read straight from /proc.
+# The planner driver starts the translator, preprocessor and search as child processes,
+# so looking at the driver's pid alone misses nearly all of the memory.
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _children_map():
+    """Maps every live pid to its list of child pids."""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue  # Exited while we were looking
+        # The command name is in parentheses and may itself contain spaces
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def descendants(pid):
+    """All live descendants of pid (not including pid itself)."""
+    children = _children_map()
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def group_members(pgid):
+    """Live (non-zombie) processes in process group pgid."""
+    members = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if fields[0] != "Z" and int(fields[2]) == pgid:
+            members.append(int(name))
+    return members
+
+
+def rss_bytes(pid):
+    """Resident set size of one process, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def tree_rss_bytes(pid):
+    return sum(rss_bytes(p) for p in [pid] + descendants(pid))
+
+
+class PeakRssSampler(threading.Thread):
+    """
+    Samples the summed RSS of a process tree every `interval` seconds until stop() is
+    called. peak_mb holds the largest sample seen.
+    """
+
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak_bytes = max(self.peak_bytes, tree_rss_bytes(self.pid))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    @property
+    def peak_mb(self):
+        return round(self.peak_bytes / 1024**2, 1)
@@ -0,0 +1,346 @@
+from unified_planning.model import Problem
+from functools import partial
+import argparse
+import contextlib
+import io
+import random
+import re
+import time
+
+import ground_prune
+from reference_solver import BitTask, holds
+
+# Reads the policies PRP dumps (prp --dump-policy 2, then translate_policy.py >
+# human_policy.pol) back in and executes them on states of the project's domains.
+#
+# A policy is a list of rules "if this partial state holds, execute this action", each
+# with the distance d PRP attached to it; in a state, the applicable rule with the
+# smallest d wins (earlier rules break ties). Rules are compiled against the grounded
+# task (ground_prune + reference_solver.BitTask) into (positive mask, negative mask)
+# pairs and indexed as bitsets over the rules, sorted by (d, file order): for every
+# chunk of CHUNK_BITS atoms a table maps the chunk's value in a state to the rules it
+# rules out. A lookup ORs one table entry per chunk and takes the lowest surviving rule,
+# instead of scanning the rules. Results are also memoised per state, so long rollouts
+# mostly cost a dict lookup per step.
+
+POLICY_FILE = "human_policy.pol"
+CHUNK_BITS = 8         # Atoms per lookup table (tables have 2**CHUNK_BITS entries)
+MEMO_SIZE = 1 << 20    # States remembered per executor before the memo is reset
+MAX_STEPS = 200
+BENCH_STATES = 1000    # Distinct states the benchmark walks through
+
+_RULE_RE = re.compile(r"If holds:(.*?)Execute:(.*?)(?=If holds:|\Z)", re.DOTALL)
+_FACT_RE = re.compile(
+    r"\(\s*not\s*\(([^()]*)\)\s*\)"                       # (not (pred a b))
+    r"|\(([^()]*)\)"                                      # (pred a b)
+    r"|(?:\b(NegatedAtom|Atom)\s+)?([\w\-]+)\(([^()]*)\)"  # [Atom|NegatedAtom] pred(a, b)
+    r"|([A-Za-z][\w\-]*)"                                 # nullary pred
+)
+_NONE_OF_THOSE_RE = re.compile(r"<[^>]*>")
+_DISTANCE_RE = re.compile(r"\bd\s*=\s*(\d+)")
+
+
+class PolicyFormatError(Exception):
+    pass
+
+
+class PolicyRule:
+    __slots__ = ("facts", "action", "distance", "order", "pos", "neg")
+
+    def __init__(self, facts, action, distance, order):
+        self.facts = facts        # [(positive, (pred, args))]
+        self.action = action      # ground action name as in BitTask, "schema arg1 arg2"
+        self.distance = distance
+        self.order = order
+        self.pos = self.neg = 0
+
+    @property
+    def key(self):
+        return (self.distance, self.order)
+
+    def matches(self, state):
+        return state & self.pos == self.pos and not state & self.neg
+
+
+def _atom(text):
+    parts = text.replace(",", " ").lower().split()
+    return parts[0], tuple(parts[1:])
+
+
+def _action_name(text):
+    return " ".join(text.replace("(", " ").replace(")", " ").replace(",", " ").lower().split())
+
+
+def parse_facts(text):
+    """Partial state of an 'If holds:' line -> [(positive, atom)]. Accepts the usual spellings."""
+    if re.search(r"\b\d+\s*:\s*\d+\b", text):
+        raise PolicyFormatError("SAS variable:value facts; translate the policy with translate_policy.py first")
+    facts = []
+    for m in _FACT_RE.finditer(_NONE_OF_THOSE_RE.sub(" ", text)):
+        negated, sexpr, prefix, name, args, nullary = m.groups()
+        if negated is not None:
+            facts.append((False, _atom(negated)))
+        elif sexpr is not None:
+            facts.append((True, _atom(sexpr)))
+        elif name is not None:
+            if name.lower() == "not":
+                facts.append((False, _atom(args)))
+            else:
+                facts.append((prefix != "NegatedAtom", _atom(name + " " + args)))
+        elif nullary not in ("and", "Atom", "NegatedAtom"):
+            facts.append((True, (nullary.lower(), ())))
+    return facts
+
+
+def parse_policy(text):
+    """Returns the rules of a translated PRP policy in file order."""
+    rules = []
+    for m in _RULE_RE.finditer(text):
+        condition, execute = m.groups()
+        parts = execute.split("/")
+        action = _action_name(parts[0])
+        if not action:
+            raise PolicyFormatError(f"Rule {len(rules) + 1} has no action")
+        distance = _DISTANCE_RE.search(execute)
+        rules.append(PolicyRule(parse_facts(condition), action,
+                                int(distance.group(1)) if distance else float("inf"), len(rules)))
+    if not rules and text.strip():
+        raise PolicyFormatError("No 'If holds: ... Execute: ...' rules found")
+    return rules
+
+
+def load_policy(path=POLICY_FILE):
+    with open(path) as f:
+        return parse_policy(f.read())
+
+
+def compile_rules(rules, task: BitTask, static_true=frozenset()):
+    """
+    Fills in the masks of every rule for task. Literals over static fluents are evaluated
+    away, as are literals over atoms the pruned task never makes true. Returns the rules
+    that can apply at all, plus counts of what was dropped.
+    """
+    compiled = []
+    stats = {"rules": len(rules), "never_applicable": 0, "unknown_actions": 0}
+    for rule in rules:
+        pos = neg = 0
+        applicable = True
+        for positive, atom in rule.facts:
+            if atom in task.index:
+                if positive:
+                    pos |= 1 << task.index[atom]
+                else:
+                    neg |= 1 << task.index[atom]
+            elif positive != (atom in static_true):
+                applicable = False
+        if not applicable or pos & neg:
+            stats["never_applicable"] += 1
+            continue
+        rule.pos, rule.neg = pos, neg
+        compiled.append(rule)
+    names = {a.name for a in task.leader + task.follower}
+    stats["unknown_actions"] = sum(1 for rule in compiled if rule.action not in names)
+    return compiled, stats
+
+
+class PolicyIndex:
+    """Bitmask index over compiled rules; lookup(state) returns the rule PRP would pick."""
+
+    def __init__(self, rules, chunk_bits=CHUNK_BITS):
+        self.rules = sorted(rules, key=lambda r: r.key)
+        self.all = (1 << len(self.rules)) - 1
+        self.chunk_bits = chunk_bits
+        mentioned = 0
+        for rule in self.rules:
+            mentioned |= rule.pos | rule.neg
+
+        # Rules ruled out by each atom being true / false; bit k stands for self.rules[k]
+        kill_true, kill_false = {}, {}
+        for k, rule in enumerate(self.rules):
+            for masks, literals in ((kill_true, rule.neg), (kill_false, rule.pos)):
+                while literals:
+                    low = literals & -literals
+                    masks[low] = masks.get(low, 0) | 1 << k
+                    literals ^= low
+
+        # One table per chunk of atoms: chunk value -> rules it rules out
+        self.tables = []
+        width = 1 << chunk_bits
+        for shift in range(0, mentioned.bit_length(), chunk_bits):
+            bits = [1 << (shift + j) for j in range(chunk_bits) if mentioned >> (shift + j) & 1]
+            if not bits:
+                continue
+            table = [0] * width
+            for value in range(width):
+                dead = 0
+                for bit in bits:
+                    dead |= kill_true.get(bit, 0) if (value << shift) & bit else kill_false.get(bit, 0)
+                table[value] = dead
+            self.tables.append((shift, table))
+
+    def lookup(self, state):
+        dead = 0
+        mask = (1 << self.chunk_bits) - 1
+        for shift, table in self.tables:
+            dead |= table[(state >> shift) & mask]
+        alive = self.all & ~dead
+        if not alive:
+            return None
+        return self.rules[(alive & -alive).bit_length() - 1]
+
+    def scan(self, state):
+        """Linear reference lookup."""
+        for rule in self.rules:
+            if rule.matches(state):
+                return rule
+        return None
+
+
+class PolicyExecutor:
+    """Runs a policy index on the bit states of a task."""
+
+    def __init__(self, task: BitTask, index: PolicyIndex, memo_size=MEMO_SIZE):
+        self.task = task
+        self.index = index
+        self.actions = {a.name: a for a in task.leader + task.follower}
+        self.memo = {}
+        self.memo_size = memo_size
+
+    def rule(self, state):
+        try:
+            return self.memo[state]
+        except KeyError:
+            if len(self.memo) >= self.memo_size:
+                self.memo.clear()
+            rule = self.memo[state] = self.index.lookup(state)
+            return rule
+
+    def run(self, state, max_steps=MAX_STEPS):
+        """
+        Follows the policy from state. Returns {"outcome", "steps", "plan", "state"}, where
+        outcome is goal, no_rule, unknown_action, inapplicable or max_steps.
+        """
+        plan = []
+        outcome = "max_steps"
+        for _ in range(max_steps):
+            if holds(self.task.goal, state):
+                outcome = "goal"
+                break
+            rule = self.rule(state)
+            if rule is None:
+                outcome = "no_rule"
+                break
+            action = self.actions.get(rule.action)
+            if action is None:
+                outcome = "unknown_action"
+                break
+            if not holds(action.pre, state):
+                outcome = "inapplicable"
+                break
+            state = action.apply(state)
+            plan.append(rule.action)
+        else:
+            if holds(self.task.goal, state):
+                outcome = "goal"
+        return {"outcome": outcome, "steps": len(plan), "plan": plan, "state": state}
+
+
+def apply_fixes(task: BitTask, fixes):
+    """Applies leader actions given as plan steps ('fix_patch_cve defender_agent pc1 ext_cve1')."""
+    leader = {a.name: a for a in task.leader}
+    state = task.init
+    for step in fixes:
+        action = leader.get(_action_name(step))
+        if action is None or not holds(action.pre, state):
+            raise ValueError(f"Not an applicable defender action: {step}")
+        state = action.apply(state)
+    return state
+
+
+def sample_states(task: BitTask, state, count=BENCH_STATES, seed=0):
+    """Distinct states reached by random walks over every action, starting from state."""
+    rng = random.Random(seed)
+    actions = task.leader + task.follower
+    start, seen = state, {state}
+    for _ in range(count * 20):
+        if len(seen) >= count:
+            break
+        applicable = [a for a in actions if holds(a.pre, state)]
+        state = rng.choice(applicable).apply(state) if applicable and rng.random() > 0.05 else start
+        seen.add(state)
+    return list(seen)
+
+
+def benchmark(executor, states, lookups):
+    """Lookups per second through the index alone, the memo and a linear scan."""
+    results = {}
+    n = len(states)
+    for label, fn, count in (("index", executor.index.lookup, lookups),
+                             ("memoised", executor.rule, lookups),
+                             ("linear scan", executor.index.scan, max(1, lookups // 100))):
+        start = time.perf_counter()
+        for k in range(count):
+            fn(states[k % n])
+        elapsed = time.perf_counter() - start
+        results[label] = count / elapsed if elapsed else float("inf")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a translated PRP policy and execute it on a domain.")
+    parser.add_argument("policy", nargs="?", default=POLICY_FILE, help=f"Policy file (default: {POLICY_FILE})")
+    parser.add_argument("--ext", type=int, default=1)
+    parser.add_argument("--int", type=int, dest="int_", default=1)
+    parser.add_argument("--crit", type=int, default=1)
+    parser.add_argument("--connectivity", default="pairwise")
+    parser.add_argument("--domain", help="Use this domain.pddl (with --problem) instead of generating")
+    parser.add_argument("--problem")
+    parser.add_argument("--fix", action="append", default=[],
+                        help="Defender action to apply before running the policy (repeatable)")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--bench", type=int, metavar="N", help="Time N lookups over sampled reachable states")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the index against a linear scan on the sampled states")
+    args = parser.parse_args()
+
+    if args.domain:
+        from unified_planning.io import PDDLReader
+        problem = PDDLReader().parse_problem(args.domain, args.problem)
+    else:
+        from final_gridworld_domain import setup_domain
+        from translate_independent import create_problem
+        counts = {'external': args.ext, 'internal': args.int_, 'critical': args.crit}
+        with contextlib.redirect_stdout(io.StringIO()):
+            problem: Problem = create_problem(partial(setup_domain, pc_count_by_segment=counts,
+                                                      connectivity=args.connectivity))
+
+    ground = ground_prune.ground(problem)
+    task = BitTask(ground)
+    rules, stats = compile_rules(load_policy(args.policy), task, ground.static_true)
+    start = time.perf_counter()
+    index = PolicyIndex(rules)
+    print(f"{stats['rules']} rules, {stats['never_applicable']} never applicable, "
+          f"{stats['unknown_actions']} with unknown actions; {len(index.tables)} lookup tables "
+          f"built in {time.perf_counter() - start:.3f}s")
+
+    executor = PolicyExecutor(task, index)
+    state = apply_fixes(task, args.fix)
+    result = executor.run(state, args.max_steps)
+    print(f"Policy run: {result['outcome']} after {result['steps']} steps")
+    for step in result["plan"]:
+        print(f"  {step}")
+
+    if args.bench or args.verify:
+        states = sample_states(task, state)
+        if args.verify:
+            mismatches = sum(1 for s in states if index.lookup(s) is not index.scan(s))
+            print(f"Index vs linear scan on {len(states)} states: {mismatches} mismatches")
+            if mismatches:
+                raise SystemExit(1)
+        if args.bench:
+            for label, rate in benchmark(executor, states, args.bench).items():
+                print(f"{label:>12}: {rate:,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+from unified_planning.model import Problem
+from functools import partial
+import argparse
+import contextlib
+import heapq
+import io
+import itertools
+import json
+
+import ground_prune
+
+# Explicit-state reference solver for the Stackelberg task, meant for small instances
+# (1-3 PCs per segment). The leader (fix_* actions) first applies a sequence of fixes;
+# the follower (attack_* actions) then plans to the goal from the resulting state. Every
+# leader state is enumerated breadth-first by cost, each one gets an optimal follower
+# search, and the result is the Pareto frontier of (defender cost, attacker cost) in the
+# planner's pareto_frontier.json format. All actions cost 1, as in the generated PDDL.
+#
+# The task is grounded and pruned with ground_prune first; states are ints with one bit
+# per ground atom and preconditions are DNFs of (positive mask, negative mask) pairs.
+
+INFINITE_COST = 2147483647  # What the planner reports when the attacker cannot succeed
+MAX_LEADER_STATES = 200000
+OUTPUT_FILE = "pareto_frontier_reference.json"
+
+
+def _dnf(f, index):
+    """Ground formula -> list of (pos_mask, neg_mask), contradictory clauses dropped."""
+    if f is True:
+        return [(0, 0)]
+    if f is False:
+        return []
+    if f[0] == 'atom':
+        return [(1 << index[f[1]], 0)]
+    if f[0] == 'not':
+        return [(0, 1 << index[f[1]])]
+    if f[0] == 'or':
+        return [clause for part in f[1] for clause in _dnf(part, index)]
+    clauses = [(0, 0)]
+    for part in f[1]:
+        clauses = [(p1 | p2, n1 | n2) for p1, n1 in clauses for p2, n2 in _dnf(part, index)
+                   if not (p1 | p2) & (n1 | n2)]
+    return clauses
+
+
+def holds(dnf, state):
+    """True if some clause of a DNF (see _dnf) holds in the bit state."""
+    for pos, neg in dnf:
+        if state & pos == pos and not state & neg:
+            return True
+    return False
+
+
+class BitAction:
+    __slots__ = ("name", "pre", "add", "delete", "conditional")
+
+    def __init__(self, name, pre, add, delete, conditional):
+        self.name = name
+        self.pre = pre
+        self.add = add
+        self.delete = delete
+        self.conditional = conditional  # [(condition dnf, mask, value)]
+
+    def apply(self, state):
+        add, delete = self.add, self.delete
+        for cond, mask, value in self.conditional:
+            if holds(cond, state):
+                if value:
+                    add |= mask
+                else:
+                    delete |= mask
+        return (state & ~delete) | add
+
+
+class BitTask:
+    """A ground task packed into bitsets, split into leader and follower actions."""
+
+    def __init__(self, task):
+        atoms = set(task.init)
+        ground_prune._atoms_of(task.goal, atoms)
+        for a in task.actions:
+            ground_prune._atoms_of(a.pre, atoms)
+            for cond, atom, _ in a.effects:
+                ground_prune._atoms_of(cond, atoms)
+                atoms.add(atom)
+        self.atoms = sorted(atoms)
+        self.index = {atom: i for i, atom in enumerate(self.atoms)}
+
+        self.init = 0
+        for atom in task.init:
+            self.init |= 1 << self.index[atom]
+        self.goal = _dnf(task.goal, self.index)
+
+        self.leader, self.follower = [], []
+        for a in task.actions:
+            add = delete = 0
+            conditional = []
+            for cond, atom, value in a.effects:
+                mask = 1 << self.index[atom]
+                if cond is not True:
+                    conditional.append((_dnf(cond, self.index), mask, value))
+                elif value:
+                    add |= mask
+                else:
+                    delete |= mask
+            action = BitAction(" ".join((a.schema,) + a.args), _dnf(a.pre, self.index), add, delete, conditional)
+            (self.leader if a.schema.startswith("fix_") else self.follower).append(action)
+
+        # The most goal literals one follower action can make true: positive goal atoms it
+        # adds plus negative goal atoms it deletes (the generated goals have no negative ones)
+        goal_pos = goal_neg = 0
+        for pos, neg in self.goal:
+            goal_pos |= pos
+            goal_neg |= neg
+        self.max_goal_progress = max(
+            [bin(((a.add | sum(m for _, m, v in a.conditional if v)) & goal_pos)
+                 | ((a.delete | sum(m for _, m, v in a.conditional if not v)) & goal_neg)).count("1")
+             for a in self.follower] + [1])
+
+        self.by_name = {a.name: a for a in self.follower}
+        self.leader_restricts = self._leader_only_restricts()
+
+    def _leader_only_restricts(self):
+        """
+        True if every leader effect deletes atoms the follower only needs to be true, or adds
+        atoms it only needs to be false. Then any follower plan that works after a fix also
+        worked before it, so fixes can only raise the attacker cost.
+        """
+        if any(a.conditional for a in self.follower):
+            return False
+        positive = negative = 0
+        for pos, neg in self.goal:
+            positive |= pos
+            negative |= neg
+        for a in self.follower:
+            for pos, neg in a.pre:
+                positive |= pos
+                negative |= neg
+        for a in self.leader:
+            if a.conditional:
+                return False
+            if a.delete & negative or a.add & positive:
+                return False
+        return True
+
+    def plan_valid(self, state, plan):
+        for name in plan:
+            action = self.by_name[name]
+            if not holds(action.pre, state):
+                return False
+            state = action.apply(state)
+        return holds(self.goal, state)
+
+    def relaxed_goal_reachable(self, state):
+        """Delete-relaxed reachability of the goal by follower actions (adds stay, deletes only enable negations)."""
+        pos, deletable = state, 0
+        changed = True
+        while changed:
+            changed = False
+            for a in self.follower:
+                for p, n in a.pre:
+                    if pos & p == p and not (n & state & ~deletable):
+                        adds = a.add | sum(m for _, m, v in a.conditional if v)
+                        dels = a.delete | sum(m for _, m, v in a.conditional if not v)
+                        if adds & ~pos or dels & ~deletable:
+                            pos |= adds
+                            deletable |= dels
+                            changed = True
+                        break
+        return any(pos & p == p and not (n & state & ~deletable) for p, n in self.goal)
+
+    def goal_distance(self, state):
+        """
+        Admissible estimate of the follower actions still needed to reach the goal: the unsatisfied
+        literals of the closest goal clause over max_goal_progress. An action can satisfy at most
+        that many; goal atoms it deletes only add work, so ignoring them keeps the bound.
+        """
+        missing = min((bin(pos & ~state).count("1") + bin(neg & state).count("1") for pos, neg in self.goal),
+                      default=0)
+        return -(-missing // self.max_goal_progress)
+
+
+def follower_search(task, state, memo, parent_result=None):
+    """
+    Optimal follower plan from state by A* with the goal-count heuristic (unsatisfied goal
+    literals divided by the most goal literals one follower action can satisfy, which is
+    admissible); memoised per state.
+    parent_result is the follower result of the leader state this one was reached from.
+    When fixes can only take options away from the follower (task.leader_restricts), a
+    parent plan that still works is optimal here too, and a parent dead end stays one.
+    """
+    if state in memo:
+        return memo[state]
+    if parent_result is not None and task.leader_restricts:
+        cost, plan = parent_result
+        if cost == INFINITE_COST or task.plan_valid(state, plan):
+            memo[state] = parent_result
+            return parent_result
+    if not task.relaxed_goal_reachable(state):
+        # Dead end for the follower; no need to exhaust the state space to find out
+        memo[state] = (INFINITE_COST, [])
+        return memo[state]
+    parents = {state: None}
+    best_g = {state: 0}
+    counter = itertools.count()
+    frontier = [(task.goal_distance(state), 0, next(counter), state)]
+    result = (INFINITE_COST, [])
+    while frontier:
+        _, g, _, s = heapq.heappop(frontier)
+        if g > best_g[s]:
+            continue
+        if holds(task.goal, s):
+            plan = []
+            while parents[s] is not None:
+                s, name = parents[s]
+                plan.append(name)
+            plan.reverse()
+            result = (len(plan), plan)
+            break
+        for action in task.follower:
+            if holds(action.pre, s):
+                nxt = action.apply(s)
+                if g + 1 < best_g.get(nxt, INFINITE_COST):
+                    best_g[nxt] = g + 1
+                    parents[nxt] = (s, action.name)
+                    heapq.heappush(frontier, (g + 1 + task.goal_distance(nxt), g + 1, next(counter), nxt))
+    memo[state] = result
+    return result
+
+
+def solve(problem: Problem, max_leader_states=MAX_LEADER_STATES):
+    """
+    Returns (frontier, stats). frontier is a list of {"attacker cost", "defender cost",
+    "sequences", "attacker plan"} with strictly increasing attacker cost.
+    """
+    task = BitTask(ground_prune.ground(problem))
+    memo = {}
+
+    parents = {task.init: None}
+    layer = [task.init]
+    frontier = []
+    best_attacker = -1
+    cost = 0
+    complete = True
+    while layer:
+        # The best follower response to any leader state of this cost
+        results = [(follower_search(task, s, memo, memo.get(parents[s][0]) if parents[s] else None), s)
+                   for s in layer]
+        attacker_cost = max(r[0][0] for r in results)
+        if attacker_cost > best_attacker:
+            best_states = [(plan, s) for (c, plan), s in results if c == attacker_cost]
+            frontier.append({
+                "attacker cost": attacker_cost,
+                "defender cost": cost,
+                "sequences": [_leader_sequence(parents, s) for _, s in best_states],
+                "attacker plan": best_states[0][0],
+            })
+            best_attacker = attacker_cost
+        if best_attacker == INFINITE_COST:
+            break
+
+        next_layer = []
+        for s in layer:
+            for action in task.leader:
+                if holds(action.pre, s):
+                    nxt = action.apply(s)
+                    if nxt not in parents:
+                        parents[nxt] = (s, action.name)
+                        next_layer.append(nxt)
+        if len(parents) > max_leader_states:
+            complete = False
+            break
+        layer = next_layer
+        cost += 1
+
+    stats = {
+        "atoms": len(task.atoms),
+        "leader_actions": len(task.leader),
+        "follower_actions": len(task.follower),
+        "leader_states": len(parents),
+        "follower_searches": len(memo),
+        "complete": complete,
+    }
+    return frontier, stats
+
+
+def _leader_sequence(parents, state):
+    seq = []
+    while parents[state] is not None:
+        state, name = parents[state]
+        seq.append(name)
+    seq.reverse()
+    return seq
+
+
+def compare_frontiers(reference, other):
+    """Compares the (defender cost, attacker cost) points of two frontiers; returns the differences."""
+    points = lambda frontier: {(e["defender cost"], e["attacker cost"]) for e in frontier}
+    ref, oth = points(reference), points(other)
+    return {"missing": sorted(ref - oth), "unexpected": sorted(oth - ref)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explicit-state Stackelberg reference solver for small instances.")
+    parser.add_argument("--ext", type=int, default=1)
+    parser.add_argument("--int", type=int, dest="int_", default=1)
+    parser.add_argument("--crit", type=int, default=1)
+    parser.add_argument("--connectivity", default="pairwise")
+    parser.add_argument("--domain", help="Solve this domain.pddl (with --problem) instead of generating")
+    parser.add_argument("--problem")
+    parser.add_argument("--max-leader-states", type=int, default=MAX_LEADER_STATES)
+    parser.add_argument("--out", default=OUTPUT_FILE, help=f"Where to write the frontier (default: {OUTPUT_FILE})")
+    parser.add_argument("--compare", metavar="FRONTIER", help="A planner pareto_frontier.json to check against")
+    args = parser.parse_args()
+
+    if args.domain:
+        from unified_planning.io import PDDLReader
+        problem = PDDLReader().parse_problem(args.domain, args.problem)
+    else:
+        from final_gridworld_domain import setup_domain
+        from translate_independent import create_problem
+        counts = {'external': args.ext, 'internal': args.int_, 'critical': args.crit}
+        with contextlib.redirect_stdout(io.StringIO()):
+            problem = create_problem(partial(setup_domain, pc_count_by_segment=counts,
+                                             connectivity=args.connectivity))
+
+    frontier, stats = solve(problem, args.max_leader_states)
+    with open(args.out, "w") as f:
+        json.dump(frontier, f)
+
+    for entry in frontier:
+        attacker = "inf" if entry["attacker cost"] == INFINITE_COST else entry["attacker cost"]
+        print(f"defender {entry['defender cost']:>3} -> attacker {attacker:>4} "
+              f"({len(entry['sequences'])} fix sequences)")
+    print(f"{stats['leader_states']} leader states, {stats['follower_searches']} follower searches, "
+          f"{stats['atoms']} atoms" + ("" if stats["complete"] else " (INCOMPLETE: leader state limit hit)"))
+
+    if args.compare:
+        with open(args.compare) as f:
+            diff = compare_frontiers(frontier, json.load(f))
+        if diff["missing"] or diff["unexpected"]:
+            print(f"Frontier differs from {args.compare}: missing {diff['missing']}, unexpected {diff['unexpected']}")
+            raise SystemExit(1)
+        print(f"Frontier matches {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import json
+import os
+import shlex
+import socket
+import sqlite3
+import time
+
+# SQLite store for gridsearch results, next to the CSV. Every run is one row of `runs`
+# with typed columns and a separate status instead of "TIMEOUT" strings in the time
+# columns; `sweeps` holds the metadata of the sweep a run belongs to (budget, limits,
+# generator arguments, planner build). A config that is run again gets a new row, and
+# the `latest` view keeps the most recent one per config and sweep variant (the generator
+# arguments, which change the task the planner solves). A ResultStore queries one variant.
+#
+# The database runs in WAL mode so several processes (parallel sweeps, the plotter) can
+# read and write at once; keep it on a local disk, WAL does not work over NFS.
+
+STORE_FILE = "gridsearch_results.sqlite"
+BUSY_TIMEOUT = 60
+TIMEOUT_VALUE = 1800  # Time plotted for timed-out and pruned configs, like plot_results does for the CSV
+
+STATUSES = ("solved", "unsolved", "timeout", "memout", "skipped", "interpolated", "error")
+PLOTTED_STATUSES = ("solved", "unsolved", "interpolated", "timeout", "skipped")  # Those with a time to plot
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    host TEXT,
+    timeout INTEGER,
+    memory_mb INTEGER,
+    cpu_seconds INTEGER,
+    gen_args TEXT,      -- JSON list
+    planner_cmd TEXT,   -- JSON list
+    planner_build TEXT,
+    source TEXT         -- CSV file for imported rows
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    sweep INTEGER REFERENCES sweeps (id),
+    ext INTEGER NOT NULL,
+    int INTEGER NOT NULL,
+    crit INTEGER NOT NULL,
+    total_pcs INTEGER NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('solved', 'unsolved', 'timeout', 'memout', 'skipped', 'interpolated', 'error')),
+    translator_s REAL,
+    preprocessor_s REAL,
+    search_s REAL,
+    total_s REAL,
+    peak_rss_mb REAL,
+    generation_s REAL,
+    generation_peak_mb REAL,
+    objects INTEGER,
+    initial_facts INTEGER,
+    goals INTEGER,
+    timeout INTEGER,
+    memory_mb INTEGER,
+    blocker TEXT,       -- JSON config a skipped run dominates
+    cached INTEGER NOT NULL DEFAULT 0,
+    finished REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS log_metrics (  -- Back-filled from archived planner logs by log_archive.py
+    ext INTEGER NOT NULL,
+    int INTEGER NOT NULL,
+    crit INTEGER NOT NULL,
+    log TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (log, name)
+);
+CREATE INDEX IF NOT EXISTS log_metrics_config ON log_metrics (name, ext, int, crit);
+CREATE INDEX IF NOT EXISTS runs_config ON runs (ext, int, crit, id);
+CREATE INDEX IF NOT EXISTS runs_crit ON runs (crit, ext, int);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status);
+DROP VIEW IF EXISTS latest;  -- Stores before variants had one latest run per config
+CREATE VIEW latest AS
+    SELECT runs.*, COALESCE(sweeps.gen_args, '[]') AS gen_args FROM runs LEFT JOIN sweeps ON sweeps.id = runs.sweep
+    WHERE runs.id IN (SELECT MAX(r.id) FROM runs r LEFT JOIN sweeps s ON s.id = r.sweep
+                      GROUP BY COALESCE(s.gen_args, '[]'), r.ext, r.int, r.crit);
+"""
+
+# Store column -> CSV header, for frames that the CSV-based plotting code can use as they are
+FRAME_COLUMNS = [
+    ("ext", "Ext PCs"), ("int", "Int PCs"), ("crit", "Crit PCs"), ("total_pcs", "Total PCs"),
+    ("translator_s", "Translator (s)"), ("preprocessor_s", "Preprocessor (s)"), ("search_s", "Search (s)"),
+    ("total_s", "Total Time (s)"), ("status", "Status"), ("peak_rss_mb", "Peak RSS (MB)"),
+]
+TIME_COLUMNS = ("translator_s", "preprocessor_s", "search_s", "total_s")
+
+
+def _number(value, kind=float):
+    """CSV cell -> number, None for empty cells and markers such as TIMEOUT."""
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def row_status(row):
+    """Status of a gridsearch CSV row (run_gridsearch.HEADERS layout)."""
+    marker = str(row[7])
+    if marker == "TIMEOUT":
+        return "timeout"
+    if marker == "MEMOUT":
+        return "memout"
+    if marker == "SKIPPED_DOMINATED":
+        return "skipped"
+    if str(row[8]) == "INTERPOLATED":
+        return "interpolated"
+    return "solved" if str(row[8]) == "True" else "unsolved"
+
+
+class ResultStore:
+    """
+    One connection to the store; create one per process. Queries return the results of the
+    sweeps run with gen_args (default: the plain generator).
+    """
+
+    def __init__(self, path=STORE_FILE, gen_args=()):
+        self.path = path
+        self.gen_args = json.dumps(list(gen_args))
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.sweep = None
+
+    def close(self):
+        self.db.close()
+
+    def start_sweep(self, timeout=None, memory_mb=None, cpu_seconds=None, gen_args=(), planner_cmd=(),
+                    planner_build=None, source=None):
+        """Records the metadata of a sweep; runs added afterwards belong to it."""
+        cur = self.db.execute(
+            "INSERT INTO sweeps (started, host, timeout, memory_mb, cpu_seconds, gen_args, planner_cmd, "
+            "planner_build, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), socket.gethostname(), timeout, memory_mb, cpu_seconds, json.dumps(list(gen_args)),
+             json.dumps(list(planner_cmd)), planner_build, source))
+        self.sweep = cur.lastrowid
+        return self.sweep
+
+    def add_row(self, row, timeout=None, memory_mb=None, blocker=None, cached=False, finished=None):
+        """Adds a run from its CSV row."""
+        row = list(row) + [""] * (15 - len(row))
+        status = row_status(row)
+        times = [_number(x) for x in row[4:8]] if status in ("solved", "unsolved", "interpolated") else [None] * 4
+        self.db.execute(
+            "INSERT INTO runs (sweep, ext, int, crit, total_pcs, status, translator_s, preprocessor_s, search_s, "
+            "total_s, peak_rss_mb, generation_s, generation_peak_mb, objects, initial_facts, goals, timeout, "
+            "memory_mb, blocker, cached, finished) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.sweep, int(row[0]), int(row[1]), int(row[2]), int(row[3]), status, *times,
+             _number(row[9]), _number(row[10]), _number(row[11]), _number(row[12], int), _number(row[13], int),
+             _number(row[14], int), timeout, memory_mb, json.dumps(list(blocker)) if blocker else None,
+             int(bool(cached)), finished or time.time()))
+
+    def add_error(self, config, timeout=None):
+        """Adds a run whose PDDL generation failed."""
+        e, i, c = config
+        self.db.execute(
+            "INSERT INTO runs (sweep, ext, int, crit, total_pcs, status, timeout, finished) "
+            "VALUES (?, ?, ?, ?, ?, 'error', ?, ?)", (self.sweep, e, i, c, e + i + c, timeout, time.time()))
+
+    def import_csv(self, csv_path, gen_args=()):
+        """Adds every row of a gridsearch CSV as one imported sweep; returns the number of rows."""
+        with open(csv_path, newline="") as f:
+            rows = list(csv.reader(f))[1:]
+        finished = os.path.getmtime(csv_path)
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.start_sweep(gen_args=gen_args, source=os.path.abspath(csv_path))
+            for row in rows:
+                self.add_row(row, finished=finished)
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def add_metrics(self, parsed):
+        """Stores [(config, log path, {name: value})] from log_archive, replacing earlier values."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            for (e, i, c), log, values in parsed:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO log_metrics (ext, int, crit, log, name, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(e, i, c, log, name, None if value is None else float(value)) for name, value in values.items()])
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def _where(self, ext=None, int_=None, crit=None, balanced=False, statuses=None):
+        clauses, params = ["gen_args = ?"], [self.gen_args]
+        for column, value in (("ext", ext), ("int", int_), ("crit", crit)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if balanced:
+            clauses.append("ext = int AND int = crit")
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        return " WHERE " + " AND ".join(clauses), params
+
+    def slice(self, ext=None, int_=None, crit=None, balanced=False, timeout_value=TIMEOUT_VALUE):
+        """
+        Latest result of every config matching the filters as a DataFrame with the CSV's
+        column names. Timed-out and pruned configs get timeout_value as their times; memouts
+        and generation errors have no time and are left out, as in plot_results' CSV loading.
+        """
+        import pandas as pd
+
+        where, params = self._where(ext, int_, crit, balanced, PLOTTED_STATUSES)
+        columns = ", ".join(
+            f"COALESCE({column}, CASE WHEN status IN ('timeout', 'skipped') THEN {float(timeout_value)!r} END) "
+            f"AS \"{header}\"" if column in TIME_COLUMNS else f"{column} AS \"{header}\""
+            for column, header in FRAME_COLUMNS)
+        return pd.read_sql_query(f"SELECT {columns} FROM latest{where} ORDER BY ext, int, crit", self.db,
+                                 params=params)
+
+    def values(self, column):
+        """Distinct values of ext, int or crit among the latest results that slice() returns."""
+        if column not in ("ext", "int", "crit"):
+            raise ValueError(f"Not a config column: {column}")
+        where, params = self._where(statuses=PLOTTED_STATUSES)
+        return [v for (v,) in self.db.execute(f"SELECT DISTINCT {column} FROM latest{where} ORDER BY {column}",
+                                              params)]
+
+    def counts(self):
+        where, params = self._where()
+        return dict(self.db.execute(f"SELECT status, COUNT(*) FROM latest{where} GROUP BY status", params).fetchall())
+
+    def variants(self):
+        """Generator arguments of every variant with results (empty for imported CSVs)."""
+        return [json.loads(args) for (args,) in self.db.execute("SELECT DISTINCT gen_args FROM latest ORDER BY gen_args")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store of gridsearch results.")
+    parser.add_argument("--db", default=STORE_FILE, help=f"Store to use (default: {STORE_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Add the rows of gridsearch CSVs (e.g. from before --store)")
+    imp.add_argument("csv", nargs="+")
+    imp.add_argument("--gen-args", default="", help="Generator arguments the CSVs' sweep ran with")
+    sub.add_parser("summary", help="Configs per status")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    if args.command == "import":
+        for path in args.csv:
+            print(f"Imported {store.import_csv(path, shlex.split(args.gen_args))} rows from {path}")
+    variants = store.variants()
+    store.close()
+    for gen_args in variants:
+        store = ResultStore(args.db, gen_args)
+        counts = store.counts()
+        print(f"{args.db} {gen_args or '(default generator)'}: {sum(counts.values())} configs, " +
+              ", ".join(f"{counts[s]} {s}" for s in STATUSES if s in counts))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
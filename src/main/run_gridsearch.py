@@ -1,20 +1,63 @@
 import subprocess
 import re
 import csv
+import hashlib
 import os
+import shutil
+import shlex
+import argparse
+import contextlib
 import itertools
+import json
+import multiprocessing
+import sys
 import time
+import signal
+import threading
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import adaptive_sweep
+import generator_worker
+import job_queue
+import log_archive
+import pddl_cache
+import planner_cache
+import proc_tree
+import result_store
 
 # range(1, 4) means [1, 2, 3]
-EXT_RANGE = range(1, 8)  
+EXT_RANGE = range(1, 8)
 INT_RANGE = range(1, 8)
 CRIT_RANGE = range(1, 8)
 
-CONFIG_FILE = "final_gridworld_domain.py"
 OUTPUT_CSV = "gridsearch_results.csv"
+RUNS_DIR = "gridsearch_runs"  # One workspace per config: generated PDDL, planner files and log
+JOURNAL_FILE = "gridsearch_journal.jsonl"  # Started/finished events per config, used to resume
+FRONTIER_FILE = "solvability_frontier.json"  # Boundary between configs that finish and configs that time out
+GENERATION_FILE = "generation.json"  # Per-phase generator instrumentation, written into the workspace
+ADAPTIVE_CSV = "gridsearch_results_adaptive.csv"  # --adaptive: measured, interpolated and predicted rows for the whole cube
+ADAPTIVE_FILE = "adaptive_frontier.json"  # --adaptive: boundary per (Ext, Int) column and runtime growth factors
 TIMEOUT = 1800  # 30 minutes
+QUEUE_POLL_INTERVAL = 5  # Seconds between queue checks of idle workers and the coordinator
+RSS_SAMPLE_INTERVAL = 0.2  # Seconds between /proc samples of the planner's memory
+KILL_ATTEMPTS = 20  # Rounds of SIGKILL to the planner's process group before giving up on stragglers
+PLANNER_CORES = None  # Cores this process pins its planners to (--pin-cores; one set per pool worker)
+
+# Exit codes of the Fast Downward driver for running out of memory / time: the old driver
+# the Stackelberg planner is based on (6-8) and the newer translate/search codes (20-24).
+# Runs that run into both limits count as memouts.
+MEMOUT_EXIT_CODES = {6, 8, 20, 22, 24}
+TIMEOUT_EXIT_CODES = {7, 21, 23, -signal.SIGXCPU}
+MEMOUT_MARKERS = ("MemoryError", "std::bad_alloc", "Memory limit has been reached")
+
+VARIANTS_FILE = "gridsearch_variants.json"  # File suffix -> generator arguments of every sweep variant (see use_variant_outputs)
 
-GEN_CMD = ["python3", "translate_independent.py"]
+# Next to this script, so sweeps can run from any directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GEN_CMD = [sys.executable, os.path.join(SCRIPT_DIR, "translate_independent.py")]
+GEN_SERVER_CMD = [sys.executable, os.path.join(SCRIPT_DIR, "generator_worker.py")]
 
 PLANNER_CMD = [
     "./stackelberg-planner-sls/src/fast-downward.py",
@@ -24,70 +67,964 @@ PLANNER_CMD = [
     "sym_stackelberg(optimal_engine=symbolic(plan_reuse_minimal_task_upper_bound=false, plan_reuse_upper_bound=true), upper_bound_pruning=false)"
 ]
 
-def update_domain_config(file_path, ext_count, int_count, crit_count):
+HEADERS = ["Ext PCs", "Int PCs", "Crit PCs", "Total PCs",
+           "Translator (s)", "Preprocessor (s)", "Search (s)",
+           "Total Time (s)", "Solved", "Peak RSS (MB)",
+           "Generation (s)", "Generation Peak (MB)", "Objects", "Initial Facts", "Goals"]
+
+
+TRANSLATOR_RE = re.compile(r"Done! \[.*?([\d\.]+)s wall-clock\]")
+PREPROCESSOR_RE = re.compile(r"Preprocessor time:\s*([\d\.]+)s")
+SEARCH_RE = re.compile(r"Search time:\s*([\d\.]+)s")
+TOTAL_RE = re.compile(r"Total time:\s*([\d\.]+)s")
+
+
+class OutputParser:
     """
-    Updates the 'pc_count_by_segment' dictionary in the config file.
+    Incremental version of parse_output: feed it the planner's output one line at a time
+    and `times` is always up to date with the phases seen so far.
     """
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    subs = {
-        'external': ext_count,
-        'internal': int_count,
-        'critical': crit_count
-    }
 
-    new_content = content
-    for key, val in subs.items():
-        pattern = f"(['\"]{key}['\"]\s*:\s*)(\d+)"
-        
-        if not re.search(pattern, new_content):
-            print(f"WARNING: Could not find key '{key}' in {file_path}")
-            continue
-            
-        new_content = re.sub(pattern, f"\\g<1>{val}", new_content)
+    def __init__(self):
+        self.times = {
+            "translator": 0.0,
+            "preprocessor": 0.0,
+            "search": 0.0,
+            "total_wall": 0.0, # Calculated later
+            "solved": False
+        }
+        self.out_of_memory = False
 
-    if new_content != content:
-        with open(file_path, 'w') as f:
-            f.write(new_content)
-    else:
-        print("  Warning: Config file was not changed (regex match failed?).")
+    def feed(self, line):
+        """Parses one line. Returns the name of the field it set, or None."""
+        # Translator (Wall clock)
+        trans = TRANSLATOR_RE.search(line)
+        if trans and self.times["translator"] == 0.0:
+            self.times["translator"] = float(trans.group(1))
+            return "translator"
+
+        # Preprocessor
+        prep = PREPROCESSOR_RE.search(line)
+        if prep and self.times["preprocessor"] == 0.0:
+            self.times["preprocessor"] = float(prep.group(1))
+            return "preprocessor"
+
+        # Search Time (Algorithm)
+        search = SEARCH_RE.search(line)
+        if search and self.times["search"] == 0.0:
+            self.times["search"] = float(search.group(1))
+            return "search"
+
+        # Real Total (the last one in the log wins)
+        total = TOTAL_RE.search(line)
+        if total:
+            self.times["total_wall"] = float(total.group(1))
+            return "total_wall"
+
+        if "Pareto-frontier size:" in line:
+            self.times["solved"] = True
+            return "solved"
+
+        if any(marker in line for marker in MEMOUT_MARKERS):
+            self.out_of_memory = True
+        return None
 
 
 def parse_output(output_text):
-    times = {
-        "translator": 0.0,
-        "preprocessor": 0.0,
-        "search": 0.0,
-        "total_wall": 0.0, # Calculated later
-        "solved": False
+    parser = OutputParser()
+    for line in output_text.splitlines():
+        parser.feed(line)
+    return parser.times
+
+
+def workspace_dir(config, owner=None):
+    """
+    The config's workspace. Queue workers pass an owner (worker and attempt): a lease can
+    expire while its planner still runs, and the worker that re-claims the config must not
+    wipe the files of the first one on the shared directory.
+    """
+    e, i, c = config
+    name = f"ext{e}_int{i}_crit{c}" + (f"_{owner}".replace(":", "_") if owner else "")
+    return os.path.abspath(os.path.join(RUNS_DIR, name))
+
+
+_gen_clients = {}
+
+
+def _gen_client(socket_path):
+    """One connection per process to the generator server (each pool worker gets its own)."""
+    if socket_path not in _gen_clients:
+        _gen_clients[socket_path] = generator_worker.GeneratorClient(socket_path)
+    return _gen_clients[socket_path]
+
+
+def generate(config, workdir, gen_args=(), cache_dir=None, instrument=False, gen_server=None):
+    """
+    Writes the config's domain.pddl/problem.pddl into workdir. With a cache_dir the
+    instance is taken from the PDDL cache when possible and stored there after generating.
+    With instrument, the generator also writes its phase timings to GENERATION_FILE
+    (not on a cache hit, where nothing was generated).
+    With gen_server (a socket path), generation goes to a running generator_worker
+    instead of a fresh translate_independent.py process.
+    Returns True if the files came from the cache.
+    """
+    e, i, c = config
+    key = None
+    if cache_dir:
+        key = pddl_cache.instance_key({"counts": list(config), "gen_args": list(gen_args)})
+        if pddl_cache.fetch(key, workdir, cache_dir):
+            return True
+
+    instrument_path = os.path.join(workdir, GENERATION_FILE) if instrument else None
+    if gen_server:
+        params = {"argv": list(gen_args), "ext": e, "int": i, "crit": c, "instrument": instrument_path}
+        _gen_client(gen_server).generate("network", params, workdir)
+    else:
+        gen_cmd = GEN_CMD + list(gen_args) + ["--ext", str(e), "--int", str(i), "--crit", str(c), "--out-dir", workdir]
+        if instrument:
+            gen_cmd += ["--instrument", instrument_path]
+        subprocess.run(gen_cmd, check=True, stdout=subprocess.DEVNULL)
+    if key:
+        # The timings describe this run only, so they are not stored with the PDDL
+        pddl_cache.store(key, workdir, cache_dir, exclude=(GENERATION_FILE,))
+    return False
+
+
+@contextlib.contextmanager
+def gen_server_running(socket_path):
+    """Starts a generator_worker on socket_path for the duration, unless one is already listening."""
+    proc = None
+    if socket_path:
+        try:
+            generator_worker.GeneratorClient(socket_path).close()
+            print(f"Using generator server on {socket_path}")
+        except (FileNotFoundError, ConnectionRefusedError):
+            proc = subprocess.Popen(GEN_SERVER_CMD + ["--socket", socket_path])
+            generator_worker.wait_for_server(socket_path)
+    try:
+        yield
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+def load_generation_summary(workdir):
+    """The generator's totals and problem size counts from GENERATION_FILE, or None."""
+    try:
+        with open(os.path.join(workdir, GENERATION_FILE)) as f:
+            stats = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return {**stats["total"], **stats["counts"]}
+
+
+def run_config(config, timeout=None, gen_args=(), cache_dir=None,
+               result_cache_dir=None, refresh_results=False, ignore_cached_timeouts=False,
+               instrument=False, gen_server=None, memory_mb=None, cpu_seconds=None, log_archive_dir=None,
+               owner=None):
+    """
+    Generates and solves a single (Ext, Int, Crit) config inside its own workspace,
+    so that any number of configs can run side by side.
+    With a result_cache_dir, a stored planner result for the same PDDL, planner arguments and
+    planner build is returned (and its log restored) instead of running the planner.
+    memory_mb and cpu_seconds cap every planner process (see run_planner).
+    With a log_archive_dir, the planner log of every actual run is kept there compressed.
+    owner selects a private workspace (see workspace_dir).
+    Returns a dict with the config, a status ("ok", "timeout", "memout" or "gen_error") and the parsed times.
+    """
+    timeout = timeout or TIMEOUT
+    e, i, c = config
+    workdir = workspace_dir(config, owner)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+
+    try:
+        from_cache = generate(config, workdir, gen_args, cache_dir, instrument, gen_server)
+    except (subprocess.CalledProcessError, generator_worker.GenerationFailed):
+        return {"config": config, "status": "gen_error", "data": None}
+    # A cached instance was not generated now, so it has no generation time to report
+    generation = load_generation_summary(workdir) if instrument and not from_cache else None
+
+    # The planner writes output.sas etc. into its cwd, so run it from the workspace
+    planner_cmd = [os.path.abspath(PLANNER_CMD[0])] + PLANNER_CMD[1:]
+    log_path = os.path.join(workdir, "planner.log")
+
+    key = None
+    if result_cache_dir:
+        key = planner_cache.result_key(os.path.join(workdir, "domain.pddl"),
+                                       os.path.join(workdir, "problem.pddl"), planner_cmd)
+        entry = None if refresh_results else planner_cache.lookup(key, timeout, result_cache_dir,
+                                                                  ignore_cached_timeouts)
+        if entry is not None:
+            with open(log_path, "w") as log:
+                log.write(planner_cache.read_log(key, result_cache_dir))
+            return {"config": config, "status": entry["status"], "data": entry["data"],
+                    "peak_rss_mb": entry.get("peak_rss_mb"), "generation": generation, "cached": True}
+
+    start_time = time.time()
+    parser = OutputParser()
+    status = run_planner(planner_cmd, workdir, log_path, parser, timeout, label=f"Ext={e}, Int={i}, Crit={c}:",
+                         memory_mb=memory_mb, cpu_seconds=cpu_seconds, cores=PLANNER_CORES)
+    peak_rss_mb = status["peak_rss_mb"]
+    outcome = planner_outcome(status, parser)
+    if log_archive_dir:
+        log_archive.archive(config, log_path, outcome, log_archive_dir)
+
+    if outcome == "memout":
+        # Not cached: whether it fits depends on the memory limit, not just the instance
+        return {"config": config, "status": "memout", "data": None, "peak_rss_mb": peak_rss_mb,
+                "generation": generation, "memory_mb": memory_mb}
+    if outcome == "timeout":
+        # Only wall-clock timeouts are cached; they are what the cached budget refers to
+        if key and status["timed_out"]:
+            with open(log_path) as log:
+                planner_cache.store(key, "timeout", None, timeout, log.read(), result_cache_dir, peak_rss_mb)
+        return {"config": config, "status": "timeout", "data": None, "peak_rss_mb": peak_rss_mb,
+                "generation": generation}
+
+    data = parser.times
+    if data["total_wall"] == 0.0:
+        data["total_wall"] = round(time.time() - start_time, 4)
+
+    if key:
+        with open(log_path) as log:
+            planner_cache.store(key, "ok", data, timeout, log.read(), result_cache_dir, peak_rss_mb)
+    return {"config": config, "status": "ok", "data": data, "peak_rss_mb": peak_rss_mb,
+            "generation": generation}
+
+
+# Applies the limits to itself and execs the planner, so they are inherited by everything it
+# starts. This runs as a separate program rather than as a preexec_fn: Python code between
+# fork and exec can deadlock on locks held by other threads (the RSS sampler, log readers).
+# argv: memory MB, CPU seconds, comma-separated cores (each may be empty), then the command.
+PLANNER_LAUNCHER = """
+import os, resource, sys
+memory_mb, cpu_seconds, cores = sys.argv[1:4]
+if memory_mb:
+    resource.setrlimit(resource.RLIMIT_AS, (int(memory_mb) * 1024**2,) * 2)
+if cpu_seconds:
+    # SIGXCPU at the soft limit, SIGKILL at the hard limit for processes that ignore it
+    resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_seconds), int(cpu_seconds) + 5))
+if cores:
+    os.sched_setaffinity(0, [int(c) for c in cores.split(",")])
+os.execvp(sys.argv[4], sys.argv[4:])
+"""
+
+
+def limited_command(cmd, memory_mb=None, cpu_seconds=None, cores=None):
+    """cmd run through PLANNER_LAUNCHER with the given limits; cmd itself if there are none."""
+    if not (memory_mb or cpu_seconds or cores):
+        return list(cmd)
+    return [sys.executable, "-c", PLANNER_LAUNCHER, str(memory_mb or ""), str(cpu_seconds or ""),
+            ",".join(str(c) for c in cores or ())] + list(cmd)
+
+
+def kill_planner_tree(proc):
+    """
+    SIGKILLs the planner's process group and every descendant of the driver (in case one
+    started its own group), repeating until no member of the group is left. Returns how
+    many processes were still alive.
+    """
+    killed = set()
+    for _ in range(KILL_ATTEMPTS):
+        pids = set(proc_tree.group_members(proc.pid)) | set(proc_tree.descendants(proc.pid))
+        if proc.poll() is None:
+            pids.add(proc.pid)
+        if not pids:
+            break
+        killed |= pids
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+        for pid in pids:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGKILL)
+        proc.wait()
+        time.sleep(0.05)
+    return len(killed - {proc.pid})
+
+
+def run_planner(planner_cmd, workdir, log_path, parser, timeout, label="",
+                memory_mb=None, cpu_seconds=None, cores=None):
+    """
+    Runs the planner in workdir, streaming its output line by line into log_path and the
+    parser (phases are printed as they finish) while the peak RSS of its process tree is
+    sampled. The planner gets a session (and process group) of its own, address space and
+    CPU time caps of memory_mb / cpu_seconds per process and is pinned to `cores`.
+    However it ends (timeout, normal exit or an exception here), nothing it started
+    survives the call.
+    Returns {"timed_out": bool, "returncode": int, "leaked": int, "peak_rss_mb": float}.
+    """
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(limited_command(planner_cmd, memory_mb, cpu_seconds, cores), cwd=workdir,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace",
+                                start_new_session=True)
+        sampler = proc_tree.PeakRssSampler(proc.pid, RSS_SAMPLE_INTERVAL)
+        sampler.start()
+
+        def pump():
+            for line in proc.stdout:
+                log.write(line)
+                field = parser.feed(line)
+                if field in ("translator", "preprocessor", "search"):
+                    print(f"  {label} {field} finished in {parser.times[field]}s", flush=True)
+
+        reader = threading.Thread(target=pump, daemon=True)
+        reader.start()
+
+        timed_out = False
+        leaked = 0
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        finally:
+            # Children inherit the stdout pipe, so the whole tree has to go for the reader to finish
+            stragglers = kill_planner_tree(proc)
+            if not timed_out:
+                leaked = stragglers
+            reader.join()
+            sampler.stop()
+    if leaked:
+        print(f"  {label} killed {leaked} planner processes that outlived the driver", flush=True)
+    return {"timed_out": timed_out, "returncode": proc.returncode, "leaked": leaked,
+            "peak_rss_mb": sampler.peak_mb}
+
+
+def planner_outcome(status, parser):
+    """"ok", "timeout" or "memout" from how run_planner's process ended and what it printed."""
+    if status["timed_out"] or status["returncode"] in TIMEOUT_EXIT_CODES:
+        return "timeout"
+    if status["returncode"] in MEMOUT_EXIT_CODES or (parser.out_of_memory and not parser.times["solved"]):
+        return "memout"
+    return "ok"
+
+
+def split_cores(jobs, cores_per_job):
+    """Disjoint sets of cores_per_job cores for each of jobs parallel planners, from the cores we may use."""
+    available = sorted(os.sched_getaffinity(0))
+    if jobs * cores_per_job > len(available):
+        raise ValueError(f"{jobs} jobs x {cores_per_job} cores need more than the {len(available)} available cores")
+    return [available[k * cores_per_job:(k + 1) * cores_per_job] for k in range(jobs)]
+
+
+def _take_cores(core_slots):
+    """Pool initializer: claims one core set for the planners of this worker process."""
+    global PLANNER_CORES
+    PLANNER_CORES = core_slots.get()
+
+
+def planner_pool(jobs, core_sets=None):
+    """ProcessPoolExecutor with `jobs` workers; with core_sets each worker pins its planners to one of them."""
+    if not core_sets:
+        return ProcessPoolExecutor(max_workers=jobs)
+    core_slots = multiprocessing.Queue()
+    for cores in core_sets:
+        core_slots.put(cores)
+    return ProcessPoolExecutor(max_workers=jobs, initializer=_take_cores, initargs=(core_slots,))
+
+
+def generation_columns(result):
+    generation = result.get("generation")
+    if not generation:
+        return [""] * 5
+    return [generation["wall_s"], generation["tracemalloc_peak_mb"],
+            generation["objects"], generation["initial_facts"], generation["goals"]]
+
+
+def result_row(result):
+    e, i, c = result["config"]
+    peak_rss = result.get("peak_rss_mb")
+    peak_rss = "" if peak_rss is None else peak_rss
+    if result["status"] == "timeout":
+        return [e, i, c, e+i+c, "TIMEOUT", "TIMEOUT", "TIMEOUT", "TIMEOUT", False, peak_rss] + generation_columns(result)
+    if result["status"] == "memout":
+        return [e, i, c, e+i+c, "MEMOUT", "MEMOUT", "MEMOUT", "MEMOUT", False, peak_rss] + generation_columns(result)
+    if result["status"] == "skipped":
+        return [e, i, c, e+i+c] + ["SKIPPED_DOMINATED"] * 4 + [False, ""] + generation_columns(result)
+
+    data = result["data"]
+    return [
+        e, i, c, (e+i+c),
+        data["translator"],
+        data["preprocessor"],
+        data["search"],
+        data["total_wall"],
+        data["solved"],
+        peak_rss
+    ] + generation_columns(result)
+
+
+def report(result):
+    e, i, c = result["config"]
+    prefix = f"  Ext={e}, Int={i}, Crit={c}:"
+    if result.get("cached"):
+        prefix += " (cached)"
+    if result["status"] == "gen_error":
+        print(f"{prefix} Error: PDDL Generation failed.")
+    elif result["status"] == "timeout":
+        print(f"{prefix} TIMEOUT ({TIMEOUT}s)")
+    elif result["status"] == "memout":
+        limit = f"{result['memory_mb']} MB limit" if result.get("memory_mb") else "no limit"
+        print(f"{prefix} MEMOUT ({limit}, peak RSS {result.get('peak_rss_mb')} MB)")
+    elif result["status"] == "skipped":
+        print(f"{prefix} SKIPPED_DOMINATED (dominates timed-out {tuple(result['blocker'])})")
+    else:
+        print(f"{prefix} Done in {result['data']['total_wall']}s | Solved: {result['data']['solved']} "
+              f"| Peak RSS: {result.get('peak_rss_mb')} MB")
+
+
+def result_event(result):
+    """Journal event of a finished planner run."""
+    return {"timeout": "timeout", "memout": "memout"}.get(result["status"], "done")
+
+
+def journal_fields(result, timeout):
+    """Fields stored with a finished run's journal entry."""
+    fields = {"timeout": timeout, "row": result_row(result)}
+    if result["status"] == "memout":
+        fields["memory_mb"] = result.get("memory_mb")
+    return fields
+
+
+def store_result(store, config, event, fields, cached=False):
+    """Adds a journaled result to the --store database, if there is one."""
+    if store is None or event == "lease_expired":
+        return  # No result: the config's workers died (or gave up) before finishing
+    if event == "gen_error":
+        store.add_error(config, TIMEOUT)
+    else:
+        store.add_row(fields["row"], fields.get("timeout"), fields.get("memory_mb"), fields.get("blocker"), cached)
+
+
+def load_journal(path=None):
+    """
+    Replays the journal (default JOURNAL_FILE) and returns the most recent entry for every config.
+    """
+    path = path or JOURNAL_FILE
+    state = {}
+    if not os.path.exists(path):
+        return state
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from a crash mid-write
+            state[tuple(entry["config"])] = entry
+    return state
+
+
+def append_journal(journal, config, event, **fields):
+    entry = {"config": list(config), "event": event, "time": round(time.time(), 3), **fields}
+    journal.write(json.dumps(entry) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def pending_configs(combinations, journal_state, retry_timeouts=False, timeout=TIMEOUT, prune=False,
+                    memory_mb=None):
+    """
+    Filters the queue down to configs that still need a run.
+    Finished configs are skipped, configs that were in flight, failed to generate or whose queue
+    workers all died (lease_expired) are retried,
+    and TIMEOUT configs are only retried on request when the new budget is larger than the old one.
+    MEMOUT configs likewise, when the memory limit was raised (or dropped).
+    Configs skipped by dominance pruning count as timeouts, but only while pruning stays enabled.
+    """
+    todo = []
+    for config in combinations:
+        entry = journal_state.get(config)
+        if entry is None or entry["event"] in ("started", "gen_error", "lease_expired"):
+            todo.append(config)
+        elif entry["event"] == "skipped_dominated" and not prune:
+            todo.append(config)
+        elif entry["event"] in ("timeout", "skipped_dominated"):
+            if retry_timeouts and entry["timeout"] < timeout:
+                todo.append(config)
+        elif entry["event"] == "memout":
+            old_limit = entry.get("memory_mb")
+            if retry_timeouts and old_limit and (not memory_mb or old_limit < memory_mb):
+                todo.append(config)
+    return todo
+
+
+def dominates(a, b):
+    """True if config a has at least as many PCs as b in every segment."""
+    return all(x >= y for x, y in zip(a, b))
+
+
+def find_dominated_timeout(config, timeouts):
+    """
+    Returns a timed-out config that `config` dominates, if any. Runtime grows with the
+    PC count in every segment, so such a config is certain to time out as well.
+    """
+    for t in timeouts:
+        if dominates(config, t):
+            return t
+    return None
+
+
+def write_frontier(journal_state, timeout, path=None):
+    """
+    Writes the discovered solvability frontier (default FRONTIER_FILE): the largest configs
+    that finished within the budget and the smallest configs that timed out.
+    """
+    path = path or FRONTIER_FILE
+    finished = [c for c, entry in journal_state.items() if entry["event"] == "done"]
+    timeouts = [c for c, entry in journal_state.items() if entry["event"] == "timeout"]
+
+    maximal_finished = [c for c in finished
+                        if not any(o != c and dominates(o, c) for o in finished)]
+    minimal_timeouts = [c for c in timeouts
+                        if not any(o != c and dominates(c, o) for o in timeouts)]
+
+    frontier = {
+        "timeout": timeout,
+        "maximal_finished": sorted(list(c) for c in maximal_finished),
+        "minimal_timeouts": sorted(list(c) for c in minimal_timeouts),
+        "skipped_dominated": sum(1 for entry in journal_state.values() if entry["event"] == "skipped_dominated"),
+    }
+    with open(path, "w") as f:
+        json.dump(frontier, f, indent=2)
+    print(f"Wrote solvability frontier to {path}")
+
+
+def pad_row(row):
+    """Rows written before a column was added get an empty value for it."""
+    return list(row) + [""] * (len(HEADERS) - len(row))
+
+
+def upgrade_csv_header():
+    """Rewrites an existing CSV from an older version of HEADERS, padding its rows."""
+    if not os.path.exists(OUTPUT_CSV):
+        return
+    with open(OUTPUT_CSV, newline="") as f:
+        rows = list(csv.reader(f))
+    if not rows or rows[0] == HEADERS:
+        return
+    with open(OUTPUT_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(pad_row(row) for row in rows[1:])
+    print(f"Upgraded {OUTPUT_CSV} to the current columns.")
+
+
+def sync_csv_with_journal(journal_state, rerun):
+    """
+    Brings the CSV in line with the journal before a resumed sweep: rows of configs that
+    are about to be re-run are dropped, and finished configs whose row never made it to
+    the CSV (still buffered for ordering when the sweep died) are appended from the journal.
+    """
+    rows = []
+    if os.path.exists(OUTPUT_CSV):
+        with open(OUTPUT_CSV, newline="") as f:
+            rows = list(csv.reader(f))[1:]
+
+    rerun = set(rerun)
+    kept = [row for row in rows if tuple(int(x) for x in row[:3]) not in rerun]
+    present = {tuple(int(x) for x in row[:3]) for row in kept}
+    missing = [entry["row"] for config, entry in journal_state.items()
+               if "row" in entry and config not in present and config not in rerun]
+
+    if len(kept) == len(rows) and not missing:
+        return
+
+    with open(OUTPUT_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(pad_row(row) for row in kept + missing)
+    print(f"Synced {OUTPUT_CSV} with journal: dropped {len(rows) - len(kept)} rows, restored {len(missing)} rows.")
+
+
+def _row_times(row):
+    return dict(zip(adaptive_sweep.TIME_FIELDS, (float(x) for x in row[4:8])))
+
+
+def run_adaptive(run, journal_state, jobs=1, retry_timeouts=False, core_sets=None, store=None):
+    """
+    --adaptive: runs only the configs adaptive_sweep needs to locate the boundary between
+    configs that finish and configs that time out, then writes ADAPTIVE_CSV with a row for
+    every config of the cube and ADAPTIVE_FILE with the boundary and growth factors.
+    Runs are journaled and appended to OUTPUT_CSV like in a normal sweep, so a later
+    --adaptive or exhaustive sweep reuses them.
+    """
+    ext_values, int_values, crit_values = sorted(EXT_RANGE), sorted(INT_RANGE), sorted(CRIT_RANGE)
+    cube = set(itertools.product(ext_values, int_values, crit_values))
+
+    # Earlier runs of this cube seed the search; timeouts under a smaller budget only with --retry-timeouts
+    knowledge = adaptive_sweep.Knowledge()
+    rows = {}
+    for config, entry in journal_state.items():
+        if entry["event"] in ("done", "memout") or (entry["event"] == "timeout" and
+                                                    (entry["timeout"] >= TIMEOUT or not retry_timeouts)):
+            rows[config] = entry["row"]
+            if config in cube:
+                knowledge.add(config, entry["event"] == "done")
+    stale = [c for c, entry in journal_state.items() if entry["event"] == "timeout" and c not in rows]
+    if stale:
+        sync_csv_with_journal(journal_state, stale)
+
+    write_header = not os.path.exists(OUTPUT_CSV)
+    runs = 0
+    with contextlib.ExitStack() as stack:
+        csvfile = stack.enter_context(open(OUTPUT_CSV, "a", newline=""))
+        journal = stack.enter_context(open(JOURNAL_FILE, "a"))
+        pool = stack.enter_context(planner_pool(jobs, core_sets)) if jobs > 1 else None
+        writer = csv.writer(csvfile)
+        if write_header:
+            writer.writerow(HEADERS)
+
+        def execute(configs):
+            nonlocal runs
+            for config in configs:
+                e, i, c = config
+                print(f"\n--- Probing: Ext={e}, Int={i}, Crit={c} (Sum={e+i+c}) ---")
+                append_journal(journal, config, "started", timeout=TIMEOUT)
+            results = pool.map(run, configs) if pool else map(run, configs)
+            outcomes = {}
+            for result in results:
+                report(result)
+                runs += 1
+                config = result["config"]
+                if result["status"] == "gen_error":
+                    # Cannot tell where the boundary is without a run; treat it like a timeout
+                    append_journal(journal, config, "gen_error")
+                    store_result(store, config, "gen_error", {})
+                    outcomes[config] = False
+                    continue
+                event = result_event(result)
+                fields = journal_fields(result, TIMEOUT)
+                row = fields["row"]
+                append_journal(journal, config, event, **fields)
+                store_result(store, config, event, fields, result.get("cached"))
+                writer.writerow(row)
+                csvfile.flush()
+                rows[config] = row
+                outcomes[config] = event == "done"
+            return outcomes
+
+        boundary = adaptive_sweep.trace_boundary(knowledge, ext_values, int_values, crit_values, execute)
+
+    measured = {config: _row_times(row) for config, row in rows.items() if config in cube and row[4] not in ("TIMEOUT", "MEMOUT")}
+    growth = adaptive_sweep.fit_growth(measured)
+
+    combined = []
+    counts = {"measured": 0, "interpolated": 0, "predicted_timeout": 0}
+    for config in sorted(cube, key=lambda x: (sum(x), x[0], x[1], x[2])):
+        e, i, c = config
+        if config in rows:
+            combined.append(pad_row(rows[config]))
+            counts["measured"] += 1
+        elif crit_values.index(c) <= boundary[(e, i)] and measured:
+            times, _ = adaptive_sweep.interpolate(config, measured, growth)
+            combined.append(pad_row([e, i, c, e+i+c] + [times[f] for f in adaptive_sweep.TIME_FIELDS]
+                                    + ["INTERPOLATED", ""]))
+            counts["interpolated"] += 1
+        else:
+            # Dominates a config that timed out
+            combined.append(pad_row([e, i, c, e+i+c] + ["SKIPPED_DOMINATED"] * 4 + [False, ""]))
+            counts["predicted_timeout"] += 1
+
+    with open(ADAPTIVE_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(combined)
+
+    summary = {
+        "timeout": TIMEOUT,
+        "cube": len(cube),
+        "planner_runs": runs,
+        **counts,
+        # Highest Crit PCs that finishes per (Ext, Int); null if even the smallest times out
+        "boundary": [[e, i, crit_values[k] if k >= 0 else None] for (e, i), k in sorted(boundary.items())],
+        # Runtime factor per added PC, from a log-linear fit over the measured configs
+        "growth": {field: dict(zip(("ext", "int", "crit"), (round(g, 4) for g in factors)))
+                   for field, factors in growth.items()},
     }
+    with open(ADAPTIVE_FILE, "w") as f:
+        json.dump(summary, f, indent=2)
+    total = summary["growth"]["total_wall"]
+    print(f"\nAdaptive sweep: {runs} planner runs for a cube of {len(cube)} configs "
+          f"({counts['measured']} measured, {counts['interpolated']} interpolated, "
+          f"{counts['predicted_timeout']} predicted timeouts).")
+    print(f"Total time grows x{total['ext']} per Ext PC, x{total['int']} per Int PC, x{total['crit']} per Crit PC.")
+    print(f"Wrote {ADAPTIVE_CSV} and {ADAPTIVE_FILE}")
+
+
+def run_worker(run, queue_dir):
+    """
+    --worker: claims configs from the shared queue and runs them until the queue is drained.
+    The lease is renewed by a heartbeat thread while the config runs.
+    """
+    queue = job_queue.JobQueue(queue_dir)
+    worker = job_queue.worker_id()
+    print(f"Worker {worker} on {queue.path}")
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            # Leased jobs can still come back if their worker dies
+            if not queue.unfinished():
+                break
+            time.sleep(QUEUE_POLL_INTERVAL)
+            continue
+        e, i, c = job.config
+        print(f"\n--- Running: Ext={e}, Int={i}, Crit={c} (Sum={e+i+c}, attempt {job.attempts}) ---")
+        heartbeat = job_queue.Heartbeat(queue_dir, job.config, worker)
+        heartbeat.start()
+        try:
+            result = run(job.config, timeout=job.timeout, owner=f"{worker}_attempt{job.attempts}")
+        except BaseException:
+            # Like a worker that died: the attempt counts, but not as a generation failure
+            queue.release(job.config, worker, "lease_expired")
+            raise
+        finally:
+            heartbeat.stop()
+        report(result)
+        if result["status"] == "gen_error":
+            queue.release(job.config, worker, "gen_error")
+            continue
+        if not queue.complete(job.config, worker, result_event(result), journal_fields(result, job.timeout)):
+            print(f"  Result dropped: another worker already finished Ext={e}, Int={i}, Crit={c}")
+        elif heartbeat.lost:
+            print("  Lease was lost during the run, but this result came in first")
+    queue.close()
+    print(f"Worker {worker}: queue drained.")
+
+
+def coordinate(queue_dir, queue, journal_state, prune=False, store=None):
+    """
+    --coordinate: puts the pending configs on the shared queue, re-queues jobs whose lease
+    ran out and merges finished jobs into OUTPUT_CSV and the journal until the queue is
+    drained. With prune, queued configs that dominate a merged timeout are skipped.
+    """
+    jobs = job_queue.JobQueue(queue_dir)
+    jobs.enqueue(queue, TIMEOUT)
+    print(f"Queued {len(queue)} configs in {jobs.path}; start workers with --queue {queue_dir} --worker")
+
+    timeouts = [config for config, entry in journal_state.items()
+                if entry["event"] == "timeout" and entry["timeout"] >= TIMEOUT and config not in queue]
+    prunable = set(queue) if prune else set()
+    write_header = not os.path.exists(OUTPUT_CSV)
+    last_status = 0.0
+
+    with open(OUTPUT_CSV, "a", newline="") as csvfile, open(JOURNAL_FILE, "a") as journal:
+        writer = csv.writer(csvfile)
+        if write_header:
+            writer.writerow(HEADERS)
+        while True:
+            requeued = jobs.requeue_expired()
+            if requeued:
+                print(f"Re-queued {requeued} jobs whose lease expired")
+
+            for config, event, fields in jobs.unmerged():
+                e, i, c = config
+                prunable.discard(config)
+                if event == "gen_error":
+                    print(f"  Ext={e}, Int={i}, Crit={c}: Error: PDDL Generation failed on every attempt.")
+                    append_journal(journal, config, "gen_error")
+                elif event == "lease_expired":
+                    print(f"  Ext={e}, Int={i}, Crit={c}: Error: no worker finished it in "
+                          f"{job_queue.MAX_ATTEMPTS} attempts (lease expired).")
+                    append_journal(journal, config, "lease_expired")
+                else:
+                    append_journal(journal, config, event, **fields)
+                    writer.writerow(fields["row"])
+                    csvfile.flush()
+                    print(f"  Ext={e}, Int={i}, Crit={c}: {event} (Total: {fields['row'][7]})")
+                    if event == "timeout":
+                        timeouts.append(config)
+                store_result(store, config, event, fields)
+                jobs.mark_merged(config)
+
+            for config in sorted(prunable):
+                blocker = find_dominated_timeout(config, timeouts)
+                if blocker is not None:
+                    prunable.discard(config)
+                    row = result_row({"config": config, "status": "skipped", "blocker": blocker})
+                    jobs.skip(config, {"timeout": TIMEOUT, "blocker": list(blocker), "row": row})
+
+            if not jobs.unfinished() and not jobs.unmerged():
+                break
+            if time.time() - last_status >= 60:
+                counts = jobs.counts()
+                print(f"Queue: {counts.get('queued', 0)} queued, {counts.get('leased', 0)} running, "
+                      f"{counts.get('done', 0)} done, {counts.get('skipped', 0)} skipped, "
+                      f"{counts.get('failed', 0)} failed")
+                for worker, config, age in jobs.workers():
+                    print(f"  {worker}: {config} (heartbeat {age}s ago)")
+                last_status = time.time()
+            time.sleep(QUEUE_POLL_INTERVAL)
+    jobs.close()
+    print("Queue drained.")
 
-    # Translator (Wall clock)
-    trans = re.search(r"Done! \[.*?([\d\.]+)s wall-clock\]", output_text)
-    if trans: times["translator"] = float(trans.group(1))
 
-    # Preprocessor
-    prep = re.search(r"Preprocessor time:\s*([\d\.]+)s", output_text)
-    if prep: times["preprocessor"] = float(prep.group(1))
+def variant_suffix(gen_args):
+    """
+    File name suffix of the sweep variant that gen_args select: empty for the default
+    generator, otherwise _ and a hash of the arguments.
+    """
+    if not gen_args:
+        return ""
+    return "_" + hashlib.sha1(json.dumps(list(gen_args)).encode()).hexdigest()[:8]
+
 
-    # Search Time (Algorithm)
-    search = re.search(r"Search time:\s*([\d\.]+)s", output_text)
-    if search: times["search"] = float(search.group(1))
+def variant_path(path, suffix):
+    root, ext = os.path.splitext(path)
+    return f"{root}{suffix}{ext}"
 
-    # Real Total (from the very end of log)
-    total = re.findall(r"Total time:\s*([\d\.]+)s", output_text)
-    if total: times["total_wall"] = float(total[-1])
 
-    if "Pareto-frontier size:" in output_text:
-        times["solved"] = True
-        
-    return times
+def use_variant_outputs(gen_args):
+    """
+    Points the sweep's result files at those of its variant. Generator arguments such as
+    --connectivity segment, --reduce-symmetry or --ground-prune change the task the planner
+    solves, so every variant resumes from and writes to files of its own; the suffix and its
+    arguments are recorded in VARIANTS_FILE. Returns the suffix.
+    """
+    global OUTPUT_CSV, JOURNAL_FILE, FRONTIER_FILE, ADAPTIVE_CSV, ADAPTIVE_FILE
+    suffix = variant_suffix(gen_args)
+    if not suffix:
+        return suffix
+    OUTPUT_CSV, JOURNAL_FILE, FRONTIER_FILE, ADAPTIVE_CSV, ADAPTIVE_FILE = (
+        variant_path(p, suffix) for p in (OUTPUT_CSV, JOURNAL_FILE, FRONTIER_FILE, ADAPTIVE_CSV, ADAPTIVE_FILE))
+    variants = {}
+    if os.path.exists(VARIANTS_FILE):
+        with open(VARIANTS_FILE) as f:
+            variants = json.load(f)
+    if variants.get(suffix) != list(gen_args):
+        variants[suffix] = list(gen_args)
+        with open(VARIANTS_FILE, "w") as f:
+            json.dump(variants, f, indent=2)
+    return suffix
+
+
+def open_store(path, gen_args, memory_mb, cpu_seconds):
+    """Opens the --store database and records the metadata of this sweep."""
+    store = result_store.ResultStore(path)
+    store.start_sweep(TIMEOUT, memory_mb, cpu_seconds, gen_args, PLANNER_CMD,
+                      planner_cache.planner_fingerprint(PLANNER_CMD[0]))
+    print(f"Recording results in {path} (sweep {store.sweep})")
+    return store
 
 
 def main():
+    global TIMEOUT, PLANNER_CORES
+
+    parser = argparse.ArgumentParser(description="Sweep (Ext, Int, Crit) PC counts through the Stackelberg planner.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of configs to run in parallel (default: 1)")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT,
+                        help=f"Planner time budget per config in seconds (default: {TIMEOUT})")
+    parser.add_argument("--retry-timeouts", action="store_true",
+                        help="Re-run configs that timed out under a smaller budget than --timeout")
+    parser.add_argument("--no-resume", action="store_true",
+                        help=f"Ignore {JOURNAL_FILE} and run every config")
+    parser.add_argument("--gen-args", default="",
+                        help="Extra arguments for the generator, e.g. \"--connectivity segment --emitter ir\"; "
+                             f"each set of arguments has its own CSV and journal (listed in {VARIANTS_FILE})")
+    parser.add_argument("--prune-dominated", action="store_true",
+                        help="Skip configs that dominate a timed-out config component-wise (recorded as SKIPPED_DOMINATED)")
+    parser.add_argument("--pddl-cache", default=pddl_cache.CACHE_DIR,
+                        help=f"Directory of the generated PDDL cache (default: {pddl_cache.CACHE_DIR})")
+    parser.add_argument("--pddl-cache-size", type=float, default=pddl_cache.MAX_CACHE_BYTES / 1024**2,
+                        help="Size budget of the PDDL cache in MB; least recently used instances are evicted")
+    parser.add_argument("--no-pddl-cache", action="store_true",
+                        help="Always run the generator and leave the PDDL cache untouched")
+    parser.add_argument("--result-cache", default=planner_cache.CACHE_DIR,
+                        help=f"Directory of the planner result cache (default: {planner_cache.CACHE_DIR})")
+    parser.add_argument("--no-result-cache", action="store_true",
+                        help="Always run the planner and leave the result cache untouched")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Re-run the planner even on a cached result and overwrite the cache entry")
+    parser.add_argument("--ignore-cached-timeouts", action="store_true",
+                        help="Re-run cached timeouts whatever their budget (cached timeouts under a "
+                             "smaller budget than --timeout are always re-run)")
+    parser.add_argument("--instrument-generation", action="store_true",
+                        help=f"Have the generator record per-phase timings and memory ({GENERATION_FILE} in "
+                             "each workspace) and add its totals and problem size to the CSV")
+    parser.add_argument("--gen-server", nargs="?", const=generator_worker.SOCKET_PATH, metavar="SOCKET",
+                        help="Generate through a persistent generator_worker on this Unix socket "
+                             f"(default: {generator_worker.SOCKET_PATH}); one is started if none is listening")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Only run the configs needed to find where each axis crosses the timeout and "
+                             f"fill in the rest of the cube by interpolation ({ADAPTIVE_CSV}, {ADAPTIVE_FILE})")
+    parser.add_argument("--queue", metavar="DIR",
+                        help=f"Shared directory (e.g. on NFS) holding the job queue ({job_queue.QUEUE_FILE}) "
+                             "for --coordinate / --worker")
+    parser.add_argument("--coordinate", action="store_true",
+                        help="Queue the pending configs in --queue and merge the workers' results into "
+                             f"{OUTPUT_CSV} and {JOURNAL_FILE}")
+    parser.add_argument("--worker", action="store_true",
+                        help="Run configs from --queue until it is drained (--jobs worker processes); "
+                             "use a --gen-server socket outside the shared directory")
+    parser.add_argument("--memory-limit", type=int, metavar="MB",
+                        help="Address-space limit of every planner process; runs that hit it are recorded as MEMOUT")
+    parser.add_argument("--cpu-limit", type=int, metavar="SECONDS",
+                        help="CPU-time limit of every planner process (recorded as TIMEOUT when hit)")
+    parser.add_argument("--pin-cores", action="store_true",
+                        help="Pin each parallel job's planner to its own cores for reproducible timings")
+    parser.add_argument("--cores-per-job", type=int, default=1,
+                        help="Cores per job with --pin-cores (default: 1)")
+    parser.add_argument("--log-archive", default=log_archive.ARCHIVE_DIR,
+                        help=f"Directory keeping every planner log gzipped for log_archive.py reparse "
+                             f"(default: {log_archive.ARCHIVE_DIR})")
+    parser.add_argument("--no-log-archive", action="store_true",
+                        help="Only keep the planner log of the latest run in the config's workspace")
+    parser.add_argument("--store", nargs="?", const=result_store.STORE_FILE, metavar="DB",
+                        help="Also record every result with its sweep's metadata in an SQLite store "
+                             f"(default: {result_store.STORE_FILE}) for plot_results.py --store --gen-args")
+    args = parser.parse_args()
+    if (args.coordinate or args.worker) and not args.queue:
+        parser.error("--coordinate and --worker need --queue")
+    if args.coordinate and args.worker:
+        parser.error("Run the coordinator and workers as separate processes")
+    if args.adaptive and (args.coordinate or args.worker):
+        parser.error("--adaptive does not run over a queue")
+    if args.adaptive and args.prune_dominated:
+        parser.error("--adaptive already skips configs that dominate a timeout")
+    TIMEOUT = args.timeout
+    core_sets = None
+    if args.pin_cores:
+        try:
+            core_sets = split_cores(max(args.jobs, 1), args.cores_per_job)
+        except ValueError as e:
+            parser.error(str(e))
+        # Single-job runs use the main process
+        PLANNER_CORES = core_sets[0]
+        print(f"Pinning planners to cores {core_sets}")
+    gen_args = shlex.split(args.gen_args)
+    if suffix := use_variant_outputs(gen_args):
+        if args.log_archive == log_archive.ARCHIVE_DIR:
+            args.log_archive = variant_path(args.log_archive, suffix)
+        print(f"Generator arguments {gen_args}: writing {OUTPUT_CSV} and {JOURNAL_FILE} (see {VARIANTS_FILE})")
+    cache_dir = None if args.no_pddl_cache else os.path.abspath(args.pddl_cache)
+    if cache_dir:
+        pddl_cache.MAX_CACHE_BYTES = int(args.pddl_cache_size * 1024**2)
+        pddl_cache.evict(cache_dir)
+    gen_server = os.path.abspath(args.gen_server) if args.gen_server else None
+    run = partial(run_config, timeout=TIMEOUT, gen_args=gen_args, cache_dir=cache_dir,
+                  result_cache_dir=None if args.no_result_cache else os.path.abspath(args.result_cache),
+                  refresh_results=args.refresh_cache, ignore_cached_timeouts=args.ignore_cached_timeouts,
+                  instrument=args.instrument_generation,
+                  gen_server=gen_server, memory_mb=args.memory_limit, cpu_seconds=args.cpu_limit,
+                  log_archive_dir=None if args.no_log_archive else os.path.abspath(args.log_archive))
+
+    if args.worker:
+        queue_dir = os.path.abspath(args.queue)
+        with gen_server_running(gen_server):
+            if args.jobs <= 1:
+                run_worker(run, queue_dir)
+            else:
+                with planner_pool(args.jobs, core_sets) as pool:
+                    for future in [pool.submit(run_worker, run, queue_dir) for _ in range(args.jobs)]:
+                        future.result()
+        return
+
     combinations = list(itertools.product(EXT_RANGE, INT_RANGE, CRIT_RANGE))
-    
+
     # Sort by TOTAL number of PCs (sum) so we do small problems first
     #    If sums are equal, it sorts by Ext, then Int.
     combinations.sort(key=lambda x: (sum(x), x[0], x[1], x[2]))
@@ -95,60 +1032,108 @@ def main():
     print(f"Queue generated: {len(combinations)} experiments.")
     print(f"Range: {combinations[0]} -> {combinations[-1]}")
 
-    headers = ["Ext PCs", "Int PCs", "Crit PCs", "Total PCs", 
-               "Translator (s)", "Preprocessor (s)", "Search (s)", 
-               "Total Time (s)", "Solved"]
-    
+    upgrade_csv_header()
+    journal_state = {} if args.no_resume else load_journal()
+    if args.adaptive:
+        with gen_server_running(gen_server):
+            store = open_store(args.store, gen_args, args.memory_limit, args.cpu_limit) if args.store else None
+            run_adaptive(run, journal_state, args.jobs, args.retry_timeouts, core_sets, store)
+        return
+    queue = pending_configs(combinations, journal_state, args.retry_timeouts, TIMEOUT, args.prune_dominated,
+                            args.memory_limit)
+    if journal_state:
+        sync_csv_with_journal(journal_state, queue)
+        print(f"Resuming from {JOURNAL_FILE}: {len(combinations) - len(queue)} finished, {len(queue)} to run.")
+    if not queue:
+        print("Nothing left to run.")
+        return
+    store = open_store(args.store, gen_args, args.memory_limit, args.cpu_limit) if args.store else None
+
+    if args.coordinate:
+        coordinate(os.path.abspath(args.queue), queue, journal_state, args.prune_dominated, store)
+        if args.prune_dominated:
+            write_frontier(load_journal(), TIMEOUT)
+        return
+
     write_header = not os.path.exists(OUTPUT_CSV)
-    
-    with open(OUTPUT_CSV, "a", newline="") as csvfile:
+
+    with gen_server_running(gen_server), \
+            open(OUTPUT_CSV, "a", newline="") as csvfile, open(JOURNAL_FILE, "a") as journal:
         writer = csv.writer(csvfile)
         if write_header:
-            writer.writerow(headers)
+            writer.writerow(HEADERS)
 
-        for (e, i, c) in combinations:
-            print(f"\n--- Running: Ext={e}, Int={i}, Crit={c} (Sum={e+i+c}) ---")
+        # Results can finish out of order; rows are only written once every config
+        # ahead of them in the queue is done, so the CSV order is always the queue order.
+        finished = {}
+        next_idx = 0
 
-            update_domain_config(CONFIG_FILE, e, i, c)
+        def flush_in_order():
+            nonlocal next_idx
+            while next_idx < len(queue) and queue[next_idx] in finished:
+                result = finished.pop(queue[next_idx])
+                if result["status"] != "gen_error":
+                    writer.writerow(result_row(result))
+                    csvfile.flush()
+                next_idx += 1
 
-            try:
-                subprocess.run(GEN_CMD, check=True, stdout=subprocess.DEVNULL)
-            except subprocess.CalledProcessError:
-                print("  Error: PDDL Generation failed.")
-                continue
+        # Timeouts under the current budget seed the pruner
+        timeouts = []
+        if args.prune_dominated:
+            timeouts = [config for config, entry in journal_state.items()
+                        if entry["event"] == "timeout" and entry["timeout"] >= TIMEOUT
+                        and config not in queue]
 
-            start_time = time.time()
-            try:
-                result = subprocess.run(
-                    PLANNER_CMD, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=TIMEOUT
-                )
-                output = result.stdout
-            except subprocess.TimeoutExpired:
-                print(f"  TIMEOUT ({TIMEOUT}s)")
-                writer.writerow([e, i, c, e+i+c, "TIMEOUT", "TIMEOUT", "TIMEOUT", "TIMEOUT", False])
-                csvfile.flush()
-                continue
+        def record(result):
+            report(result)
+            if result["status"] == "gen_error":
+                event, fields = "gen_error", {}
+            elif result["status"] == "skipped":
+                event = "skipped_dominated"
+                fields = {"timeout": TIMEOUT, "blocker": list(result["blocker"]), "row": result_row(result)}
+            else:
+                event, fields = result_event(result), journal_fields(result, TIMEOUT)
+            append_journal(journal, result["config"], event, **fields)
+            store_result(store, result["config"], event, fields, result.get("cached"))
+            if result["status"] == "timeout":
+                timeouts.append(result["config"])
+            finished[result["config"]] = result
+            flush_in_order()
+
+        pending = deque(queue)
+
+        def next_runnable():
+            # Configs are only handed out when a slot frees up, so a timeout can still
+            # prune everything queued behind it.
+            while pending:
+                config = pending.popleft()
+                blocker = find_dominated_timeout(config, timeouts) if args.prune_dominated else None
+                if blocker is None:
+                    append_journal(journal, config, "started", timeout=TIMEOUT)
+                    return config
+                record({"config": config, "status": "skipped", "blocker": blocker})
+            return None
+
+        if args.jobs <= 1:
+            while (config := next_runnable()) is not None:
+                e, i, c = config
+                print(f"\n--- Running: Ext={e}, Int={i}, Crit={c} (Sum={e+i+c}) ---")
+                record(run(config))
+        else:
+            print(f"Running with {args.jobs} parallel jobs (workspaces in {RUNS_DIR}/)")
+            with planner_pool(args.jobs, core_sets) as pool:
+                inflight = set()
+                while True:
+                    while len(inflight) < args.jobs and (config := next_runnable()) is not None:
+                        inflight.add(pool.submit(run, config))
+                    if not inflight:
+                        break
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future.result())
 
-            data = parse_output(output)
-            
-            if data["total_wall"] == 0.0:
-                data["total_wall"] = round(time.time() - start_time, 4)
-
-            row = [
-                e, i, c, (e+i+c),
-                data["translator"],
-                data["preprocessor"],
-                data["search"],
-                data["total_wall"],
-                data["solved"]
-            ]
-            
-            writer.writerow(row)
-            csvfile.flush()
-            print(f"  Done in {data['total_wall']}s | Solved: {data['solved']}")
+    if args.prune_dominated:
+        write_frontier(load_journal(), TIMEOUT)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,10 +1,12 @@
 from unified_planning.shortcuts import *
 from unified_planning.model import Problem, Fluent
+from grid_builder import build_grid
 import random
 
-def setup_gridworld_domain(problem: Problem):
-    grid_size = (5, 5)
-    diamond_location = "t01"
+def setup_gridworld_domain(problem: Problem, grid_size=(5, 5), number_of_trace_tiles=5):
+    diamond_location = (0, 1)
+    attacker_starting_position = (0, 0)
+    guard_starting_position = (2, 2)
     num_timesteps = 25
     random.seed(42)
 
@@ -19,13 +21,11 @@ def setup_gridworld_domain(problem: Problem):
     problem.add_object(guard)
 
     # Create grid tiles
-    tiles = {}
-    for i in range(grid_size[0]):
-        for j in range(grid_size[1]):
-            name = f"t{i}{j}"
-            t = Object(name, tile_type)
-            tiles[name] = t
-            problem.add_object(t)
+    # Trace tiles are drawn here so the seeded random stream is consumed as before
+    grid = build_grid(grid_size[0], grid_size[1], trace_count=number_of_trace_tiles, rng=random)
+    tile_objs = [Object(name, tile_type) for name in grid.names]
+    problem.add_objects(tile_objs)
+    tiles = dict(zip(grid.names, tile_objs))
 
     # Create time objects
     # timesteps = {}
@@ -64,26 +64,20 @@ def setup_gridworld_domain(problem: Problem):
     problem.add_fluent(attacker_caught, default_initial_value=False)
 
     # --- Initial values ---
-    problem.set_initial_value(at(attacker, tiles["t00"]), True)
-    problem.set_initial_value(at(guard, tiles[f"t22"]), True) # guard starts bottom right
-    problem.set_initial_value(diamond_at(tiles[diamond_location]), True)
+    problem.set_initial_value(at(attacker, tiles[grid.name(*attacker_starting_position)]), True)
+    problem.set_initial_value(at(guard, tiles[grid.name(*guard_starting_position)]), True) # guard starts bottom right
+    problem.set_initial_value(diamond_at(tiles[grid.name(*diamond_location)]), True)
 
     # Select random tiles to be "trace" tiles
-    all_tiles = list(tiles.values())
-    random_trace_tiles = random.sample(all_tiles, k=5) # Choose 5 random tiles
+    random_trace_tiles = [tile_objs[k] for k in grid.trace.tolist()]
     for tile in random_trace_tiles:
         print(tile)
         problem.set_initial_value(is_trace_tile(tile), True) # Fluent used be attacker to determine if tile is dirtied
         #problem.set_initial_value(no_trace_left(tile), False) # Fluent used by attacker for clean, and guard for caught fluents
 
     # Connected tiles
-    for i in range(grid_size[0]):
-        for j in range(grid_size[1]):
-            curr = tiles[f"t{i}{j}"]
-            if j > 0: problem.set_initial_value(connected(curr, tiles[f"t{i}{j-1}"]), True)
-            if j < grid_size[1] - 1: problem.set_initial_value(connected(curr, tiles[f"t{i}{j+1}"]), True)
-            if i > 0: problem.set_initial_value(connected(curr, tiles[f"t{i-1}{j}"]), True)
-            if i < grid_size[0] - 1: problem.set_initial_value(connected(curr, tiles[f"t{i+1}{j}"]), True)
+    for src, dest in grid.edges.tolist():
+        problem.set_initial_value(connected(tile_objs[src], tile_objs[dest]), True)
 
     # Time
     # problem.set_initial_value(is_current_timestep(timesteps["time0"]), True)
@@ -190,7 +184,7 @@ def setup_gridworld_domain(problem: Problem):
     curr, a, t1, t2 = attack_escape.parameters
     #attack_escape.add_precondition(Not(turn_guard))
     attack_escape.add_precondition(at(a, curr))
-    attack_escape.add_precondition(Equals(curr, tiles["t00"]))
+    attack_escape.add_precondition(Equals(curr, tiles[grid.name(*attacker_starting_position)]))
     #attack_escape.add_precondition(is_current_timestep(t1))
     #attack_escape.add_precondition(is_next_timestep(t1, t2))
     attack_escape.add_precondition(diamond_stolen())
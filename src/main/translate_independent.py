@@ -2,50 +2,297 @@ from unified_planning.shortcuts import *
 from unified_planning.model import Problem, Fluent, Parameter, Object
 from unified_planning.io import PDDLWriter
 from typing import Callable, List
+from functools import partial
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+import argparse
+import json
+import os
+import time
+import tracemalloc
 
 #from sweeper_gridworld_domain import setup_gridworld_domain
 #from environment_gridworld_domain import setup_domain
 #from blocksworld_domain import setup_blocksworld_domain
-from final_gridworld_domain import setup_domain
+from final_gridworld_domain import setup_domain, can_extend, CONNECTIVITY_MODES
+import network_domain_ir
+import host_symmetry
+import ground_prune
 
-def create_problem(domain_setup_fn: Callable[[Problem], dict]):
+class Instrumentation:
+    """
+    Records wall time, CPU time and tracemalloc peak per generation phase, plus the size
+    of the generated problem. Tracing starts on construction and slows generation down,
+    so it is only created when asked for (--instrument).
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counts = {}
+        tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.phases[name] = {
+                "wall_s": round(time.perf_counter() - wall, 6),
+                "cpu_s": round(time.process_time() - cpu, 6),
+                "tracemalloc_peak_mb": round(tracemalloc.get_traced_memory()[1] / 1024**2, 3),
+            }
+
+    def count_problem(self, problem: Problem):
+        self.counts = {
+            "objects": len(problem.all_objects),
+            "fluents": len(problem.fluents),
+            "actions": len(problem.actions),
+            "initial_facts": sum(1 for val in problem.explicit_initial_values.values() if val.is_true()),
+            "goals": len(problem.goals),
+        }
+
+    def summary(self):
+        return {
+            "wall_s": round(sum(p["wall_s"] for p in self.phases.values()), 6),
+            "cpu_s": round(sum(p["cpu_s"] for p in self.phases.values()), 6),
+            "tracemalloc_peak_mb": max((p["tracemalloc_peak_mb"] for p in self.phases.values()), default=0.0),
+        }
+
+    def write(self, path):
+        tracemalloc.stop()
+        with open(path, "w") as f:
+            json.dump({"phases": self.phases, "counts": self.counts, "total": self.summary()}, f, indent=2)
+
+
+# Problems built with --incremental, keyed by (connectivity, ext, int): the one with the
+# most critical PCs built so far for that key, as (pc_count_by_segment, problem). A request
+# is derived from it when it has at least as many critical PCs (the cached problem is then
+# extended in place and replaced); otherwise it is built from scratch. run_gridsearch sorts
+# its queue by the total PC count, so every (ext, int) column asks for crit 1, 2, 3, ... in
+# order and every config after a column's first one is derived. Only useful in a long-lived
+# process such as generator_worker.py.
+INCREMENTAL_CACHE_SIZE = 64  # Columns kept; at least the (ext, int) columns of a sweep, or LRU eviction thrashes
+_previous_problems = OrderedDict()
+INCREMENTAL_STATS = {"derived": 0, "scratch": 0}
+
+
+def _phase(instrument, name):
+    return instrument.phase(name) if instrument else nullcontext()
+
+
+def create_problem(domain_setup_fn: Callable[[Problem], dict], instrument: Instrumentation = None,
+                   base: Problem = None):
     """
     Sets up a domain-independent problem using a snapshot of the initial state
     to ensure state restoration, and includes domain-specific success conditions.
+    With base (a problem this function returned earlier), domain_setup_fn only adds to it,
+    e.g. setup_domain with base_counts: base is extended in place and only the new initial
+    facts become new restoration goals.
     """
-    problem = Problem("generalized_domain")
+    if base is None:
+        problem = Problem("generalized_domain")
+        known = None
+    else:
+        problem = base
+        known = set(problem.explicit_initial_values)
 
     # Setup domain
-    setup_info = domain_setup_fn(problem)
+    with _phase(instrument, "setup_domain"):
+        setup_info = domain_setup_fn(problem)
     domain_goals = setup_info.get("success_conditions", [])
 
     # Take snapshot of initial state for restoration goals
-    restore_goals = []
-    for fluent_expr, val in problem.initial_values.items():
-        # Check if the FNode is a Boolean constant with value TRUE. Exclude static fluents
-        if val.is_bool_constant() and val.bool_constant_value() and 'static_' not in fluent_expr.fluent().name:
-            restore_goals.append(fluent_expr)
+    with _phase(instrument, "restore_goals"):
+        restore_goals = []
+        if known is not None:
+            # The restoration goals of base, in order, then the ones for the new facts
+            domain_goal_nodes = set(problem.environment.expression_manager.auto_promote(domain_goals))
+            restore_goals = [goal for goal in problem.goals if goal not in domain_goal_nodes]
+            problem.clear_goals()
+        # initial_values fills in every default and is the expensive part; the new facts
+        # were all set explicitly
+        values = problem.initial_values if known is None else problem.explicit_initial_values
+        for fluent_expr, val in list(values.items()):
+            if known is not None and fluent_expr in known:
+                continue
+            # Check if the FNode is a Boolean constant with value TRUE. Exclude static fluents
+            if val.is_bool_constant() and val.bool_constant_value() and 'static_' not in fluent_expr.fluent().name:
+                restore_goals.append(fluent_expr)
 
 
     # Add both restoration and domain-specific goals
-    print("Goals:")
-    for goal in restore_goals + domain_goals:
-        print(goal)
-        problem.add_goal(goal)
+    with _phase(instrument, "add_goal"):
+        print("Goals:")
+        for goal in restore_goals + domain_goals:
+            print(goal)
+            problem.add_goal(goal)
 
     return problem
 
 
-# Select domain here
-problem = create_problem(setup_domain)
+def compare_problems(a: Problem, b: Problem):
+    """
+    Semantic differences between two problems: objects and their types, fluents, actions,
+    true initial facts and goals (in order). Returns a list of descriptions; empty means
+    both describe the same planning task.
+    """
+    differences = []
+    sections = [
+        ("objects", lambda p: {(o.name, str(o.type)) for o in p.all_objects}),
+        ("fluents", lambda p: {str(f) for f in p.fluents}),
+        ("actions", lambda p: {str(a) for a in p.actions}),
+        ("initial facts", lambda p: {str(f) for f, v in p.explicit_initial_values.items() if v.is_true()}),
+    ]
+    for label, view in sections:
+        only_a, only_b = view(a) - view(b), view(b) - view(a)
+        if only_a or only_b:
+            examples = sorted(map(str, only_a | only_b))[:3]
+            differences.append(f"{label}: {len(only_a)} only in the first, {len(only_b)} only in the second, e.g. {examples}")
+    goals_a, goals_b = [str(g) for g in a.goals], [str(g) for g in b.goals]
+    if goals_a != goals_b:
+        differences.append(f"goals: {len(goals_a)} vs {len(goals_b)}, not the same sequence")
+    return differences
+
+
+def write_pddl(problem: Problem, out_dir: str = ".", instrument: Instrumentation = None):
+    """
+    Writes domain.pddl and problem.pddl for the Stackelberg planner into out_dir.
+    """
+    w = PDDLWriter(problem)
+    with _phase(instrument, "write_domain"):
+        w.write_domain(os.path.join(out_dir, 'domain.pddl'))
+    with _phase(instrument, "write_problem"):
+        w.write_problem(os.path.join(out_dir, 'problem.pddl'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="translate_independent.py",
+                                     description="Generate domain.pddl/problem.pddl for the network domain.")
+    parser.add_argument("--ext", type=int, help="PCs in the external segment")
+    parser.add_argument("--int", type=int, dest="int_", help="PCs in the internal segment")
+    parser.add_argument("--crit", type=int, help="PCs in the critical segment")
+    parser.add_argument("--out-dir", default=".", help="Directory to write the PDDL files into")
+    parser.add_argument("--connectivity", choices=CONNECTIVITY_MODES, default="pairwise",
+                        help="'pairwise' emits one can_ssh fact per host pair; "
+                             "'segment' uses segment links plus per-link exceptions (linear in hosts)")
+    parser.add_argument("--emitter", choices=["up", "ir"], default="up",
+                        help="'up' builds a unified_planning Problem and uses PDDLWriter; "
+                             "'ir' streams the PDDL from network_domain_ir (same output, much faster)")
+    parser.add_argument("--topology", metavar="JSON",
+                        help="Segment graph (segments with host counts and CVE pools, firewalled links, "
+                             "entry and target segments) instead of --ext/--int/--crit (ir emitter only)")
+    parser.add_argument("--reduce-symmetry", action="store_true",
+                        help="Collapse interchangeable hosts to one representative each and write "
+                             "the class multiplicities to symmetry.json (up emitter only; run_gridsearch.py "
+                             "keeps the results of such sweeps apart from full-task ones)")
+    parser.add_argument("--ground-prune", action="store_true",
+                        help="Ground the problem, drop ground actions that can never fire and write the "
+                             "grounded PDDL plus grounding.json (up emitter only)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Derive the problem from the largest one this process built with the same "
+                             "ext/int counts and at most as many critical PCs (up emitter; pays off "
+                             "under generator_worker.py)")
+    parser.add_argument("--verify-incremental", action="store_true",
+                        help="With --incremental, also build from scratch and fail if the problems differ")
+    parser.add_argument("--instrument", metavar="PATH",
+                        help="Write per-phase wall/CPU time, tracemalloc peaks and problem size counts "
+                             "to PATH as JSON")
+    args = parser.parse_args(argv)
+    if args.reduce_symmetry and args.emitter != "up":
+        parser.error("--reduce-symmetry needs --emitter up")
+    if args.ground_prune and args.emitter != "up":
+        parser.error("--ground-prune needs --emitter up")
+    if args.topology and args.emitter != "ir":
+        parser.error("--topology needs --emitter ir")
+    if (args.incremental or args.verify_incremental) and args.emitter != "up":
+        parser.error("--incremental needs --emitter up")
+
+    # Without explicit counts the domain module's defaults are used
+    counts = (args.ext, args.int_, args.crit)
+    pc_count_by_segment = None
+    if any(n is not None for n in counts):
+        if args.topology:
+            parser.error("--topology replaces --ext, --int and --crit")
+        if any(n is None for n in counts):
+            parser.error("--ext, --int and --crit must be given together")
+        pc_count_by_segment = {
+            'external': args.ext,
+            'internal': args.int_,
+            'critical': args.crit
+        }
+
+    instrument = Instrumentation() if args.instrument else None
+
+    if args.emitter == "ir":
+        with _phase(instrument, "build_ir"):
+            if args.topology:
+                topology = network_domain_ir.Topology.load(args.topology)
+            else:
+                topology = network_domain_ir.chain_topology(pc_count_by_segment)
+            ir = network_domain_ir.build_topology_ir(topology, args.connectivity)
+        with _phase(instrument, "write_domain"), open(os.path.join(args.out_dir, 'domain.pddl'), 'w') as f:
+            network_domain_ir.write_domain(ir, f)
+        with _phase(instrument, "write_problem"), open(os.path.join(args.out_dir, 'problem.pddl'), 'w') as f:
+            network_domain_ir.write_problem(ir, f)
+        if instrument:
+            instrument.counts = network_domain_ir.ir_counts(ir)
+            instrument.write(args.instrument)
+        return
+
+    # Select domain here
+    setup_fn = partial(setup_domain, pc_count_by_segment=pc_count_by_segment, connectivity=args.connectivity)
+    base = None
+    incremental = (args.incremental or args.verify_incremental) and pc_count_by_segment is not None
+    if incremental:
+        key = (args.connectivity, pc_count_by_segment['external'], pc_count_by_segment['internal'])
+        base_counts, base = _previous_problems.get(key, (None, None))
+        if base is not None and not can_extend(base_counts, pc_count_by_segment):
+            base = None
+        INCREMENTAL_STATS["derived" if base is not None else "scratch"] += 1
+    problem = create_problem(partial(setup_fn, base_counts=base_counts) if base else setup_fn, instrument, base)
+    if incremental:
+        if base is not None or key not in _previous_problems:
+            # base was extended in place, or this is the column's first problem
+            _previous_problems[key] = (dict(pc_count_by_segment), problem)
+        _previous_problems.move_to_end(key)
+        while len(_previous_problems) > INCREMENTAL_CACHE_SIZE:
+            _previous_problems.popitem(last=False)
+        if args.verify_incremental and base is not None:
+            differences = compare_problems(problem, create_problem(setup_fn))
+            if differences:
+                raise SystemExit("Incremental problem differs from a scratch build:\n  " + "\n  ".join(differences))
+
+    if args.reduce_symmetry:
+        with _phase(instrument, "reduce_symmetry"):
+            classes = host_symmetry.host_classes(problem)
+            report = host_symmetry.symmetry_report(problem, classes)
+            problem, multiplicity = host_symmetry.reduce_problem(problem, classes)
+        host_symmetry.write_report(os.path.join(args.out_dir, 'symmetry.json'), classes, report, multiplicity)
+
+    # Write to PDDL files for the Stackelberg planner
+    if args.ground_prune:
+        with _phase(instrument, "ground_prune"):
+            task = ground_prune.ground(problem)
+        with _phase(instrument, "write_domain"), open(os.path.join(args.out_dir, 'domain.pddl'), 'w') as f:
+            ground_prune.write_domain(task, f)
+        with _phase(instrument, "write_problem"), open(os.path.join(args.out_dir, 'problem.pddl'), 'w') as f:
+            ground_prune.write_problem(task, f)
+        ground_prune.write_report(os.path.join(args.out_dir, 'grounding.json'), task)
+    else:
+        write_pddl(problem, args.out_dir, instrument)
+
+    if instrument:
+        instrument.count_problem(problem)
+        instrument.write(args.instrument)
+
+    # Uncomment to try blocksworld:
+    # problem = create_problem(setup_blocksworld_domain)
+    # w = PDDLWriter(problem)
+    # w.write_domain('blocksworld_domain.pddl')
+    # w.write_problem('blocksworld_problem.pddl')
 
-# Write to PDDL files for the Stackelberg planner
-w = PDDLWriter(problem)
-w.write_domain('domain.pddl')
-w.write_problem('problem.pddl')
 
-# Uncomment to try blocksworld:
-# problem = create_problem(setup_blocksworld_domain)
-# w = PDDLWriter(problem)
-# w.write_domain('blocksworld_domain.pddl')
-# w.write_problem('blocksworld_problem.pddl')
\ No newline at end of file
+if __name__ == "__main__":
+    main()
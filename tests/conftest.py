@@ -0,0 +1,15 @@
+import os
+import sys
+
+# The modules in src/main are flat scripts that import each other by name
+MAIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "main")
+sys.path.insert(0, MAIN_DIR)
+
+
+def pddl_tokens(text):
+    """
+    The PDDL text's tokens in sorted order. PDDLWriter lists constants and some conjunctions
+    in set order, which changes from process to process, so domain files written by different
+    processes are only equal up to that.
+    """
+    return sorted(text.replace("(", " ( ").replace(")", " ) ").split())
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+import adaptive_sweep
+
+VALUES = list(range(1, 8))  # The 7x7x7 cube of the default sweep
+
+
+def staircase(seed):
+    """
+    Random monotone boundary {(e, i): highest finishing crit index or -1}: never higher than
+    the boundary of a column with fewer ext or int PCs.
+    """
+    rng = random.Random(seed)
+    top = len(VALUES) - 1
+    boundary = {}
+    for e in VALUES:
+        for i in VALUES:
+            upper = min(boundary.get((e - 1, i), top), boundary.get((e, i - 1), top))
+            boundary[(e, i)] = max(upper - rng.choice([0, 0, 0, 1, 2]), -1)
+    return boundary
+
+
+def trace(boundary):
+    executed = []
+
+    def execute(configs):
+        assert not set(configs) & set(executed), "config run twice"
+        executed.extend(configs)
+        return {(e, i, c): VALUES.index(c) <= boundary[(e, i)] for e, i, c in configs}
+
+    traced = adaptive_sweep.trace_boundary(adaptive_sweep.Knowledge(), VALUES, VALUES, VALUES, execute)
+    return traced, executed
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_traces_random_staircase(seed):
+    boundary = staircase(seed)
+    traced, executed = trace(boundary)
+    assert traced == boundary
+    assert len(executed) < len(VALUES) ** 3
+
+
+@pytest.mark.parametrize("height", [-1, 0, 3, len(VALUES) - 1])
+def test_traces_flat_boundary(height):
+    # Nothing finishes, only crit 1 finishes, half the cube finishes, everything finishes
+    boundary = {(e, i): height for e in VALUES for i in VALUES}
+    traced, executed = trace(boundary)
+    assert traced == boundary
+    assert len(executed) < len(VALUES) ** 3
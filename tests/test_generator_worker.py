@@ -0,0 +1,60 @@
+import filecmp
+import os
+import subprocess
+import sys
+
+import pytest
+
+import generator_worker
+from conftest import MAIN_DIR, pddl_tokens
+
+# Generates an environment gridworld instance in a fresh interpreter, as a one-off script would
+FRESH_ENVIRONMENT = """
+import sys
+from functools import partial
+from environment_gridworld_domain import setup_domain
+from translate_independent import create_problem, write_pddl
+write_pddl(create_problem(partial(setup_domain, grid_size=(4, 4), number_of_trace_tiles=3)), sys.argv[1])
+"""
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    socket_path = str(tmp_path_factory.mktemp("server") / "generator.sock")
+    server = subprocess.Popen([sys.executable, "generator_worker.py", "--socket", socket_path],
+                              cwd=MAIN_DIR)
+    generator_worker.wait_for_server(socket_path)
+    client = generator_worker.GeneratorClient(socket_path)
+    yield client
+    client.close()
+    server.terminate()
+    server.wait()
+
+
+def _fresh(argv, out_dir):
+    os.makedirs(out_dir)
+    subprocess.run([sys.executable] + argv + [str(out_dir)], cwd=MAIN_DIR, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def _same_files(a, b):
+    """The problems (which hold the trace tiles) byte for byte, the domains up to set order."""
+    return (filecmp.cmp(os.path.join(a, "problem.pddl"), os.path.join(b, "problem.pddl"), shallow=False)
+            and pddl_tokens(open(os.path.join(a, "domain.pddl")).read())
+            == pddl_tokens(open(os.path.join(b, "domain.pddl")).read()))
+
+
+def test_environment_matches_fresh_process(client, tmp_path):
+    _fresh(["-c", FRESH_ENVIRONMENT], tmp_path / "fresh")
+    params = {"grid_size": [4, 4], "number_of_trace_tiles": 3}
+    for n in range(3):
+        # Earlier requests must not shift the trace tiles of later ones
+        client.generate("environment", params, str(tmp_path / f"served{n}"))
+        assert _same_files(tmp_path / "fresh", tmp_path / f"served{n}")
+
+
+def test_network_matches_fresh_process(client, tmp_path):
+    _fresh(["translate_independent.py", "--ext", "2", "--int", "1", "--crit", "2", "--out-dir"], tmp_path / "fresh")
+    client.generate("environment", {"grid_size": [3, 3]}, str(tmp_path / "other"))
+    client.generate("network", {"ext": 2, "int": 1, "crit": 2}, str(tmp_path / "served"))
+    assert _same_files(tmp_path / "fresh", tmp_path / "served")
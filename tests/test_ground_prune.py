@@ -0,0 +1,59 @@
+import contextlib
+import io
+from functools import partial
+
+import pytest
+
+import ground_prune
+from final_gridworld_domain import CONNECTIVITY_MODES, setup_domain
+from translate_independent import create_problem
+
+CONFIGS = [(1, 1, 1), (2, 2, 2)]
+
+
+@pytest.fixture(scope="module", params=[(config, connectivity) for connectivity in CONNECTIVITY_MODES
+                                        for config in CONFIGS],
+                ids=lambda p: "ext{}_int{}_crit{}-{}".format(*p[0], p[1]))
+def problem(request):
+    config, connectivity = request.param
+    counts = dict(zip(("external", "internal", "critical"), config))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return create_problem(partial(setup_domain, pc_count_by_segment=counts, connectivity=connectivity))
+
+
+def _unpruned_reachable(problem):
+    """Relaxed-reachable ground actions and goal when no fluent is treated as static."""
+    grounder = ground_prune.Grounder(problem)
+    grounder.static = set()
+    candidates = [a for action in problem.actions for a in grounder.ground_action(action)]
+    goal = ground_prune._conj([grounder.ground(g, {}) for g in problem.goals])
+    return ground_prune.relaxed_reachable(candidates, set(grounder.true_atoms), goal)
+
+
+def test_pruned_actions_cover_the_relaxed_reachable_ones(problem):
+    task = ground_prune.ground(problem)
+    reachable, goal_reachable = _unpruned_reachable(problem)
+
+    assert {a.name for a in reachable} <= {a.name for a in task.actions}
+    assert goal_reachable
+    counts = ground_prune.report(task)["total"]
+    assert counts["after_reachability"] == len(task.actions) <= counts["after_static"] <= counts["type_consistent"]
+
+
+def test_static_fluents_are_compiled_away(problem):
+    task = ground_prune.ground(problem)
+
+    assert {"static_in_segment", "static_separated_by"} <= set(task.static)
+    assert task.static_true
+    atoms = set(task.init)
+    ground_prune._atoms_of(task.goal, atoms)
+    for a in task.actions:
+        ground_prune._atoms_of(a.pre, atoms)
+        for cond, atom, _ in a.effects:
+            ground_prune._atoms_of(cond, atoms)
+            atoms.add(atom)
+    assert not {name for name, _ in atoms} & set(task.static)
+
+    assert task.goal_reachable
+    reachable, goal_reachable = ground_prune.relaxed_reachable(task.actions, task.init, task.goal)
+    assert len(reachable) == len(task.actions) and goal_reachable
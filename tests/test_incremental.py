@@ -0,0 +1,35 @@
+import itertools
+import os
+import threading
+
+import pytest
+
+import generator_worker
+import run_gridsearch
+import translate_independent
+
+
+@pytest.fixture
+def gen_server(tmp_path):
+    socket_path = str(tmp_path / "generator.sock")
+    server = generator_worker.GeneratorServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    run_gridsearch._gen_clients.pop(socket_path).close()
+
+
+def test_default_sweep_order_derives_problems(gen_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(translate_independent, "_previous_problems", translate_independent.OrderedDict())
+    monkeypatch.setattr(translate_independent, "INCREMENTAL_STATS", {"derived": 0, "scratch": 0})
+    configs = sorted(itertools.product([1, 2], [1, 2], [1, 2, 3]), key=lambda x: (sum(x), x[0], x[1], x[2]))
+    for config in configs:
+        workdir = str(tmp_path / "ext{}_int{}_crit{}".format(*config))
+        os.makedirs(workdir)
+        # --verify-incremental makes the generator fail if a derived problem differs from a fresh one
+        run_gridsearch.generate(config, workdir, ["--verify-incremental"], gen_server=gen_server)
+
+    columns = len({(e, i) for e, i, _ in configs})
+    assert translate_independent.INCREMENTAL_STATS == {"derived": len(configs) - columns, "scratch": columns}
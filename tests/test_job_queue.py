@@ -0,0 +1,139 @@
+import time
+
+import pytest
+
+import job_queue
+
+LEASE = 0.2  # Seconds; tests sleep past it to let a lease expire
+
+
+@pytest.fixture
+def queues(tmp_path):
+    """Two connections to one queue, as two machines would have."""
+    a, b = job_queue.JobQueue(str(tmp_path)), job_queue.JobQueue(str(tmp_path))
+    yield a, b
+    a.close()
+    b.close()
+
+
+def _expire():
+    time.sleep(LEASE * 1.5)
+
+
+def test_claims_in_priority_order_without_sharing(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1), (1, 1, 2)], timeout=10)
+    first, second = a.claim("a", LEASE), b.claim("b", LEASE)
+    assert (first.config, second.config) == ((1, 1, 1), (1, 1, 2))
+    assert (first.timeout, first.attempts) == (10, 1)
+    assert a.claim("a", LEASE) is None
+    assert a.unfinished() == 2
+
+
+def test_expired_lease_is_reclaimed(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1)], timeout=10)
+    a.claim("a", LEASE)
+    assert b.claim("b", LEASE) is None
+    assert a.heartbeat((1, 1, 1), "a", LEASE)
+
+    _expire()
+    job = b.claim("b", LEASE)
+    assert job.config == (1, 1, 1) and job.attempts == 2
+    # The first worker learns from its heartbeat that the job was taken over
+    assert not a.heartbeat((1, 1, 1), "a", LEASE)
+    assert b.heartbeat((1, 1, 1), "b", LEASE)
+
+
+@pytest.mark.parametrize("first", ["a", "b"])
+def test_first_result_wins(queues, first):
+    a, b = queues
+    a.enqueue([(1, 1, 1)], timeout=10)
+    a.claim("a", LEASE)
+    _expire()
+    b.claim("b", LEASE)
+
+    # The worker whose lease expired may still finish first; either way one result is kept
+    workers = {"a": a, "b": b}
+    second = "b" if first == "a" else "a"
+    assert workers[first].complete((1, 1, 1), first, "done", {"row": [first]})
+    assert not workers[second].complete((1, 1, 1), second, "done", {"row": [second]})
+    assert a.unmerged() == [((1, 1, 1), "done", {"row": [first]})]
+
+
+def test_gives_up_after_max_attempts(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1)], timeout=10)
+    for attempt in range(1, job_queue.MAX_ATTEMPTS + 1):
+        job = (a if attempt % 2 else b).claim(f"w{attempt}", LEASE)
+        assert job.attempts == attempt
+        _expire()
+
+    assert a.claim("a", LEASE) is None
+    assert b.requeue_expired() == 1
+    assert a.counts() == {"failed": 1}
+    assert a.unfinished() == 0
+    assert a.unmerged() == [((1, 1, 1), "lease_expired", {})]
+
+
+def test_failure_reason_is_the_last_attempts(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1)], timeout=10)
+    for _ in range(1, job_queue.MAX_ATTEMPTS):
+        a.claim("a", LEASE)
+        _expire()
+        assert b.requeue_expired() == 1
+    a.claim("a", LEASE)
+    a.release((1, 1, 1), "a", "gen_error")
+    assert a.counts() == {"failed": 1}
+    assert a.unmerged() == [((1, 1, 1), "gen_error", {})]
+
+
+def test_requeue_expired(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1), (1, 1, 2)], timeout=10)
+    a.claim("a", LEASE)
+    b.claim("b", 60)
+    _expire()
+
+    assert b.requeue_expired() == 1
+    assert a.counts() == {"queued": 1, "leased": 1}
+    assert a.workers()[0][:2] == ("b", (1, 1, 2))
+    assert b.claim("b", LEASE).config == (1, 1, 1)
+
+
+def test_release(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1)], timeout=10)
+    a.claim("a", LEASE)
+    b.release((1, 1, 1), "b")  # Not b's job
+    assert a.counts() == {"leased": 1}
+    a.release((1, 1, 1), "a")
+    assert b.claim("b", LEASE).attempts == 2
+
+
+def test_skip_loses_to_claim(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1), (1, 1, 2)], timeout=10)
+    a.claim("a", LEASE)
+
+    # Pruning a job a worker already claimed fails; the running job reports as usual
+    assert not b.skip((1, 1, 1), {"blocker": [1, 1, 0]})
+    assert b.skip((1, 1, 2), {"blocker": [1, 1, 0]})
+    assert b.claim("b", LEASE) is None
+    assert a.complete((1, 1, 1), "a", "done", {"row": []})
+    assert sorted(b.unmerged()) == [((1, 1, 1), "done", {"row": []}),
+                                    ((1, 1, 2), "skipped_dominated", {"blocker": [1, 1, 0]})]
+
+
+def test_enqueue_requeues_only_merged_jobs(queues):
+    a, b = queues
+    a.enqueue([(1, 1, 1), (1, 1, 2)], timeout=10)
+    a.complete((1, 1, 1), "a", "done", {})
+    a.complete((1, 1, 2), "a", "done", {})
+    a.mark_merged((1, 1, 1))
+
+    b.enqueue([(1, 1, 1), (1, 1, 2)], timeout=20)
+    job = b.claim("b", LEASE)
+    assert (job.config, job.timeout, job.attempts) == ((1, 1, 1), 20, 1)
+    assert b.claim("b", LEASE) is None
@@ -0,0 +1,40 @@
+import contextlib
+import io
+from functools import partial
+
+import pytest
+from unified_planning.io import PDDLWriter
+
+import network_domain_ir
+from conftest import pddl_tokens
+from final_gridworld_domain import CONNECTIVITY_MODES, setup_domain
+from translate_independent import create_problem
+
+CONFIGS = [(1, 1, 1), (2, 1, 3), (1, 4, 2), (3, 3, 3), (5, 2, 1), (4, 4, 6)]
+
+
+def _pddlwriter_output(counts, connectivity):
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = create_problem(partial(setup_domain, pc_count_by_segment=counts, connectivity=connectivity))
+    writer = PDDLWriter(problem)
+    return writer.get_domain(), writer.get_problem()
+
+
+def _ir_output(counts, connectivity):
+    ir = network_domain_ir.build_network_ir(counts, connectivity)
+    domain, problem = io.StringIO(), io.StringIO()
+    network_domain_ir.write_domain(ir, domain)
+    network_domain_ir.write_problem(ir, problem)
+    return domain.getvalue(), problem.getvalue()
+
+
+@pytest.mark.parametrize("connectivity", CONNECTIVITY_MODES)
+@pytest.mark.parametrize("config", CONFIGS, ids=lambda c: "ext{}_int{}_crit{}".format(*c))
+def test_ir_matches_pddlwriter(config, connectivity):
+    counts = dict(zip(("external", "internal", "critical"), config))
+    expected_domain, expected_problem = _pddlwriter_output(counts, connectivity)
+    domain, problem = _ir_output(counts, connectivity)
+
+    assert problem == expected_problem
+    assert pddl_tokens(domain) == pddl_tokens(expected_domain)
+    assert network_domain_ir.check_against_pddlwriter(counts, connectivity) == (True, "identical")
@@ -0,0 +1,12 @@
+import pandas as pd
+
+import plot_results
+
+
+def test_figure_input_keeps_latest_rerun():
+    df = pd.DataFrame({
+        "Ext PCs": [1, 1, 2, 1], "Int PCs": [1, 1, 1, 1], "Crit PCs": [1, 2, 1, 1],
+        "Total Time (s)": [5.0, 6.0, 7.0, 1.0],  # (1, 1, 1) was re-run and got faster
+    })
+    frame = plot_results.figure_input(plot_results.FrameResults(df), [{"ext": 1}, {"crit": 1}])
+    assert frame.values.tolist() == [[1, 1, 1, 1.0], [1, 1, 2, 6.0], [2, 1, 1, 7.0]]
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import random
+from functools import partial
+
+import pytest
+
+import ground_prune
+import prp_policy
+from final_gridworld_domain import setup_domain
+from reference_solver import BitTask
+from translate_independent import create_problem
+
+
+def _fact(positive, atom, spelling):
+    """One literal in one of the spellings parse_facts accepts."""
+    name, args = atom
+    if spelling == 0:
+        sexpr = f"({' '.join((name,) + args)})"
+        return sexpr if positive else f"(not {sexpr})"
+    if spelling == 1:
+        return f"{'Atom' if positive else 'NegatedAtom'} {name}({', '.join(args)})"
+    call = f"{name.upper()}({', '.join(args)})"
+    return call if positive else f"not({' '.join((name,) + args)})"
+
+
+@pytest.fixture(scope="module")
+def ground():
+    counts = {"external": 2, "internal": 2, "critical": 2}
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = create_problem(partial(setup_domain, pc_count_by_segment=counts))
+    return ground_prune.ground(problem)
+
+
+@pytest.fixture(scope="module")
+def policy(ground):
+    """
+    A random .pol over the task's actions, with the rules it should parse to and the states
+    it is checked on. Every rule holds in one of those states, so lookups pick many rules.
+    """
+    task = BitTask(ground)
+    rng = random.Random(0)
+    states = prp_policy.sample_states(task, task.init, count=500)
+    static_true = sorted(ground.static_true)
+    actions = [a.name for a in task.leader + task.follower]
+    lines, expected = [], []
+    for k in range(60):
+        state = rng.choice(states)
+        facts = [(bool(state >> task.index[atom] & 1), atom) for atom in rng.sample(task.atoms, rng.randint(2, 4))]
+        if k % 5 == 0:
+            facts.append((True, rng.choice(static_true)))
+        condition = " ".join(_fact(positive, atom, (k + j) % 3) for j, (positive, atom) in enumerate(facts))
+        if k % 7 == 0:
+            condition += " <none of those>"
+        action = rng.choice(actions)
+        distance = rng.randint(0, 5)
+        execute = f"({action})" if k % 2 else action
+        lines.append(f"If holds: {condition}\nExecute: {execute} / SC / d={distance}\n")
+        expected.append((facts, action, distance))
+    return task, "\n".join(lines), expected, states
+
+
+def test_parse_policy_accepts_every_spelling(policy):
+    _, text, expected, _ = policy
+    rules = prp_policy.parse_policy(text)
+
+    assert [(rule.facts, rule.action, rule.distance) for rule in rules] == expected
+    assert [rule.order for rule in rules] == list(range(len(expected)))
+
+
+def test_parse_facts_rejects_sas_facts():
+    with pytest.raises(prp_policy.PolicyFormatError):
+        prp_policy.parse_facts("3:1 7:0")
+
+
+def test_index_lookup_matches_scan(policy, ground, tmp_path):
+    task, text, _, states = policy
+    path = tmp_path / "policy.pol"
+    path.write_text(text)
+    rules, stats = prp_policy.compile_rules(prp_policy.load_policy(str(path)), task, ground.static_true)
+    index = prp_policy.PolicyIndex(rules)
+
+    assert stats["unknown_actions"] == 0
+    assert len(index.tables) > 1
+    picked = [index.lookup(state) for state in states]
+    assert picked == [index.scan(state) for state in states]
+    assert len(set(picked)) > 5, "the sampled states should exercise several rules"
@@ -0,0 +1,54 @@
+import contextlib
+import io
+from functools import partial
+
+import pytest
+
+import ground_prune
+import reference_solver
+from final_gridworld_domain import CONNECTIVITY_MODES, setup_domain
+from reference_solver import INFINITE_COST
+from translate_independent import create_problem
+
+# (defender cost -> attacker cost) of the known frontiers
+FRONTIERS = {
+    (1, 1, 1): {0: 10, 1: INFINITE_COST},
+    (2, 2, 2): {0: 10, 1: 12, 2: INFINITE_COST},
+}
+
+
+def _problem(config, connectivity):
+    counts = dict(zip(("external", "internal", "critical"), config))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return create_problem(partial(setup_domain, pc_count_by_segment=counts, connectivity=connectivity))
+
+
+@pytest.mark.parametrize("connectivity", CONNECTIVITY_MODES)
+@pytest.mark.parametrize("config", sorted(FRONTIERS), ids=lambda c: "ext{}_int{}_crit{}".format(*c))
+def test_frontier(config, connectivity):
+    frontier, stats = reference_solver.solve(_problem(config, connectivity))
+
+    assert stats["complete"]
+    assert {e["defender cost"]: e["attacker cost"] for e in frontier} == FRONTIERS[config]
+
+
+@pytest.mark.parametrize("connectivity", CONNECTIVITY_MODES)
+def test_goal_distance_is_admissible(connectivity):
+    task = reference_solver.BitTask(ground_prune.ground(_problem((2, 2, 2), connectivity)))
+    memo = {}
+    state = task.init
+    for action in task.leader[:4]:
+        cost, _ = reference_solver.follower_search(task, state, memo)
+        if cost != INFINITE_COST:
+            assert task.goal_distance(state) <= cost
+        state = action.apply(state)
+
+
+def test_goal_distance_counts_deleted_negative_goals():
+    a, b = ("open", ("x",)), ("open", ("y",))
+    close = ground_prune.GroundAction("attack_close", (), True, [(True, a, False), (True, b, False)])
+    goal = ("and", (("not", a), ("not", b)))
+    task = reference_solver.BitTask(ground_prune.GroundTask("t", [close], {a, b}, goal, [], {}, True))
+
+    assert reference_solver.follower_search(task, task.init, {})[0] == 1
+    assert task.goal_distance(task.init) == 1
@@ -0,0 +1,194 @@
+import csv
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import result_store
+import run_gridsearch
+from conftest import MAIN_DIR
+
+# Stands in for the Stackelberg planner: prints the lines run_gridsearch parses. The config
+# named in the HANG file never finishes, like a sweep killed while its planner runs.
+FAKE_PLANNER = """#!{python}
+import os, sys, time
+config = os.path.basename(os.getcwd())
+hang = os.path.join({sweep_dir!r}, "HANG")
+if os.path.exists(hang) and open(hang).read() == config:
+    open(hang + ".pid", "w").write(str(os.getpid()))
+    time.sleep(600)
+print("Done! [0.10s CPU, 0.12s wall-clock]")
+print("Preprocessor time: 0.03s")
+print("Search time: 0.05s")
+print("Pareto-frontier size: 1")
+print("Total time: 0.20s")
+"""
+
+# Runs a sweep of the cube up to SWEEP_SIZE (default 2) PCs per segment in the current directory
+SWEEP = """
+import os, sys
+import run_gridsearch
+size = int(os.environ.get("SWEEP_SIZE", "2"))
+run_gridsearch.EXT_RANGE = run_gridsearch.INT_RANGE = run_gridsearch.CRIT_RANGE = range(1, size + 1)
+sys.argv = ["run_gridsearch.py"] + sys.argv[1:]
+run_gridsearch.main()
+"""
+
+ARGS = ["--jobs", "2", "--no-pddl-cache", "--no-result-cache", "--no-log-archive"]
+CONFIGS = {(e, i, c) for e in (1, 2) for i in (1, 2) for c in (1, 2)}
+
+
+@pytest.fixture
+def sweep_dir(tmp_path, monkeypatch):
+    planner = tmp_path / "stackelberg-planner-sls" / "src" / "fast-downward.py"
+    planner.parent.mkdir(parents=True)
+    planner.write_text(FAKE_PLANNER.format(python=sys.executable, sweep_dir=str(tmp_path)))
+    planner.chmod(0o755)
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    pid_file = tmp_path / "HANG.pid"
+    if pid_file.exists():
+        try:
+            os.kill(int(pid_file.read_text()), signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def _sweep(log, *args, size=2, **kwargs):
+    env = {**os.environ, "PYTHONPATH": MAIN_DIR, "SWEEP_SIZE": str(size)}
+    with open(log, "w") as out:
+        return subprocess.Popen([sys.executable, "-c", SWEEP] + ARGS + list(args), env=env,
+                                stdout=out, stderr=subprocess.STDOUT, **kwargs)
+
+
+def _csv_rows():
+    with open(run_gridsearch.OUTPUT_CSV, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == run_gridsearch.HEADERS
+    return {tuple(int(x) for x in row[:3]): row for row in rows[1:]}
+
+
+def _assert_consistent(journal_state, rows):
+    """Every finished config of the journal has exactly its journaled row in the CSV."""
+    finished = {config: entry for config, entry in journal_state.items() if "row" in entry}
+    assert set(rows) == set(finished)
+    for config, entry in finished.items():
+        assert rows[config] == [str(x) for x in entry["row"]]
+
+
+def test_interrupted_sweep_resumes_consistently(sweep_dir):
+    hung = (1, 2, 1)
+    (sweep_dir / "HANG").write_text("ext{}_int{}_crit{}".format(*hung))
+
+    # Kill the sweep once everything but the hung config is done; the rows queued behind it
+    # are then only in the journal, still buffered for the CSV's queue order
+    log = sweep_dir / "sweep.log"
+    sweep = _sweep(log, start_new_session=True)
+    deadline = time.time() + 120
+    while True:
+        state = run_gridsearch.load_journal()
+        if sum(entry["event"] == "done" for entry in state.values()) == len(CONFIGS) - 1:
+            break
+        assert sweep.poll() is None and time.time() < deadline, log.read_text()
+        time.sleep(0.2)
+    os.killpg(sweep.pid, signal.SIGKILL)
+    sweep.wait()
+    os.kill(int((sweep_dir / "HANG.pid").read_text()), signal.SIGKILL)
+    (sweep_dir / "HANG").unlink()
+
+    state = run_gridsearch.load_journal()
+    assert state[hung]["event"] == "started"
+    assert len(_csv_rows()) < len(CONFIGS) - 1
+
+    assert _sweep(log).wait(timeout=120) == 0, log.read_text()
+    assert f"{len(CONFIGS) - 1} finished, 1 to run" in log.read_text()
+
+    state = run_gridsearch.load_journal()
+    assert {entry["event"] for entry in state.values()} == {"done"}
+    rows = _csv_rows()
+    assert set(rows) == CONFIGS
+    _assert_consistent(state, rows)
+
+    # A synced CSV is left alone
+    with open(run_gridsearch.OUTPUT_CSV) as f:
+        before = f.read()
+    run_gridsearch.sync_csv_with_journal(state, [])
+    with open(run_gridsearch.OUTPUT_CSV) as f:
+        assert f.read() == before
+
+
+def test_sync_drops_rerun_rows_and_restores_buffered_ones(sweep_dir):
+    rows = [[1, 1, 1, 3, 0.1, 0.03, 0.05, 0.2, True], [1, 1, 2, 4, 0.1, 0.03, 0.05, 0.2, True]]
+    journal_state = {
+        (1, 1, 1): {"config": [1, 1, 1], "event": "done", "row": run_gridsearch.pad_row(rows[0])},
+        (1, 1, 2): {"config": [1, 1, 2], "event": "started", "timeout": 10},
+        (1, 2, 1): {"config": [1, 2, 1], "event": "done",
+                    "row": run_gridsearch.pad_row([1, 2, 1, 4, 0.1, 0.03, 0.05, 0.2, True])},
+    }
+    with open(run_gridsearch.OUTPUT_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(run_gridsearch.HEADERS)
+        writer.writerows(run_gridsearch.pad_row(row) for row in rows)
+
+    run_gridsearch.sync_csv_with_journal(journal_state, [(1, 1, 2)])
+
+    del journal_state[(1, 1, 2)]
+    _assert_consistent(journal_state, _csv_rows())
+
+
+def test_changed_gen_args_do_not_resume_from_other_variant(sweep_dir):
+    log = sweep_dir / "sweep.log"
+    assert _sweep(log, size=1).wait(timeout=120) == 0, log.read_text()
+    default_csv = (sweep_dir / run_gridsearch.OUTPUT_CSV).read_text()
+
+    # Another task: the config runs again, into the variant's own CSV and journal
+    gen_args = ["--connectivity", "segment"]
+    assert _sweep(log, "--gen-args=" + " ".join(gen_args), size=1).wait(timeout=120) == 0, log.read_text()
+    assert "Resuming" not in log.read_text()
+    suffix = run_gridsearch.variant_suffix(gen_args)
+    variant_csv = sweep_dir / run_gridsearch.variant_path(run_gridsearch.OUTPUT_CSV, suffix)
+    variant_journal = run_gridsearch.variant_path(run_gridsearch.JOURNAL_FILE, suffix)
+    assert (sweep_dir / run_gridsearch.OUTPUT_CSV).read_text() == default_csv
+    assert variant_csv.read_text().count("\n") == 2
+    assert run_gridsearch.load_journal(variant_journal)[(1, 1, 1)]["event"] == "done"
+    assert json.loads((sweep_dir / run_gridsearch.VARIANTS_FILE).read_text()) == {suffix: gen_args}
+
+    # The same arguments resume from the variant's journal
+    assert _sweep(log, "--gen-args=" + " ".join(gen_args), size=1).wait(timeout=120) == 0, log.read_text()
+    assert "1 finished, 0 to run" in log.read_text()
+
+
+def test_store_queries_one_variant(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    row = [1, 1, 1, 3, 0.1, 0.03, 0.05, 0.2, True]
+    store = result_store.ResultStore(path)
+    store.start_sweep(gen_args=[])
+    store.add_row(row)
+    store.start_sweep(gen_args=["--ground-prune"])
+    store.add_row(row[:7] + [9.0, True])
+    store.close()
+
+    default, pruned = result_store.ResultStore(path), result_store.ResultStore(path, ["--ground-prune"])
+    assert default.slice()["Total Time (s)"].tolist() == [0.2]
+    assert pruned.slice()["Total Time (s)"].tolist() == [9.0]
+    assert sorted(default.variants()) == [[], ["--ground-prune"]]
+    default.close()
+    pruned.close()
+
+
+def test_pddl_cache_hit_reports_no_generation_stats(sweep_dir):
+    cache_dir = str(sweep_dir / "pddl_cache")
+    fresh = run_gridsearch.run_config((1, 1, 1), cache_dir=cache_dir, instrument=True)
+    cached = run_gridsearch.run_config((1, 1, 1), cache_dir=cache_dir, instrument=True)
+    assert fresh["status"] == cached["status"] == "ok"
+    assert fresh["generation"]["wall_s"] > 0
+    assert cached["generation"] is None
+    entries = [names for _, _, names in os.walk(cache_dir) if "problem.pddl" in names]
+    assert len(entries) == 1 and run_gridsearch.GENERATION_FILE not in entries[0]
+    # Uninstrumented runs share the entry
+    run_gridsearch.run_config((1, 1, 1), cache_dir=cache_dir)
+    assert len([names for _, _, names in os.walk(cache_dir) if "problem.pddl" in names]) == 1